@@ -0,0 +1,46 @@
+"""
+Attack and target tables for knights, kings and pawns, built once at import.
+
+Every table is indexed by square (row * 8 + column). The *_ATTACKS tables hold
+bitboards for the bitboard engine, the *_TARGETS tables hold the same squares
+as [row, column] lists for the legalmoveb() methods of the piece classes.
+The [row, column] lists are shared between calls and must not be modified.
+"""
+
+WHITE = 0
+BLACK = 1
+
+# Same order as the candidate moves the piece classes used to build on every call
+KNIGHT_STEPS = ((2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2))
+KING_STEPS = ((1, 1), (1, -1), (1, 0), (0, -1), (0, 1), (-1, 0), (-1, -1), (-1, 1))
+PAWN_DIRECTIONS = (-1, 1)  # Row step of White and Black pawns
+
+COORDINATES = [[square // 8, square % 8] for square in range(64)]
+
+
+def _targets(square, steps):
+    row, column = divmod(square, 8)
+    return [COORDINATES[(row + dr) * 8 + column + dc] for dr, dc in steps
+            if 0 <= row + dr < 8 and 0 <= column + dc < 8]
+
+
+def _bitboard(targets):
+    bb = 0
+    for row, column in targets:
+        bb |= 1 << (row * 8 + column)
+    return bb
+
+
+KNIGHT_TARGETS = [_targets(square, KNIGHT_STEPS) for square in range(64)]
+KING_TARGETS = [_targets(square, KING_STEPS) for square in range(64)]
+# Diagonal capture squares of a pawn, left column first
+PAWN_CAPTURE_TARGETS = [[_targets(square, ((direction, -1), (direction, 1))) for square in range(64)]
+                        for direction in PAWN_DIRECTIONS]
+# Square in front of a pawn, or None on the last row
+PAWN_PUSH_TARGETS = [[COORDINATES[square + direction * 8] if 0 <= square // 8 + direction < 8 else None
+                      for square in range(64)]
+                     for direction in PAWN_DIRECTIONS]
+
+KNIGHT_ATTACKS = [_bitboard(targets) for targets in KNIGHT_TARGETS]
+KING_ATTACKS = [_bitboard(targets) for targets in KING_TARGETS]
+PAWN_ATTACKS = [[_bitboard(targets) for targets in color_targets] for color_targets in PAWN_CAPTURE_TARGETS]
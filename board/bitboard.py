@@ -0,0 +1,844 @@
+"""
+Bitboard position representation used by the chess engine.
+
+A Position keeps one 64-bit integer per piece type and color plus the
+occupancy of each side. Square indices follow the same convention as the
+``position`` attribute of the piece classes: ``square = row * 8 + column``
+with row 0 being Black's back rank, so bit ``1 << square`` of a bitboard
+corresponds to ``gameTiles[row][column]``.
+"""
+
+from board.tile import Tile
+from board.zobrist import PIECE_KEYS, CASTLING_KEYS, EP_KEYS, SIDE_KEY
+from board.piece_square import PSQT
+from board.attack_tables import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, COORDINATES
+from board.sliders import ROOK_TABLES, ROOK_MASKS, BISHOP_TABLES, BISHOP_MASKS
+from pieces.nullpiece import nullpiece
+
+# Colors
+WHITE = 0
+BLACK = 1
+ALLIANCES = ('White', 'Black')
+
+# Piece types
+PAWN = 0
+KNIGHT = 1
+BISHOP = 2
+ROOK = 3
+QUEEN = 4
+KING = 5
+
+# Piece codes are color * 6 + piece type, EMPTY marks a free square
+EMPTY = -1
+WHITE_PAWN, WHITE_KNIGHT, WHITE_BISHOP, WHITE_ROOK, WHITE_QUEEN, WHITE_KING = range(6)
+BLACK_PAWN, BLACK_KNIGHT, BLACK_BISHOP, BLACK_ROOK, BLACK_QUEEN, BLACK_KING = range(6, 12)
+
+# Same letters as the tostring() of the piece classes (White lowercase, Black uppercase)
+PIECE_CHARS = 'pnbrqkPNBRQK'
+CHAR_TO_PIECE = {c: i for i, c in enumerate(PIECE_CHARS)}
+# FEN letters are the other way round (White uppercase)
+FEN_CHARS = PIECE_CHARS.swapcase()
+FEN_TO_PIECE = {c: i for i, c in enumerate(FEN_CHARS)}
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+# Castling rights
+WHITE_KINGSIDE = 1
+WHITE_QUEENSIDE = 2
+BLACK_KINGSIDE = 4
+BLACK_QUEENSIDE = 8
+
+# Castling rights kept when a move starts or ends on a square
+CASTLE_KEEP = [15] * 64
+CASTLE_KEEP[60] = 15 ^ (WHITE_KINGSIDE | WHITE_QUEENSIDE)
+CASTLE_KEEP[63] = 15 ^ WHITE_KINGSIDE
+CASTLE_KEEP[56] = 15 ^ WHITE_QUEENSIDE
+CASTLE_KEEP[4] = 15 ^ (BLACK_KINGSIDE | BLACK_QUEENSIDE)
+CASTLE_KEEP[7] = 15 ^ BLACK_KINGSIDE
+CASTLE_KEEP[0] = 15 ^ BLACK_QUEENSIDE
+
+# Castling right -> (king square, king, rook square, rook) that must be in place for it
+CASTLING_HOMES = {
+    WHITE_KINGSIDE: (60, WHITE_KING, 63, WHITE_ROOK),
+    WHITE_QUEENSIDE: (60, WHITE_KING, 56, WHITE_ROOK),
+    BLACK_KINGSIDE: (4, BLACK_KING, 7, BLACK_ROOK),
+    BLACK_QUEENSIDE: (4, BLACK_KING, 0, BLACK_ROOK),
+}
+
+# Moves are packed into 16 bits: from square, to square << 6 and flags << 12
+QUIET = 0
+DOUBLE_PUSH = 1
+KING_CASTLE = 2
+QUEEN_CASTLE = 3
+EN_PASSANT = 4
+PROMOTION = 8  # Promotion flags are PROMOTION | (piece type - 1)
+
+NULL_MOVE = 0  # Marks a null move on the undo stack (a8 to a8 is never a real move)
+
+FULL = 0xFFFFFFFFFFFFFFFF
+MAX_PLY = 1024
+
+
+
+def square_of(row, column):
+    """
+    Convert board coordinates to a square index.
+
+    Args:
+        row: Row coordinate (0 is Black's back rank)
+        column: Column coordinate
+
+    Returns:
+        int: Square index (0-63)
+    """
+    return row * 8 + column
+
+
+def iter_bits(bb):
+    """
+    Yield the square index of every set bit of a bitboard.
+
+    Args:
+        bb: Bitboard
+
+    Yields:
+        int: Square index of each set bit, lowest first
+    """
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+
+def encode_move(start, end, flag=QUIET):
+    """
+    Pack a move into a 16-bit integer.
+
+    Args:
+        start: Square the piece moves from
+        end: Square the piece moves to
+        flag: One of the move flags (QUIET, DOUBLE_PUSH, ..., PROMOTION | n)
+
+    Returns:
+        int: Encoded move
+    """
+    return start | end << 6 | flag << 12
+
+
+def move_coordinates(move):
+    """
+    Unpack a move into board coordinates.
+
+    Args:
+        move: Encoded move
+
+    Returns:
+        tuple: (start_row, start_column, end_row, end_column)
+    """
+    start = move & 63
+    end = move >> 6 & 63
+    return start >> 3, start & 7, end >> 3, end & 7
+
+
+def square_name(square):
+    """
+    Get the algebraic name of a square.
+
+    Args:
+        square: Square index
+
+    Returns:
+        str: Square name such as 'e4'
+    """
+    return 'abcdefgh'[square & 7] + str(8 - (square >> 3))
+
+
+def move_name(move):
+    """
+    Write a move in coordinate notation.
+
+    Args:
+        move: Encoded move
+
+    Returns:
+        str: Move such as 'e2e4' or 'e7e8q' for a promotion
+    """
+    name = square_name(move & 63) + square_name(move >> 6 & 63)
+    flag = move >> 12
+    if flag & PROMOTION:
+        name += 'nbrq'[flag & 3]
+    return name
+
+
+class Position:
+    """
+    Compact chess position built on bitboards.
+
+    Besides the bitboards the position keeps a 64 entry mailbox of piece codes
+    so that the piece standing on a square can be looked up without scanning
+    the twelve bitboards.
+    """
+
+    def __init__(self):
+        """Create an empty position with White to move"""
+        self.pieces = [0] * 12  # One bitboard per piece code
+        self.occupancy = [0, 0]  # Squares occupied by White and by Black
+        self.occupied = 0  # Squares occupied by either side
+        self.squares = [EMPTY] * 64  # Piece code on every square
+        self.side = WHITE  # Side to move
+        self.castling = 0  # Castling rights bit set
+        self.ep = -1  # En passant target square or -1
+        self.halfmove = 0  # Halfmove clock for the fifty move rule
+        self.fullmove = 1  # Fullmove number
+        self.key = 0  # Zobrist key, kept up to date by put/remove/make_move
+        self.psq_score = 0  # Sum of the PSQT entries of all pieces, kept up to date by put/remove
+        self._init_stack()
+
+    def _init_stack(self):
+        # Undo records, preallocated so that make_move() does not build objects
+        self.ply = 0
+        self._moves = [0] * MAX_PLY
+        self._captured = [EMPTY] * MAX_PLY
+        self._castling = [0] * MAX_PLY
+        self._ep = [-1] * MAX_PLY
+        self._halfmove = [0] * MAX_PLY
+        self._keys = [0] * MAX_PLY
+
+    def _grow_stack(self):
+        self._moves.extend([0] * MAX_PLY)
+        self._captured.extend([EMPTY] * MAX_PLY)
+        self._castling.extend([0] * MAX_PLY)
+        self._ep.extend([-1] * MAX_PLY)
+        self._halfmove.extend([0] * MAX_PLY)
+        self._keys.extend([0] * MAX_PLY)
+
+    def copy(self):
+        """
+        Make an independent copy of this position.
+
+        Returns:
+            Position: The copy
+        """
+        other = Position.__new__(Position)
+        other.pieces = self.pieces[:]
+        other.occupancy = self.occupancy[:]
+        other.occupied = self.occupied
+        other.squares = self.squares[:]
+        other.side = self.side
+        other.castling = self.castling
+        other.ep = self.ep
+        other.halfmove = self.halfmove
+        other.fullmove = self.fullmove
+        other.key = self.key
+        other.psq_score = self.psq_score
+        other._init_stack()
+        return other
+
+    def put(self, piece, square):
+        """
+        Place a piece on an empty square.
+
+        Args:
+            piece: Piece code
+            square: Square index
+        """
+        bit = 1 << square
+        self.pieces[piece] |= bit
+        self.occupancy[piece // 6] |= bit
+        self.occupied |= bit
+        self.squares[square] = piece
+        self.key ^= PIECE_KEYS[piece << 6 | square]
+        self.psq_score += PSQT[piece << 6 | square]
+
+    def remove(self, square):
+        """
+        Remove the piece standing on a square.
+
+        Args:
+            square: Square index
+
+        Returns:
+            int: Code of the removed piece
+        """
+        piece = self.squares[square]
+        bit = 1 << square
+        self.pieces[piece] ^= bit
+        self.occupancy[piece // 6] ^= bit
+        self.occupied ^= bit
+        self.squares[square] = EMPTY
+        self.key ^= PIECE_KEYS[piece << 6 | square]
+        self.psq_score -= PSQT[piece << 6 | square]
+        return piece
+
+    def compute_key(self):
+        """
+        Compute the Zobrist key of the position from scratch.
+
+        Returns:
+            int: 64-bit Zobrist key
+        """
+        key = CASTLING_KEYS[self.castling]
+        for square in range(64):
+            piece = self.squares[square]
+            if piece != EMPTY:
+                key ^= PIECE_KEYS[piece << 6 | square]
+        if self.ep >= 0:
+            key ^= EP_KEYS[self.ep & 7]
+        if self.side == BLACK:
+            key ^= SIDE_KEY
+        return key
+
+    def king_square(self, color):
+        """
+        Get the square of a king.
+
+        Args:
+            color: WHITE or BLACK
+
+        Returns:
+            int: Square of the king, or -1 if there is none
+        """
+        return self.pieces[color * 6 + KING].bit_length() - 1
+
+    ##################
+    # Grid converters
+    ##################
+
+    @classmethod
+    def from_gametiles(cls, gametiles, side=WHITE):
+        """
+        Build a position from a board.gameTiles grid.
+
+        Castling rights are derived from the ``moved`` flags of the kings and
+        rooks and the en passant square from the ``enpassant`` flag of a pawn
+        that has just advanced two squares.
+
+        Args:
+            gametiles: 8x8 grid of Tile objects
+            side: Side to move, WHITE or BLACK
+
+        Returns:
+            Position: The equivalent position
+        """
+        pos = cls()
+        pos.side = side
+        for row in range(8):
+            for column in range(8):
+                name = gametiles[row][column].pieceonTile.tostring()
+                if name != '-':
+                    pos.put(CHAR_TO_PIECE[name], row * 8 + column)
+
+        def unmoved(row, column, name):
+            piece = gametiles[row][column].pieceonTile
+            return piece.tostring() == name and not piece.moved
+
+        if unmoved(7, 4, 'k'):
+            if unmoved(7, 7, 'r'):
+                pos.castling |= WHITE_KINGSIDE
+            if unmoved(7, 0, 'r'):
+                pos.castling |= WHITE_QUEENSIDE
+        if unmoved(0, 4, 'K'):
+            if unmoved(0, 7, 'R'):
+                pos.castling |= BLACK_KINGSIDE
+            if unmoved(0, 0, 'R'):
+                pos.castling |= BLACK_QUEENSIDE
+
+        # Only a pawn of the side that just moved can be taken en passant
+        row, name = (4, 'p') if side == BLACK else (3, 'P')
+        for column in range(8):
+            piece = gametiles[row][column].pieceonTile
+            if piece.tostring() == name and piece.enpassant:
+                pos.ep = (row + 1 if side == BLACK else row - 1) * 8 + column
+                break
+        pos.key = pos.compute_key()
+        return pos
+
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Build a position from a FEN string.
+
+        Args:
+            fen: Forsyth-Edwards Notation; the move counters may be left out
+
+        Returns:
+            Position: The described position
+
+        Raises:
+            ValueError: If the FEN string is malformed
+        """
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError("FEN needs at least 4 fields: %r" % fen)
+        rows = fields[0].split('/')
+        if len(rows) != 8:
+            raise ValueError("FEN board needs 8 rows: %r" % fen)
+        pos = cls()
+        for row, text in enumerate(rows):
+            column = 0
+            for char in text:
+                if char.isdigit():
+                    column += int(char)
+                elif char in FEN_TO_PIECE and column < 8:
+                    pos.put(FEN_TO_PIECE[char], row * 8 + column)
+                    column += 1
+                else:
+                    raise ValueError("bad FEN row %r" % text)
+            if column != 8:
+                raise ValueError("FEN row %r does not have 8 squares" % text)
+        if fields[1] not in ('w', 'b'):
+            raise ValueError("bad side to move %r" % fields[1])
+        pos.side = WHITE if fields[1] == 'w' else BLACK
+        if fields[2] != '-':
+            for char in fields[2]:
+                index = 'KQkq'.find(char)
+                if index < 0:
+                    raise ValueError("bad castling field %r" % fields[2])
+                pos.castling |= 1 << index
+            # A right whose king or rook has left its square cannot be used
+            for right, (king_square, king, rook_square, rook) in CASTLING_HOMES.items():
+                if pos.squares[king_square] != king or pos.squares[rook_square] != rook:
+                    pos.castling &= ~right
+        if fields[3] != '-':
+            if len(fields[3]) != 2 or fields[3][0] not in 'abcdefgh' or fields[3][1] not in '36':
+                raise ValueError("bad en passant square %r" % fields[3])
+            pos.ep = (8 - int(fields[3][1])) * 8 + ord(fields[3][0]) - ord('a')
+        if len(fields) > 4:
+            pos.halfmove = int(fields[4])
+        if len(fields) > 5:
+            pos.fullmove = int(fields[5])
+        pos.key = pos.compute_key()
+        return pos
+
+    def fen(self):
+        """
+        Describe this position as a FEN string.
+
+        Returns:
+            str: Forsyth-Edwards Notation of the position
+        """
+        rows = []
+        for row in range(8):
+            text = ''
+            empty = 0
+            for column in range(8):
+                code = self.squares[row * 8 + column]
+                if code == EMPTY:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                text += FEN_CHARS[code]
+            if empty:
+                text += str(empty)
+            rows.append(text)
+        castling = ''.join(char for index, char in enumerate('KQkq') if self.castling >> index & 1) or '-'
+        ep = square_name(self.ep) if self.ep >= 0 else '-'
+        return '%s %s %s %s %d %d' % ('/'.join(rows), 'wb'[self.side], castling, ep,
+                                      self.halfmove, self.fullmove)
+
+    def to_gametiles(self):
+        """
+        Build a board.gameTiles grid holding this position.
+
+        Returns:
+            list: 8x8 grid of Tile objects
+        """
+        from pieces.pawn import pawn
+        from pieces.knight import knight
+        from pieces.bishop import bishop
+        from pieces.rook import rook
+        from pieces.queen import queen
+        from pieces.king import king
+        classes = (pawn, knight, bishop, rook, queen, king)
+
+        gametiles = [[None] * 8 for _ in range(8)]
+        for square in range(64):
+            code = self.squares[square]
+            if code == EMPTY:
+                piece = nullpiece()
+            else:
+                piece = classes[code % 6](ALLIANCES[code // 6], square)
+            gametiles[square // 8][square % 8] = Tile(square, piece)
+
+        rights = self.castling
+        for square, right, name in ((63, WHITE_KINGSIDE, 'r'), (56, WHITE_QUEENSIDE, 'r'),
+                                    (7, BLACK_KINGSIDE, 'R'), (0, BLACK_QUEENSIDE, 'R')):
+            piece = gametiles[square // 8][square % 8].pieceonTile
+            if piece.tostring() == name:
+                piece.moved = not rights & right
+        for square, mask, name in ((60, WHITE_KINGSIDE | WHITE_QUEENSIDE, 'k'),
+                                   (4, BLACK_KINGSIDE | BLACK_QUEENSIDE, 'K')):
+            piece = gametiles[square // 8][square % 8].pieceonTile
+            if piece.tostring() == name:
+                piece.moved = not rights & mask
+
+        if self.ep >= 0:
+            # The pawn that just advanced two squares stands behind the target square
+            pawn_square = self.ep - 8 if self.side == BLACK else self.ep + 8
+            gametiles[pawn_square // 8][pawn_square % 8].pieceonTile.enpassant = True
+        return gametiles
+
+    ##################
+    # Attacks
+    ##################
+
+    def attacks_from(self, square):
+        """
+        Get the squares attacked by the piece standing on a square.
+
+        Args:
+            square: Square index
+
+        Returns:
+            int: Bitboard of attacked squares (own pieces included)
+        """
+        code = self.squares[square]
+        kind = code % 6
+        if kind == PAWN:
+            return PAWN_ATTACKS[code // 6][square]
+        if kind == KNIGHT:
+            return KNIGHT_ATTACKS[square]
+        if kind == KING:
+            return KING_ATTACKS[square]
+        occupied = self.occupied
+        if kind == ROOK:
+            return ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+        if kind == BISHOP:
+            return BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]]
+        return (ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+                | BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]])
+
+    def targets(self, square):
+        """
+        Get the pseudo-legal target squares of the piece on a square.
+
+        Castling and en passant are not included, matching the legalmoveb()
+        methods of the piece classes.
+
+        Args:
+            square: Square index
+
+        Returns:
+            int: Bitboard of target squares
+        """
+        code = self.squares[square]
+        color = code // 6
+        if code % 6 != PAWN:
+            return self.attacks_from(square) & ~self.occupancy[color]
+        bb = self.attacks_from(square) & self.occupancy[color ^ 1]
+        step = -8 if color == WHITE else 8
+        one = square + step
+        if 0 <= one < 64 and not self.occupied >> one & 1:
+            bb |= 1 << one
+            start_row = 6 if color == WHITE else 1
+            two = one + step
+            if square // 8 == start_row and not self.occupied >> two & 1:
+                bb |= 1 << two
+        return bb
+
+    def legalmoveb(self, square):
+        """
+        Get the target squares of a piece in the format of the piece classes.
+
+        Args:
+            square: Square index
+
+        Returns:
+            list: List of [row, column] coordinates
+        """
+        return [COORDINATES[s] for s in iter_bits(self.targets(square))]
+
+    def is_square_attacked(self, square, by_color):
+        """
+        Check whether a side attacks a square.
+
+        Works backwards from the square: a piece of by_color attacks it exactly
+        when a piece of the same kind standing on the square would attack that
+        piece, so one table lookup per piece kind answers the question.
+
+        Args:
+            square: Square index
+            by_color: Color of the attacking side
+
+        Returns:
+            bool: True if any piece of by_color attacks the square
+        """
+        pieces = self.pieces
+        base = by_color * 6
+        if PAWN_ATTACKS[by_color ^ 1][square] & pieces[base + PAWN]:
+            return True
+        if KNIGHT_ATTACKS[square] & pieces[base + KNIGHT]:
+            return True
+        if KING_ATTACKS[square] & pieces[base + KING]:
+            return True
+        occupied = self.occupied
+        queens = pieces[base + QUEEN]
+        if ROOK_TABLES[square][occupied & ROOK_MASKS[square]] & (pieces[base + ROOK] | queens):
+            return True
+        return BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]] & (pieces[base + BISHOP] | queens) != 0
+
+    def attackers(self, square, color):
+        """
+        Find the pieces of one side that attack a square.
+
+        Args:
+            square: Square index
+            color: Color of the attacking side
+
+        Returns:
+            int: Bitboard of attacking pieces
+        """
+        pieces = self.pieces
+        base = color * 6
+        occupied = self.occupied
+        queens = pieces[base + QUEEN]
+        return ((PAWN_ATTACKS[color ^ 1][square] & pieces[base + PAWN])
+                | (KNIGHT_ATTACKS[square] & pieces[base + KNIGHT])
+                | (KING_ATTACKS[square] & pieces[base + KING])
+                | (ROOK_TABLES[square][occupied & ROOK_MASKS[square]] & (pieces[base + ROOK] | queens))
+                | (BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]] & (pieces[base + BISHOP] | queens)))
+
+    def in_check(self, color):
+        """
+        Check whether the king of a side is attacked.
+
+        Args:
+            color: WHITE or BLACK
+
+        Returns:
+            bool: True if the king is in check
+        """
+        king = self.pieces[color * 6 + KING]
+        return king != 0 and self.is_square_attacked(king.bit_length() - 1, color ^ 1)
+
+    def checkb(self):
+        """
+        Same result as move.checkb() for this position.
+
+        Returns:
+            list: ["checked", [row, column]] of a checking piece or ["notchecked"]
+        """
+        return self._check(BLACK)
+
+    def checkw(self):
+        """
+        Same result as move.checkw() for this position.
+
+        Returns:
+            list: ["checked", [row, column]] of a checking piece or ["notchecked"]
+        """
+        return self._check(WHITE)
+
+    def _check(self, color):
+        king = self.king_square(color)
+        if king >= 0:
+            bb = self.attackers(king, color ^ 1)
+            if bb:
+                s = (bb & -bb).bit_length() - 1
+                return ["checked", [s >> 3, s & 7]]
+        return ["notchecked"]
+
+    ##################
+    # Make / unmake
+    ##################
+
+    def make_move(self, move):
+        """
+        Play a move and push its undo record.
+
+        Args:
+            move: Encoded move, assumed to be pseudo-legal
+        """
+        start = move & 63
+        end = move >> 6 & 63
+        flag = move >> 12
+        color = self.side
+        squares = self.squares
+
+        ply = self.ply
+        if ply == len(self._moves):
+            self._grow_stack()
+        self._moves[ply] = move
+        self._castling[ply] = self.castling
+        self._ep[ply] = self.ep
+        self._halfmove[ply] = self.halfmove
+        self._keys[ply] = self.key
+        self.ply = ply + 1
+
+        if flag == EN_PASSANT:
+            captured = self.remove(end + 8 if color == WHITE else end - 8)
+        elif squares[end] != EMPTY:
+            captured = self.remove(end)
+        else:
+            captured = EMPTY
+        self._captured[ply] = captured
+
+        piece = self.remove(start)
+        if flag & PROMOTION:
+            piece = color * 6 + (flag & 3) + KNIGHT
+        self.put(piece, end)
+
+        if flag == KING_CASTLE:
+            self.put(self.remove(end + 1), end - 1)
+        elif flag == QUEEN_CASTLE:
+            self.put(self.remove(end - 2), end + 1)
+
+        key = self.key ^ SIDE_KEY ^ CASTLING_KEYS[self.castling]
+        self.castling &= CASTLE_KEEP[start] & CASTLE_KEEP[end]
+        key ^= CASTLING_KEYS[self.castling]
+        if self.ep >= 0:
+            key ^= EP_KEYS[self.ep & 7]
+        if flag == DOUBLE_PUSH:
+            self.ep = (start + end) >> 1
+            key ^= EP_KEYS[self.ep & 7]
+        else:
+            self.ep = -1
+        self.key = key
+        if captured != EMPTY or piece % 6 == PAWN or flag & PROMOTION:  # piece is already the promoted one
+            self.halfmove = 0
+        else:
+            self.halfmove += 1
+        if color == BLACK:
+            self.fullmove += 1
+        self.side = color ^ 1
+
+    def make_null_move(self):
+        """
+        Pass the turn to the other side without moving, for null-move pruning.
+
+        Taken back with unmake_move() like any other move.
+        """
+        ply = self.ply
+        if ply == len(self._moves):
+            self._grow_stack()
+        self._moves[ply] = NULL_MOVE
+        self._ep[ply] = self.ep
+        self._keys[ply] = self.key
+        self.ply = ply + 1
+        key = self.key ^ SIDE_KEY
+        if self.ep >= 0:
+            key ^= EP_KEYS[self.ep & 7]
+            self.ep = -1
+        self.key = key
+        self.side ^= 1
+
+    def unmake_move(self):
+        """Take back the last move played with make_move() or make_null_move()"""
+        ply = self.ply - 1
+        self.ply = ply
+        move = self._moves[ply]
+        if move == NULL_MOVE:
+            self.side ^= 1
+            self.ep = self._ep[ply]
+            self.key = self._keys[ply]
+            return
+        start = move & 63
+        end = move >> 6 & 63
+        flag = move >> 12
+        color = self.side ^ 1
+        self.side = color
+
+        piece = self.remove(end)
+        if flag & PROMOTION:
+            piece = color * 6 + PAWN
+        self.put(piece, start)
+
+        captured = self._captured[ply]
+        if flag == EN_PASSANT:
+            self.put(captured, end + 8 if color == WHITE else end - 8)
+        elif captured != EMPTY:
+            self.put(captured, end)
+        elif flag == KING_CASTLE:
+            self.put(self.remove(end - 1), end + 1)
+        elif flag == QUEEN_CASTLE:
+            self.put(self.remove(end + 1), end - 2)
+
+        self.castling = self._castling[ply]
+        self.ep = self._ep[ply]
+        self.halfmove = self._halfmove[ply]
+        self.key = self._keys[ply]
+        if color == BLACK:
+            self.fullmove -= 1
+
+    ##################
+    # Move generation
+    ##################
+
+    def pseudo_moves(self):
+        """
+        Generate the pseudo-legal moves of the side to move.
+
+        Returns:
+            list: Encoded moves, including castling, en passant and promotions
+        """
+        color = self.side
+        own = self.occupancy[color]
+        enemy = self.occupancy[color ^ 1]
+        squares = self.squares
+        moves = []
+        for start in iter_bits(own):
+            if squares[start] % 6 == PAWN:
+                self._pawn_moves(start, color, enemy, moves)
+                continue
+            for end in iter_bits(self.attacks_from(start) & ~own):
+                moves.append(start | end << 6)
+        self._castling_moves(color, moves)
+        return moves
+
+    def _pawn_moves(self, start, color, enemy, moves):
+        step = -8 if color == WHITE else 8
+        last_row = 0 if color == WHITE else 7
+        attacks = self.attacks_from(start)
+        ends = attacks & enemy
+        one = start + step
+        if not self.occupied >> one & 1:
+            ends |= 1 << one
+            two = one + step
+            if start >> 3 == (6 if color == WHITE else 1) and not self.occupied >> two & 1:
+                moves.append(start | two << 6 | DOUBLE_PUSH << 12)
+        for end in iter_bits(ends):
+            if end >> 3 == last_row:
+                for promotion in (PROMOTION | 3, PROMOTION | 2, PROMOTION | 1, PROMOTION):
+                    moves.append(start | end << 6 | promotion << 12)
+            else:
+                moves.append(start | end << 6)
+        if self.ep >= 0 and attacks >> self.ep & 1:
+            moves.append(start | self.ep << 6 | EN_PASSANT << 12)
+
+    def _castling_moves(self, color, moves):
+        if color == WHITE:
+            king, kingside, queenside = 60, WHITE_KINGSIDE, WHITE_QUEENSIDE
+        else:
+            king, kingside, queenside = 4, BLACK_KINGSIDE, BLACK_QUEENSIDE
+        if not self.castling & (kingside | queenside):
+            return
+        enemy = color ^ 1
+        occupied = self.occupied
+        attacked = self.is_square_attacked
+        if attacked(king, enemy):
+            return
+        if (self.castling & kingside and not occupied >> (king + 1) & 3
+                and not attacked(king + 1, enemy) and not attacked(king + 2, enemy)):
+            moves.append(king | (king + 2) << 6 | KING_CASTLE << 12)
+        if (self.castling & queenside and not occupied >> (king - 3) & 7
+                and not attacked(king - 1, enemy) and not attacked(king - 2, enemy)):
+            moves.append(king | (king - 2) << 6 | QUEEN_CASTLE << 12)
+
+    def legal_moves(self):
+        """
+        Generate the legal moves of the side to move.
+
+        Returns:
+            list: Encoded moves that do not leave the own king in check
+        """
+        from board.movegen import legal_moves  # board.movegen imports this module
+        return legal_moves(self)
+
+    def printboard(self):
+        """Print the position to the console in the style of board.printboard()"""
+        for row in range(8):
+            for column in range(8):
+                code = self.squares[row * 8 + column]
+                print('|', end='-' if code == EMPTY else PIECE_CHARS[code])
+            print("|", end='\n')
@@ -7,6 +7,7 @@ from pieces.rook import rook  # Import rook piece
 from pieces.bishop import bishop  # Import bishop piece
 from pieces.king import king  # Import king piece
 from pieces.knight import knight  # Import knight piece
+from board.bitboard import Position, ALLIANCES  # FEN parsing and serialization
 
 class board:
     # Initialize 8x8 game board with empty tiles
@@ -14,7 +15,9 @@ class board:
 
     def __init__(self):
         """Initialize the chess board"""
-        pass
+        self.sidetomove = "White"  # Alliance whose turn it is
+        self.halfmove = 0  # Halfmove clock for the fifty move rule
+        self.fullmove = 1  # Fullmove number
 
     def createboard(self):
         """Create the initial chess board setup"""
@@ -54,6 +57,100 @@ class board:
         self.gameTiles[7][6] = Tile(62, knight("White", 62))  # White knight
         self.gameTiles[7][7] = Tile(63, rook("White", 63))  # White rook
 
+        # Reset the game state that is not stored on the tiles
+        self.sidetomove = "White"
+        self.halfmove = 0
+        self.fullmove = 1
+
+    def makemove(self, y, x, n, m, promoted=None):
+        """
+        Play a move on the tiles and advance the side to move and move counters.
+
+        Besides moving the piece this moves the rook of a castling king,
+        removes a pawn taken en passant, sets the moved flag of kings and
+        rooks and flags a pawn that advances two squares as capturable en
+        passant for one move.
+
+        Args:
+            y, x: Row and column of the piece to move
+            n, m: Row and column of the target square
+            promoted: Piece class (queen, rook, bishop or knight) of a pawn
+                reaching the last row, queen if None
+        """
+        piece = self.gameTiles[y][x].pieceonTile
+        name = piece.tostring()
+        target = self.gameTiles[n][m].pieceonTile.tostring()
+        resetclock = name in ('p', 'P') or target != '-'  # Pawn moves and captures reset the fifty move count
+
+        # The last double step can only be answered now, so its flag goes
+        for rows in (3, 4):
+            for column in range(8):
+                if self.gameTiles[rows][column].pieceonTile.tostring() in ('p', 'P'):
+                    self.gameTiles[rows][column].pieceonTile.enpassant = False
+
+        if name in ('k', 'K', 'r', 'R'):
+            piece.moved = True
+
+        # Castling: the rook jumps over the king
+        if name in ('k', 'K') and abs(m - x) == 2:
+            rookcolumn, rooktarget = (7, x + 1) if m > x else (0, x - 1)
+            self.gameTiles[y][rooktarget].pieceonTile = self.gameTiles[y][rookcolumn].pieceonTile
+            self.gameTiles[y][rooktarget].pieceonTile.position = y * 8 + rooktarget
+            self.gameTiles[y][rookcolumn].pieceonTile = nullpiece()
+
+        if name in ('p', 'P'):
+            # En passant: a diagonal step to an empty square takes the pawn beside
+            if m != x and target == '-':
+                self.gameTiles[y][m].pieceonTile = nullpiece()
+            if abs(n - y) == 2:
+                piece.enpassant = True
+            if n in (0, 7):
+                piece = (promoted or queen)(piece.alliance, n * 8 + m)
+
+        self.gameTiles[n][m].pieceonTile = piece
+        self.gameTiles[y][x].pieceonTile = nullpiece()
+        piece.position = n * 8 + m
+
+        self.halfmove = 0 if resetclock else self.halfmove + 1
+        if piece.alliance == "Black":
+            self.fullmove = self.fullmove + 1
+        self.sidetomove = "Black" if piece.alliance == "White" else "White"
+
+    def loadfen(self, fen):
+        """
+        Set up the board from a FEN string.
+
+        Castling rights become the moved flags of the kings and rooks and the
+        en passant square the enpassant flag of the pawn that just advanced.
+        The tiles are replaced in place, so every holder of gameTiles sees
+        the new position.
+
+        Args:
+            fen: Forsyth-Edwards Notation; the move counters may be left out
+
+        Raises:
+            ValueError: If the FEN string is malformed
+        """
+        position = Position.from_fen(fen)
+        tiles = position.to_gametiles()
+        for rows in range(8):
+            self.gameTiles[rows][:] = tiles[rows]
+        self.sidetomove = ALLIANCES[position.side]
+        self.halfmove = position.halfmove
+        self.fullmove = position.fullmove
+
+    def tofen(self):
+        """
+        Describe the board as a FEN string.
+
+        Returns:
+            str: Forsyth-Edwards Notation of the board and its game state
+        """
+        position = Position.from_gametiles(self.gameTiles, ALLIANCES.index(self.sidetomove))
+        position.halfmove = self.halfmove
+        position.fullmove = self.fullmove
+        return position.fen()
+
     def printboard(self):
         """Print the current state of the board to console"""
         count = 0  # Initialize counter
@@ -2,19 +2,120 @@ from pieces.nullpiece import nullpiece
 from pieces.pawn import pawn
 from pieces.rook import rook
 from pieces.king import king
+from board.bitboard import Position
+from board.attack_tables import WHITE, BLACK, KNIGHT_TARGETS, KING_TARGETS, PAWN_CAPTURE_TARGETS
+from board.sliders import RAY_TARGETS
+from board.movegen import legal_moves
+
+# Rays on which a rook or queen (first four) or a bishop or queen (last four) attacks
+_ROOK_DIRECTIONS = (0, 1, 2, 3)
+_BISHOP_DIRECTIONS = (4, 5, 6, 7)
+
+
+def square_attackers(gametiles, square, alliance):
+    """
+    Find the pieces of one side that attack a square of a gameTiles grid.
+
+    Works backwards from the square along the precomputed rays and the knight,
+    king and pawn patterns instead of generating the moves of every piece.
+
+    Args:
+        gametiles: 8x8 grid of Tile objects
+        square: Square index (row * 8 + column)
+        alliance: 'White' or 'Black', the attacking side
+
+    Returns:
+        list: Squares of the attacking pieces, in ascending order
+    """
+    if alliance == 'White':
+        pawn, knight, bishop, rook, queen, king_char = 'p', 'n', 'b', 'r', 'q', 'k'
+        pawn_color = BLACK  # A White pawn attacks the square from where a Black pawn on it would capture
+    else:
+        pawn, knight, bishop, rook, queen, king_char = 'P', 'N', 'B', 'R', 'Q', 'K'
+        pawn_color = WHITE
+    found = []
+    for targets, kinds in ((PAWN_CAPTURE_TARGETS[pawn_color][square], (pawn,)),
+                           (KNIGHT_TARGETS[square], (knight,)),
+                           (KING_TARGETS[square], (king_char,))):
+        for row, column in targets:
+            if gametiles[row][column].pieceonTile.tostring() in kinds:
+                found.append(row * 8 + column)
+    for directions, kinds in ((_ROOK_DIRECTIONS, (rook, queen)), (_BISHOP_DIRECTIONS, (bishop, queen))):
+        for direction in directions:
+            for row, column in RAY_TARGETS[direction][square]:
+                piece = gametiles[row][column].pieceonTile.tostring()
+                if piece == '-':
+                    continue
+                if piece in kinds:
+                    found.append(row * 8 + column)
+                break
+    found.sort()
+    return found
+
+
+# Home squares of the kings, checked first so the board is only scanned after the king moved
+_KING_HOMES = {'k': 60, 'K': 4}
+
+
+def _king_square(gametiles, king_char):
+    square = _KING_HOMES[king_char]
+    if gametiles[square // 8][square % 8].pieceonTile.tostring() == king_char:
+        return square
+    for m in range(8):
+        for k in range(8):
+            if gametiles[m][k].pieceonTile.tostring() == king_char:
+                return m * 8 + k
+    return 0  # The old full-board scan also looked at [0, 0] when there was no king
+
+
+def _grid_check(gametiles, king_char, alliance):
+    found = square_attackers(gametiles, _king_square(gametiles, king_char), alliance)
+    if found:
+        return ["checked", [found[0] // 8, found[0] % 8]]
+    return ["notchecked"]
+
+
+def _legal_ends(gametiles, color):
+    # Legal moves of one side as {start square: bitboard of end squares}
+    ends = {}
+    for encoded in legal_moves(Position.from_gametiles(gametiles, color)):
+        start = encoded & 63
+        ends[start] = ends.get(start, 0) | 1 << (encoded >> 6 & 63)
+    return ends
+
+
+def _legal_targets(gametiles, moves, y, x, color):
+    ends = _legal_ends(gametiles, color).get(y * 8 + x, 0)
+    return [target for target in moves if ends >> (target[0] * 8 + target[1]) & 1]
+
+
+def _moves_if_checked(gametiles, alliance, color):
+    ends = _legal_ends(gametiles, color)
+    movi = []
+    for m in range(8):
+        for k in range(8):
+            piece = gametiles[m][k].pieceonTile
+            if piece.alliance == alliance and m * 8 + k in ends:
+                legal = ends[m * 8 + k]
+                for target in piece.legalmoveb(gametiles):
+                    if legal >> (target[0] * 8 + target[1]) & 1:
+                        movi.append([m, k, target[0], target[1]])
+    return movi
 
 
 class move:
     """Represents a chess move from one position to another"""
 
-    def __init__(self, start, end, board):
+    def __init__(self, start=None, end=None, board=None):
         """
         Initialize a move
         Args:
             start (int): Starting position index
             end (int): Ending position index
-            board: The chess board
+            board: The chess board (None for a plain move handler)
         """
+        if board is None:  # Used as a move handler for checkb/pinnedb/...
+            return
         self.start = start  # Store starting position
         self.end = end  # Store ending position
         self.board = board  # Store reference to board
@@ -145,21 +246,9 @@ class move:
         return False  # King not found or not in checkmate
 
     def checkb(self,gametiles):
-        x=0
-        y=0
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.tostring()=='K'):
-                    x=m
-                    y=k
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.alliance=='White'):
-                    moves=gametiles[m][k].pieceonTile.legalmoveb(gametiles)
-                    for move in moves:
-                        if(move[0]==x and move[1]==y):
-                            return["checked",[m,k]]
-        return["notchecked"]
+        if isinstance(gametiles, Position):
+            return gametiles.checkb()
+        return _grid_check(gametiles, 'K', 'White')
 
     def updateposition(self,x,y):
         a=x*8
@@ -167,84 +256,24 @@ class move:
         return b
 
     def movesifcheckedb(self,gametiles):
-        movi=[]
-        piece=None
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.alliance=='Black'):
-                    moves=gametiles[m][k].pieceonTile.legalmoveb(gametiles)
-                    for move in moves:
-                        x=move[0]
-                        y=move[1]
-                        piece=gametiles[x][y].pieceonTile
-                        gametiles[x][y].pieceonTile=gametiles[m][k].pieceonTile
-                        gametiles[m][k].pieceonTile=nullpiece()
-                        s=self.updateposition(x,y)
-                        gametiles[x][y].pieceonTile.position=s
-                        if(self.checkb(gametiles)[0]=='notchecked'):
-                            movi.append([m,k,x,y])
-                            gametiles[m][k].pieceonTile=gametiles[x][y].pieceonTile
-                            gametiles[x][y].pieceonTile=piece
-                            s=self.updateposition(m,k)
-                            gametiles[m][k].pieceonTile.position=s
-                        else:
-                            gametiles[m][k].pieceonTile=gametiles[x][y].pieceonTile
-                            gametiles[x][y].pieceonTile=piece
-                            s=self.updateposition(m,k)
-                            gametiles[m][k].pieceonTile.position=s
-
-
-        return movi
+        """
+        All legal moves of Black as [row, column, new row, new column].
+
+        Pins, checks and double checks are resolved once per position by
+        board.movegen instead of trying every move on the grid.
+        """
+        return _moves_if_checked(gametiles, 'Black', BLACK)
 
     def checkw(self,gametiles):
-        x=0
-        y=0
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.tostring()=='k'):
-                    x=m
-                    y=k
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.alliance=='Black'):
-                    moves=gametiles[m][k].pieceonTile.legalmoveb(gametiles)
-                    if moves==None:
-                        print(m)
-                        print(k)
-                    for move in moves:
-                        if(move[0]==x and move[1]==y):
-                            return["checked",[m,k]]
-        return["notchecked"]
+        if isinstance(gametiles, Position):
+            return gametiles.checkw()
+        return _grid_check(gametiles, 'k', 'Black')
 
     def movesifcheckedw(self,gametiles):
-        movi=[]
-        piece=None
-        for m in range(8):
-            for k in range(8):
-                if(gametiles[m][k].pieceonTile.alliance=='White'):
-                    moves=gametiles[m][k].pieceonTile.legalmoveb(gametiles)
-                    for move in moves:
-                        x=move[0]
-                        y=move[1]
-                        piece=gametiles[x][y].pieceonTile
-                        gametiles[x][y].pieceonTile=gametiles[m][k].pieceonTile
-                        gametiles[m][k].pieceonTile=nullpiece()
-                        s=self.updateposition(x,y)
-                        gametiles[x][y].pieceonTile.position=s
-                        if(self.checkw(gametiles)[0]=='notchecked'):
-                            movi.append([m,k,x,y])
-                            gametiles[m][k].pieceonTile=gametiles[x][y].pieceonTile
-                            gametiles[x][y].pieceonTile=piece
-                            s=self.updateposition(m,k)
-                            gametiles[m][k].pieceonTile.position=s
-                        else:
-                            gametiles[m][k].pieceonTile=gametiles[x][y].pieceonTile
-                            gametiles[x][y].pieceonTile=piece
-                            s=self.updateposition(m,k)
-                            gametiles[m][k].pieceonTile.position=s
-
-
-        return movi
+        """
+        All legal moves of White as [row, column, new row, new column].
+        """
+        return _moves_if_checked(gametiles, 'White', WHITE)
 
     def castlingb(self,gametiles):
         array=[]
@@ -303,36 +332,35 @@ class move:
 
 
     def pinnedb(self,gametiles,moves,y,x):
-        movi=[]
-        piece1=None
-        for move in moves:
-            m=move[0]
-            k=move[1]
-            piece1=gametiles[m][k].pieceonTile
-            gametiles[m][k].pieceonTile=gametiles[y][x].pieceonTile
-            gametiles[y][x].pieceonTile=nullpiece()
-            if(self.checkb(gametiles)[0]=='notchecked'):
-                movi.append(move)
-            gametiles[y][x].pieceonTile=gametiles[m][k].pieceonTile
-            gametiles[m][k].pieceonTile=piece1
-
-        return movi
+        """
+        Keep the target squares of the Black piece on [y, x] that are legal.
+
+        Args:
+            gametiles: 8x8 grid of Tile objects
+            moves: Candidate targets as [row, column]
+            y: Row of the piece
+            x: Column of the piece
+
+        Returns:
+            list: The legal targets of moves, in the same order
+        """
+        return _legal_targets(gametiles, moves, y, x, BLACK)
 
     def pinnedw(self,gametiles,moves,y,x):
-        movi=[]
-        piece1=None
-        for move in moves:
-            m=move[0]
-            k=move[1]
-            piece1=gametiles[m][k].pieceonTile
-            gametiles[m][k].pieceonTile=gametiles[y][x].pieceonTile
-            gametiles[y][x].pieceonTile=nullpiece()
-            if(self.checkw(gametiles)[0]=='notchecked'):
-                movi.append(move)
-            gametiles[y][x].pieceonTile=gametiles[m][k].pieceonTile
-            gametiles[m][k].pieceonTile=piece1
-
-        return movi
+        """
+        Keep the target squares of the White piece on [y, x] that are legal.
+
+        Args:
+            gametiles: 8x8 grid of Tile objects
+            moves: Candidate targets as [row, column]
+            y: Row of the piece
+            x: Column of the piece
+
+        Returns:
+            list: The legal targets of moves, in the same order
+        """
+        return _legal_targets(gametiles, moves, y, x, WHITE)
+
 
 
 
@@ -0,0 +1,341 @@
+"""
+Legal move generation with pin rays and check masks.
+
+Instead of playing every pseudo-legal move and testing whether the own king
+is left in check, the position is analysed once:
+
+* the pieces giving check: in double check only the king may move, in single
+  check every other move must capture the checker or block its ray (the
+  check mask);
+* the pinned pieces, each with the ray between the king and the pinning
+  slider that it may not leave;
+* king moves are tested with the king taken off the board, so it cannot step
+  back along the ray of a slider that checks it.
+
+En passant removes two pawns from the same row at once, which a pin ray does
+not describe, so it is tested directly for a discovered slider check.
+
+generate_legal_moves() is the single entry point for every rule, castling
+and en passant included. Moves are 16-bit integers (see board.bitboard):
+from square | to square << 6 | flag << 12, where the flag is QUIET,
+DOUBLE_PUSH, KING_CASTLE, QUEEN_CASTLE, EN_PASSANT or PROMOTION | piece
+type - 1. They are written into a MoveList, a preallocated array('H') that
+can be reused from one call to the next.
+"""
+
+from array import array
+
+from board.bitboard import (WHITE, PAWN, BISHOP, ROOK, QUEEN, KING, KNIGHT, DOUBLE_PUSH,
+                            KING_CASTLE, QUEEN_CASTLE, EN_PASSANT, PROMOTION, WHITE_KINGSIDE,
+                            WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE, iter_bits, move_name)
+from board.attack_tables import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS
+from board.sliders import ROOK_TABLES, ROOK_MASKS, BISHOP_TABLES, BISHOP_MASKS, BETWEEN
+
+FULL = (1 << 64) - 1
+MAX_MOVES = 256  # No legal position has more than 218 moves
+# Promotion flags, queen first
+PROMOTIONS = (PROMOTION | 3, PROMOTION | 2, PROMOTION | 1, PROMOTION)
+
+
+
+class MoveList:
+    """
+    Preallocated buffer of encoded moves.
+
+    Attributes:
+        moves: array('H') of MAX_MOVES entries, only the first count are valid
+        count: Number of moves in the buffer
+    """
+
+    __slots__ = ('moves', 'count')
+
+    def __init__(self):
+        self.moves = array('H', bytes(2 * MAX_MOVES))
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError("move index out of range")
+        return self.moves[index % self.count]
+
+    def __iter__(self):
+        return iter(memoryview(self.moves)[:self.count])
+
+    def __contains__(self, move):
+        moves = self.moves
+        for index in range(self.count):
+            if moves[index] == move:
+                return True
+        return False
+
+    def tolist(self):
+        """
+        Copy the moves out of the buffer.
+
+        Returns:
+            list: Encoded moves
+        """
+        return self.moves[:self.count].tolist()
+
+    def coordinates(self):
+        """
+        Get the moves in the [row, column, new row, new column] format of the grid code.
+
+        Returns:
+            list: One list per move; promotions appear once per promotion piece
+        """
+        moves = self.moves
+        return [[moves[index] >> 3 & 7, moves[index] & 7, moves[index] >> 9 & 7, moves[index] >> 6 & 7]
+                for index in range(self.count)]
+
+    def targets(self, square):
+        """
+        Get the end squares of the moves that start on a square.
+
+        Args:
+            square: Start square index
+
+        Returns:
+            list: [row, column] of every end square, each listed once
+        """
+        moves = self.moves
+        ends = []
+        for index in range(self.count):
+            move = moves[index]
+            if move & 63 == square:
+                end = [move >> 9 & 7, move >> 6 & 7]
+                if end not in ends:
+                    ends.append(end)
+        return ends
+
+
+def attacked(pieces, square, by_color, occupied):
+    """
+    Check whether a side attacks a square for a given occupancy.
+
+    Args:
+        pieces: Piece bitboards of a Position
+        square: Square index
+        by_color: Color of the attacking side
+        occupied: Bitboard of the pieces that block sliders
+
+    Returns:
+        bool: True if any piece of by_color attacks the square
+    """
+    base = by_color * 6
+    if PAWN_ATTACKS[by_color ^ 1][square] & pieces[base + PAWN]:
+        return True
+    if KNIGHT_ATTACKS[square] & pieces[base + KNIGHT]:
+        return True
+    if KING_ATTACKS[square] & pieces[base + KING]:
+        return True
+    queens = pieces[base + QUEEN]
+    if ROOK_TABLES[square][occupied & ROOK_MASKS[square]] & (pieces[base + ROOK] | queens):
+        return True
+    return BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]] & (pieces[base + BISHOP] | queens) != 0
+
+
+def pin_rays(position, color):
+    """
+    Find the pinned pieces of a side.
+
+    Args:
+        position: board.bitboard.Position
+        color: Side whose pieces may be pinned
+
+    Returns:
+        dict: Square of every pinned piece -> bitboard of the squares it may move to
+              (the ray between king and pinner, pinner included)
+    """
+    pieces = position.pieces
+    king = pieces[color * 6 + KING].bit_length() - 1
+    base = (color ^ 1) * 6
+    queens = pieces[base + QUEEN]
+    # Sliders that would attack the king on an empty board
+    snipers = ((ROOK_TABLES[king][0] & (pieces[base + ROOK] | queens))
+               | (BISHOP_TABLES[king][0] & (pieces[base + BISHOP] | queens)))
+    own = position.occupancy[color]
+    occupied = position.occupied
+    pinned = {}
+    for sniper in iter_bits(snipers):
+        ray = BETWEEN[king][sniper]
+        blockers = ray & occupied
+        if blockers and not blockers & (blockers - 1) and blockers & own:
+            pinned[blockers.bit_length() - 1] = ray | 1 << sniper
+    return pinned
+
+
+def generate_legal_moves(position, moves=None):
+    """
+    Generate the legal moves of the side to move.
+
+    Args:
+        position: board.bitboard.Position
+        moves: MoveList to fill, a new one is allocated if None
+
+    Returns:
+        MoveList: Encoded moves, including castling, en passant and promotions
+    """
+    if moves is None:
+        moves = MoveList()
+    buffer = moves.moves
+    color = position.side
+    enemy = color ^ 1
+    pieces = position.pieces
+    king_bb = pieces[color * 6 + KING]
+    own = position.occupancy[color]
+    occupied = position.occupied
+    n = 0
+    if not king_bb:  # Nothing to leave in check
+        for move in position.pseudo_moves():
+            buffer[n] = move
+            n += 1
+        moves.count = n
+        return moves
+    king = king_bb.bit_length() - 1
+
+    without_king = occupied ^ king_bb
+    for end in iter_bits(KING_ATTACKS[king] & ~own):
+        if not attacked(pieces, end, enemy, without_king):
+            buffer[n] = king | end << 6
+            n += 1
+
+    checkers = position.attackers(king, enemy)
+    if checkers & (checkers - 1):  # Double check, only the king can move
+        moves.count = n
+        return moves
+    if checkers:
+        mask = checkers | BETWEEN[king][checkers.bit_length() - 1]
+    else:
+        mask = FULL
+        n = _castling_moves(position, color, king, buffer, n)
+
+    pinned = pin_rays(position, color)
+    their = position.occupancy[enemy]
+    squares = position.squares
+    base = color * 6
+    for start in iter_bits(own ^ king_bb):
+        allowed = mask & pinned[start] if start in pinned else mask
+        kind = squares[start] - base
+        if kind == PAWN:
+            n = _pawn_moves(position, start, color, their, allowed, mask, buffer, n)
+            continue
+        if kind == KNIGHT:
+            attacks = KNIGHT_ATTACKS[start]
+        elif kind == BISHOP:
+            attacks = BISHOP_TABLES[start][occupied & BISHOP_MASKS[start]]
+        elif kind == ROOK:
+            attacks = ROOK_TABLES[start][occupied & ROOK_MASKS[start]]
+        else:
+            attacks = (ROOK_TABLES[start][occupied & ROOK_MASKS[start]]
+                       | BISHOP_TABLES[start][occupied & BISHOP_MASKS[start]])
+        for end in iter_bits(attacks & ~own & allowed):
+            buffer[n] = start | end << 6
+            n += 1
+    moves.count = n
+    return moves
+
+
+def legal_moves(position):
+    """
+    Generate the legal moves of the side to move as a list.
+
+    Args:
+        position: board.bitboard.Position
+
+    Returns:
+        list: Encoded moves, including castling, en passant and promotions
+    """
+    return generate_legal_moves(position).tolist()
+
+
+def parse_move(position, name):
+    """
+    Find the legal move written in coordinate notation.
+
+    Args:
+        position: board.bitboard.Position
+        name: Move such as 'e2e4', 'e1g1' for castling or 'e7e8q' for a promotion
+
+    Returns:
+        int: Encoded move
+
+    Raises:
+        ValueError: If no legal move of the side to move has that name
+    """
+    name = name.lower()
+    for move in generate_legal_moves(position):
+        if move_name(move) == name:
+            return move
+    raise ValueError("illegal move %r" % name)
+
+
+def _castling_moves(position, color, king, buffer, n):
+    # Only called when the king is not in check
+    if color == WHITE:
+        kingside, queenside = WHITE_KINGSIDE, WHITE_QUEENSIDE
+    else:
+        kingside, queenside = BLACK_KINGSIDE, BLACK_QUEENSIDE
+    castling = position.castling
+    if not castling & (kingside | queenside):
+        return n
+    pieces = position.pieces
+    occupied = position.occupied
+    enemy = color ^ 1
+    rooks = pieces[color * 6 + ROOK]
+    if (castling & kingside and rooks >> (king + 3) & 1 and not occupied >> (king + 1) & 3
+            and not attacked(pieces, king + 1, enemy, occupied) and not attacked(pieces, king + 2, enemy, occupied)):
+        buffer[n] = king | (king + 2) << 6 | KING_CASTLE << 12
+        n += 1
+    if (castling & queenside and rooks >> (king - 4) & 1 and not occupied >> (king - 3) & 7
+            and not attacked(pieces, king - 1, enemy, occupied) and not attacked(pieces, king - 2, enemy, occupied)):
+        buffer[n] = king | (king - 2) << 6 | QUEEN_CASTLE << 12
+        n += 1
+    return n
+
+
+def _pawn_moves(position, start, color, their, allowed, mask, buffer, n):
+    occupied = position.occupied
+    step = -8 if color == WHITE else 8
+    last_row = 0 if color == WHITE else 7
+    attacks = PAWN_ATTACKS[color][start]
+    ends = attacks & their
+    one = start + step
+    if not occupied >> one & 1:
+        ends |= 1 << one
+        two = one + step
+        if (start >> 3 == (6 if color == WHITE else 1) and not occupied >> two & 1
+                and allowed >> two & 1):
+            buffer[n] = start | two << 6 | DOUBLE_PUSH << 12
+            n += 1
+    for end in iter_bits(ends & allowed):
+        if end >> 3 == last_row:
+            for promotion in PROMOTIONS:
+                buffer[n] = start | end << 6 | promotion << 12
+                n += 1
+        else:
+            buffer[n] = start | end << 6
+            n += 1
+    ep = position.ep
+    if ep >= 0 and attacks >> ep & 1:
+        captured = ep - step
+        # In check the capture must take the checking pawn or block the checking ray
+        if (mask >> captured | mask >> ep) & 1 and _ep_is_legal(position, start, ep, captured, color):
+            buffer[n] = start | ep << 6 | EN_PASSANT << 12
+            n += 1
+    return n
+
+
+def _ep_is_legal(position, start, end, captured, color):
+    # Both pawns leave their squares, which can uncover a slider on the king
+    pieces = position.pieces
+    king = pieces[color * 6 + KING].bit_length() - 1
+    occupied = position.occupied ^ (1 << start) ^ (1 << captured) | (1 << end)
+    base = (color ^ 1) * 6
+    queens = pieces[base + QUEEN]
+    if ROOK_TABLES[king][occupied & ROOK_MASKS[king]] & (pieces[base + ROOK] | queens):
+        return False
+    return not BISHOP_TABLES[king][occupied & BISHOP_MASKS[king]] & (pieces[base + BISHOP] | queens)
@@ -0,0 +1,187 @@
+"""
+Perft: count the leaf nodes of the legal move tree to a fixed depth.
+
+Perft numbers of well known positions are published, so comparing against
+them checks every rule of the move generator (castling, en passant,
+promotions, pins, checks), and the time taken measures its speed.
+
+Usage:
+    python -m board.perft                        # reference suite, depth 3
+    python -m board.perft --depth 4              # reference suite, depth 4
+    python -m board.perft --fen "<fen>" --depth 3 --divide
+    python -m board.perft --grid --depth 2       # same positions through pieces/*.py and board/move.py
+
+The grid mode walks the gameTiles grid with the legalmoveb() methods of the
+piece classes and move.checkb/checkw, the way the grid code decides legality.
+That API does not generate castling, en passant or under-promotions, so its
+node counts are lower than the reference counts; it is there to compare
+speed.
+"""
+
+import argparse
+import sys
+import time
+
+from board.bitboard import Position, WHITE, START_FEN, move_name
+from board.movegen import MoveList, generate_legal_moves
+
+# (name, FEN, node counts for depth 1, 2, ...)
+REFERENCE_POSITIONS = [
+    ('startpos', START_FEN,
+     [20, 400, 8902, 197281, 4865609]),
+    ('kiwipete', 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+     [48, 2039, 97862, 4085603]),
+    ('position3', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1',
+     [14, 191, 2812, 43238, 674624]),
+    ('position4', 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+     [6, 264, 9467, 422333]),
+    ('position5', 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8',
+     [44, 1486, 62379, 2103487]),
+    ('position6', 'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+     [46, 2079, 89890, 3894594]),
+]
+
+
+def perft(position, depth):
+    """
+    Count the leaf nodes of the legal move tree.
+
+    Args:
+        position: board.bitboard.Position, unchanged on return
+        depth: Number of plies to look ahead
+
+    Returns:
+        int: Number of positions reached after exactly depth plies
+    """
+    if depth == 0:
+        return 1
+    return _perft(position, depth, [MoveList() for _ in range(depth)])
+
+
+def _perft(position, depth, buffers):
+    moves = generate_legal_moves(position, buffers[depth - 1])
+    if depth == 1:  # Count the moves instead of playing them
+        return moves.count
+    nodes = 0
+    for move in moves.tolist():
+        position.make_move(move)
+        nodes += _perft(position, depth - 1, buffers)
+        position.unmake_move()
+    return nodes
+
+
+def divide(position, depth):
+    """
+    Perft split by root move, to find the move a wrong count comes from.
+
+    Args:
+        position: board.bitboard.Position, unchanged on return
+        depth: Number of plies to look ahead, at least 1
+
+    Returns:
+        list: (move in coordinate notation, node count) for every legal move
+    """
+    buffers = [MoveList() for _ in range(depth)]
+    result = []
+    for move in generate_legal_moves(position).tolist():
+        position.make_move(move)
+        nodes = _perft(position, depth - 1, buffers) if depth > 1 else 1
+        position.unmake_move()
+        result.append((move_name(move), nodes))
+    return result
+
+
+def perft_grid(gametiles, alliance, depth):
+    """
+    Count leaf nodes with the piece classes on a gameTiles grid.
+
+    Args:
+        gametiles: 8x8 grid of Tile objects, unchanged on return
+        alliance: 'White' or 'Black', the side to move
+        depth: Number of plies to look ahead
+
+    Returns:
+        int: Number of positions reached, without castling, en passant and under-promotions
+    """
+    from board.move import move
+    from pieces.nullpiece import nullpiece
+    from pieces.queen import queen
+
+    handler = move()
+    check = handler.checkw if alliance == 'White' else handler.checkb
+    enemy = 'Black' if alliance == 'White' else 'White'
+    last_row = 0 if alliance == 'White' else 7
+    if depth == 0:
+        return 1
+    nodes = 0
+    for row in range(8):
+        for column in range(8):
+            piece = gametiles[row][column].pieceonTile
+            if piece.alliance != alliance:
+                continue
+            for target_row, target_column in piece.legalmoveb(gametiles):
+                captured = gametiles[target_row][target_column].pieceonTile
+                moved = piece
+                if piece.tostring() in ('p', 'P') and target_row == last_row:
+                    moved = queen(alliance, target_row * 8 + target_column)
+                gametiles[target_row][target_column].pieceonTile = moved
+                gametiles[row][column].pieceonTile = nullpiece()
+                piece.position = target_row * 8 + target_column
+                if check(gametiles)[0] == 'notchecked':
+                    nodes += perft_grid(gametiles, enemy, depth - 1)
+                piece.position = row * 8 + column
+                gametiles[row][column].pieceonTile = piece
+                gametiles[target_row][target_column].pieceonTile = captured
+    return nodes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m board.perft', description=__doc__.split('\n')[1])
+    parser.add_argument('--depth', type=int, default=3, help='plies to search (default 3)')
+    parser.add_argument('--fen', help='position to count instead of the reference suite')
+    parser.add_argument('--divide', action='store_true', help='print the node count of every root move')
+    parser.add_argument('--grid', action='store_true', help='use pieces/*.py and board/move.py on a gameTiles grid')
+    args = parser.parse_args(argv)
+
+    if args.fen:
+        suite = [('fen', args.fen, [])]
+    else:
+        suite = REFERENCE_POSITIONS
+    failures = 0
+    total_nodes = 0
+    total_time = 0.0
+    for name, fen, counts in suite:
+        position = Position.from_fen(fen)
+        depth = args.depth
+        split = None
+        start = time.perf_counter()
+        if args.grid:
+            nodes = perft_grid(position.to_gametiles(), 'White' if position.side == WHITE else 'Black', depth)
+        elif args.divide and depth > 0:
+            split = divide(position, depth)
+            nodes = sum(move_nodes for _move, move_nodes in split)  # The total, without walking the tree again
+        else:
+            nodes = perft(position, depth)
+        elapsed = time.perf_counter() - start
+        if split is not None:
+            for move, move_nodes in split:
+                print('%s: %d' % (move, move_nodes))
+        total_nodes += nodes
+        total_time += elapsed
+        if args.grid or depth > len(counts):
+            status = ''
+        elif nodes == counts[depth - 1]:
+            status = 'ok'
+        else:
+            status = 'FAIL (expected %d)' % counts[depth - 1]
+            failures += 1
+        print('%-10s depth %d %12d nodes %8.2f s %10d nps  %s'
+              % (name, depth, nodes, elapsed, nodes / elapsed if elapsed > 0 else 0, status))
+    if len(suite) > 1:
+        print('%-10s         %12d nodes %8.2f s %10d nps'
+              % ('total', total_nodes, total_time, total_nodes / total_time if total_time > 0 else 0))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
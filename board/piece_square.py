@@ -0,0 +1,90 @@
+"""
+Evaluation tables of the AI, built once at import.
+
+Every term of the static evaluation except mobility depends only on which
+piece stands on which square: material, the pawn and knight position tables,
+king safety and the pawn centre bonus. They are folded into one table,
+PSQT[piece * 64 + square], so a position can keep their sum as a running
+total while pieces are put on and taken off the board. Scores are from
+White's point of view.
+"""
+
+# Piece letters in piece code order (see board.bitboard)
+_PIECE_CHARS = 'pnbrqkPNBRQK'
+
+PIECE_VALUES = {
+    'P': -100, 'N': -320, 'B': -330, 'R': -500,
+    'Q': -900, 'K': -20000,
+    'p': 100, 'n': 320, 'b': 330, 'r': 500,
+    'q': 900, 'k': 20000
+}
+
+# Position tables for better positional evaluation
+PAWN_POSITIONS = [
+    [0,  0,  0,  0,  0,  0,  0,  0],
+    [50, 50, 50, 50, 50, 50, 50, 50],
+    [10, 10, 20, 30, 30, 20, 10, 10],
+    [5,  5, 10, 25, 25, 10,  5,  5],
+    [0,  0,  0, 20, 20,  0,  0,  0],
+    [5, -5,-10,  0,  0,-10, -5,  5],
+    [5, 10, 10,-20,-20, 10, 10,  5],
+    [0,  0,  0,  0,  0,  0,  0,  0]
+]
+
+KNIGHT_POSITIONS = [
+    [-50,-40,-30,-30,-30,-30,-40,-50],
+    [-40,-20,  0,  0,  0,  0,-20,-40],
+    [-30,  0, 10, 15, 15, 10,  0,-30],
+    [-30,  5, 15, 20, 20, 15,  5,-30],
+    [-30,  0, 15, 20, 20, 15,  0,-30],
+    [-30,  5, 10, 15, 15, 10,  5,-30],
+    [-40,-20,  0,  5,  5,  0,-20,-40],
+    [-50,-40,-30,-30,-30,-30,-40,-50]
+]
+
+KING_EDGE_PENALTY = 100  # Applied to both kings on the two outer rows or columns
+KING_CENTRE_BONUS = 50
+PAWN_CENTRE_BONUS = 10  # For pawns on columns c-f
+MOBILITY_WEIGHT = 10  # Per target square of a queen, rook, bishop or knight
+
+
+def square_value(piece_str, y, x):
+    """
+    Evaluation of one piece on one square, without mobility.
+
+    Args:
+        piece_str: Piece letter as returned by tostring()
+        y: Row of the square
+        x: Column of the square
+
+    Returns:
+        int: Score contribution from White's point of view
+    """
+    value = PIECE_VALUES[piece_str]
+
+    if piece_str == 'P':
+        value -= PAWN_POSITIONS[y][x]
+    elif piece_str == 'p':
+        value += PAWN_POSITIONS[7-y][x]
+    elif piece_str == 'N':
+        value -= KNIGHT_POSITIONS[y][x]
+    elif piece_str == 'n':
+        value += KNIGHT_POSITIONS[7-y][x]
+
+    # King safety
+    if piece_str in ['K', 'k']:
+        if x in [0, 1, 6, 7] or y in [0, 1, 6, 7]:
+            value -= KING_EDGE_PENALTY
+        else:
+            value += KING_CENTRE_BONUS if piece_str == 'K' else -KING_CENTRE_BONUS
+
+    # Pawn structure
+    if piece_str in ['P', 'p']:
+        if x in [2, 3, 4, 5]:
+            value += PAWN_CENTRE_BONUS if piece_str == 'p' else -PAWN_CENTRE_BONUS
+
+    return value
+
+
+PSQT = [square_value(piece_str, square // 8, square % 8)
+        for piece_str in _PIECE_CHARS for square in range(64)]
@@ -0,0 +1,197 @@
+"""
+Table-driven attack generation for rooks, bishops and queens.
+
+For every square the relevant occupancy mask of a rook and of a bishop (the
+squares on its rays, board edges excluded) is computed once, and the attack
+bitboard for every subset of that mask is stored in a per-square table. An
+attack lookup is then a single table access keyed by ``occupied & mask``.
+This is the magic bitboard scheme with CPython's dict standing in for the
+magic multiply-and-shift hash: it needs no magic number search and a dict
+lookup is cheaper than a 64-bit multiplication on Python integers.
+
+BETWEEN holds the squares between two aligned squares, used for pin rays and
+for blocking checks.
+
+The same rays are kept as [row, column] lists for the legalmoveb() methods of
+the piece classes, which walk the grid until the first piece.
+
+Run ``python -m board.sliders`` to print the build time and memory footprint.
+"""
+
+import sys
+import time
+
+from board.attack_tables import COORDINATES
+
+# Ray directions as (row step, column step)
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+ROOK_RAYS = (0, 1, 2, 3)  # Down, up, right, left
+BISHOP_RAYS = (4, 5, 6, 7)  # Down-right, down-left, up-right, up-left
+QUEEN_RAYS = (4, 7, 5, 6, 0, 1, 2, 3)  # Diagonals first, as the queen always listed them
+
+# RAY_TARGETS[direction][square]: squares along the ray, nearest first
+RAY_TARGETS = []
+for _dr, _dc in DIRECTIONS:
+    _rays = []
+    for _square in range(64):
+        _row, _column = divmod(_square, 8)
+        _ray = []
+        _row += _dr
+        _column += _dc
+        while 0 <= _row < 8 and 0 <= _column < 8:
+            _ray.append(COORDINATES[_row * 8 + _column])
+            _row += _dr
+            _column += _dc
+        _rays.append(_ray)
+    RAY_TARGETS.append(_rays)
+
+# BETWEEN[a][b]: squares strictly between a and b on a shared ray, 0 if they are not aligned
+BETWEEN = [[0] * 64 for _square in range(64)]
+for _direction in range(8):
+    for _square in range(64):
+        _bb = 0
+        for _row, _column in RAY_TARGETS[_direction][_square]:
+            BETWEEN[_square][_row * 8 + _column] = _bb
+            _bb |= 1 << (_row * 8 + _column)
+
+
+def _ray_attacks(square, rays, occupied):
+    bb = 0
+    for direction in rays:
+        for row, column in RAY_TARGETS[direction][square]:
+            bit = 1 << (row * 8 + column)
+            bb |= bit
+            if occupied & bit:
+                break
+    return bb
+
+
+def _relevant_mask(square, rays):
+    # The last square of a ray never blocks anything behind it
+    bb = 0
+    for direction in rays:
+        for row, column in RAY_TARGETS[direction][square][:-1]:
+            bb |= 1 << (row * 8 + column)
+    return bb
+
+
+def _build(rays):
+    masks = []
+    tables = []
+    for square in range(64):
+        mask = _relevant_mask(square, rays)
+        table = {}
+        subset = 0
+        while True:  # Carry-Rippler enumeration of all subsets of the mask
+            table[subset] = _ray_attacks(square, rays, subset)
+            subset = (subset - mask) & mask
+            if subset == 0:
+                break
+        masks.append(mask)
+        tables.append(table)
+    return masks, tables
+
+
+_start = time.perf_counter()
+ROOK_MASKS, ROOK_TABLES = _build(ROOK_RAYS)
+BISHOP_MASKS, BISHOP_TABLES = _build(BISHOP_RAYS)
+BUILD_SECONDS = time.perf_counter() - _start
+
+
+def rook_attacks(square, occupied):
+    """
+    Get the squares a rook attacks.
+
+    Args:
+        square: Square of the rook
+        occupied: Bitboard of all pieces
+
+    Returns:
+        int: Attack bitboard, including the first blocker on every ray
+    """
+    return ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+
+
+def bishop_attacks(square, occupied):
+    """
+    Get the squares a bishop attacks.
+
+    Args:
+        square: Square of the bishop
+        occupied: Bitboard of all pieces
+
+    Returns:
+        int: Attack bitboard, including the first blocker on every ray
+    """
+    return BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]]
+
+
+def queen_attacks(square, occupied):
+    """
+    Get the squares a queen attacks.
+
+    Args:
+        square: Square of the queen
+        occupied: Bitboard of all pieces
+
+    Returns:
+        int: Attack bitboard, including the first blocker on every ray
+    """
+    return (ROOK_TABLES[square][occupied & ROOK_MASKS[square]]
+            | BISHOP_TABLES[square][occupied & BISHOP_MASKS[square]])
+
+
+def slider_targets(gametiles, square, rays):
+    """
+    Walk the precomputed rays of a slider on a gameTiles grid.
+
+    Args:
+        gametiles: 8x8 grid of Tile objects
+        square: Square of the sliding piece
+        rays: ROOK_RAYS, BISHOP_RAYS or QUEEN_RAYS
+
+    Returns:
+        list: Target squares as [row, column], empty squares and enemy pieces
+    """
+    enemy = 'White' if gametiles[square >> 3][square & 7].pieceonTile.alliance == 'Black' else 'Black'
+    legalmoves = []
+    for direction in rays:
+        for target in RAY_TARGETS[direction][square]:
+            alliance = gametiles[target[0]][target[1]].pieceonTile.alliance
+            if alliance is None:
+                legalmoves.append(target)
+                continue
+            if alliance == enemy:
+                legalmoves.append(target)  # Can capture the enemy piece
+            break
+    return legalmoves
+
+
+def table_stats():
+    """
+    Report the size and build cost of the sliding attack tables.
+
+    Returns:
+        dict: Number of table entries, build time in seconds and approximate bytes used
+    """
+    tables = ROOK_TABLES + BISHOP_TABLES
+    values = {}
+    size = 0
+    for table in tables:
+        size += sys.getsizeof(table)
+        for key, value in table.items():
+            values[id(key)] = key
+            values[id(value)] = value
+    size += sum(sys.getsizeof(value) for value in values.values())
+    return {'rook_entries': sum(len(table) for table in ROOK_TABLES),
+            'bishop_entries': sum(len(table) for table in BISHOP_TABLES),
+            'build_seconds': BUILD_SECONDS,
+            'bytes': size}
+
+
+if __name__ == '__main__':
+    stats = table_stats()
+    print("rook entries:   %d" % stats['rook_entries'])
+    print("bishop entries: %d" % stats['bishop_entries'])
+    print("build time:     %.3f s" % stats['build_seconds'])
+    print("memory:         %.1f MiB" % (stats['bytes'] / (1024 * 1024)))
@@ -0,0 +1,21 @@
+"""
+Zobrist hashing keys for bitboard positions.
+
+The keys are drawn from a fixed seed so that a position hashes to the same
+value in every process, which lets worker processes share hash tables.
+"""
+
+import random
+
+_rng = random.Random(0x5EED)
+
+# One key per piece code and square, stored flat as PIECE_KEYS[piece * 64 + square]
+PIECE_KEYS = [_rng.getrandbits(64) for _ in range(12 * 64)]
+# One key per combination of the four castling rights (none hashes to 0)
+CASTLING_KEYS = [0] + [_rng.getrandbits(64) for _ in range(15)]
+# One key per en passant file
+EP_KEYS = [_rng.getrandbits(64) for _ in range(8)]
+# Toggled when Black is to move
+SIDE_KEY = _rng.getrandbits(64)
+
+del _rng
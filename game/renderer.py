@@ -0,0 +1,145 @@
+"""
+Incremental renderer for the board view.
+
+The 64 squares are painted once into a background surface. The renderer
+remembers what every square shows (piece sprite and highlight) and on
+render() repaints only the squares whose content changed, from the
+background and the sprite cache. Every repainted rectangle is queued, and
+flush() passes just those to pygame.display.update(), so a frame in which
+nothing changed costs no drawing and no display update at all.
+
+Anything drawn onto the display behind the renderer's back (status bar,
+promotion picker) is reported with damage(): the area is updated on the next
+flush() and the squares under it are repainted on the next render().
+"""
+
+import pygame
+
+LIGHT_SQUARE = (255, 248, 220)  # Cream white
+DARK_SQUARE = (101, 67, 33)  # Dark brown
+HIGHLIGHT_SPRITE = 'red_square'
+
+
+class BoardRenderer:
+    """
+    Draws a gameTiles grid onto the display, square by square as it changes.
+
+    Attributes:
+        display: Surface the board is drawn on, the top-left 8 x 8 tiles
+        sprites: game.sprites.SpriteCache the piece images come from
+        tile: Width and height of a square in pixels
+        dirty: Rectangles drawn since the last flush()
+    """
+
+    def __init__(self, display, sprites, tile=100):
+        """
+        Create the renderer and paint its background surface.
+
+        Args:
+            display: The display surface
+            sprites: game.sprites.SpriteCache
+            tile: Width and height of a square in pixels
+        """
+        self.display = display
+        self.sprites = sprites
+        self.tile = tile
+        self.background = pygame.Surface((8 * tile, 8 * tile)).convert()
+        for row in range(8):
+            for column in range(8):
+                color = LIGHT_SQUARE if (row + column) % 2 == 0 else DARK_SQUARE
+                self.background.fill(color, self.square_rect(row, column))
+        self.shown = [None] * 64  # (sprite name or None, highlighted) per square, None if unknown
+        self.highlights = set()
+        self.dirty = []
+
+    def square_rect(self, row, column):
+        """
+        Get the area of a square.
+
+        Args:
+            row, column (int): Board coordinates
+
+        Returns:
+            pygame.Rect: Area of the square on the display
+        """
+        return pygame.Rect(column * self.tile, row * self.tile, self.tile, self.tile)
+
+    def highlight(self, row, column):
+        """
+        Mark a square with the highlight sprite from the next render() on.
+
+        Args:
+            row, column (int): Board coordinates
+        """
+        self.highlights.add((row, column))
+
+    def clear_highlights(self):
+        """Remove every highlight from the next render() on"""
+        self.highlights.clear()
+
+    def render(self, gametiles):
+        """
+        Repaint the squares whose piece or highlight changed since the last call.
+
+        Args:
+            gametiles: 8x8 grid of Tile objects
+        """
+        for row in range(8):
+            for column in range(8):
+                piece = gametiles[row][column].pieceonTile
+                name = None
+                if piece.tostring() != '-':
+                    name = piece.alliance[0].upper() + piece.tostring().upper()
+                state = (name, (row, column) in self.highlights)
+                if self.shown[row * 8 + column] != state:
+                    self.draw_square(row, column, name, state[1])
+                    self.shown[row * 8 + column] = state
+
+    def draw_square(self, row, column, name, highlighted):
+        """
+        Paint one square and queue it for the next flush().
+
+        Args:
+            row, column (int): Board coordinates
+            name: Sprite name of the piece on it, or None
+            highlighted: Draw the highlight sprite under the piece
+        """
+        rect = self.square_rect(row, column)
+        self.display.blit(self.background, rect, rect)
+        if highlighted:
+            self.display.blit(self.sprites.get(HIGHLIGHT_SPRITE, self.tile), rect)
+        if name is not None:
+            self.display.blit(self.sprites.get(name, self.tile), rect)
+        self.dirty.append(rect)
+
+    def damage(self, rect):
+        """
+        Report an area that was drawn without the renderer.
+
+        Args:
+            rect: pygame.Rect or (x, y, width, height) of the area
+        """
+        rect = pygame.Rect(rect)
+        self.dirty.append(rect)
+        for row in range(8):
+            for column in range(8):
+                if rect.colliderect(self.square_rect(row, column)):
+                    self.shown[row * 8 + column] = None
+
+    def invalidate(self):
+        """Repaint the whole board on the next render(), e.g. after the window was resized"""
+        self.display = pygame.display.get_surface()
+        self.shown = [None] * 64
+
+    def flush(self):
+        """
+        Update the queued areas of the screen.
+
+        Returns:
+            bool: True if anything was updated
+        """
+        if not self.dirty:
+            return False
+        pygame.display.update(self.dirty)
+        self.dirty = []
+        return True
@@ -0,0 +1,100 @@
+"""
+Cache of the piece images and board overlays, loaded and scaled once.
+
+pygame.image.load() reads and decodes a PNG file and
+pygame.transform.scale() resamples it, so doing both on every redraw costs
+disk I/O and CPU per frame. SpriteCache does it once per image and tile size,
+converted with convert_alpha() to the pixel format of the display so that
+blitting needs no conversion either. The pixel format can change with the
+display mode, so the cache empties itself when the window size changes.
+"""
+
+import os
+
+import pygame
+
+ART_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'chessart')
+# Image names of the pieces: alliance initial and upper-case piece letter
+PIECE_NAMES = [color + kind for color in 'WB' for kind in 'PNBRQK']
+
+
+class SpriteCache:
+    """
+    Scaled sprites keyed by image name and tile size.
+
+    Attributes:
+        art_dir: Directory of the PNG files
+        loads: Number of images read from disk so far
+    """
+
+    def __init__(self, art_dir=ART_DIR):
+        """
+        Create an empty cache.
+
+        Args:
+            art_dir: Directory of the PNG files
+        """
+        self.art_dir = art_dir
+        self.images = {}  # Name -> image at its file size, converted for the display
+        self.sprites = {}  # (name, size) -> scaled image
+        self.display_size = None
+        self.loads = 0
+
+    def get(self, name, size):
+        """
+        Get an image scaled to a square tile.
+
+        Args:
+            name: File name without .png, e.g. 'WQ' or 'red_square'
+            size: Width and height in pixels
+
+        Returns:
+            pygame.Surface: The cached sprite, do not draw on it
+        """
+        display = pygame.display.get_surface()
+        display_size = display.get_size() if display is not None else None
+        if display_size != self.display_size:
+            self.invalidate()
+            self.display_size = display_size
+        key = (name, size)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            image = self.images.get(name)
+            if image is None:
+                image = pygame.image.load(os.path.join(self.art_dir, name + '.png'))
+                self.loads += 1
+                if display is not None:  # convert_alpha() needs a display mode
+                    image = image.convert_alpha()
+                self.images[name] = image
+            sprite = pygame.transform.scale(image, (size, size))
+            self.sprites[key] = sprite
+        return sprite
+
+    def piece(self, piece, size):
+        """
+        Get the sprite of a piece.
+
+        Args:
+            piece: Piece object from a gameTiles grid, not a nullpiece
+            size: Width and height in pixels
+
+        Returns:
+            pygame.Surface: The cached sprite
+        """
+        return self.get(piece.alliance[0].upper() + piece.tostring().upper(), size)
+
+    def preload(self, size, names=None):
+        """
+        Load sprites before they are first drawn.
+
+        Args:
+            size: Width and height in pixels
+            names: Image names, every piece if None
+        """
+        for name in PIECE_NAMES if names is None else names:
+            self.get(name, size)
+
+    def invalidate(self):
+        """Drop every sprite, e.g. after the window was resized"""
+        self.images.clear()
+        self.sprites.clear()
@@ -1,5 +1,6 @@
 from pieces.piece import piece
-import math
+from board.bitboard import Position
+from board.sliders import slider_targets, BISHOP_RAYS
 
 class bishop(piece):
     """Represents a bishop piece in chess"""
@@ -31,185 +32,17 @@ class bishop(piece):
         Returns:
             list: [row, column] coordinates on the board
         """
-        a = self.position/8  # Calculate row
-        b = self.position%8  # Calculate column
-        return [math.floor(a), b]
+        return list(divmod(self.position, 8))  # [row, column] in integer arithmetic
 
     def legalmoveb(self, gameTiles):
         """
         Calculate all legal moves for this bishop
         Args:
-            gameTiles: The current state of the board
+            gameTiles: The current state of the board (gameTiles grid or bitboard Position)
         Returns:
             list: List of legal move coordinates [row, column]
         """
-        legalmoves = []
-        x = self.calculatecoordinates()[0]  # Current row
-        y = self.calculatecoordinates()[1]  # Current column
-        a = 0  # Temporary row coordinate
-        b = 0  # Temporary column coordinate
-        count = 0  # Counter for move calculation
-
-        if gameTiles[x][y].pieceonTile.alliance == 'Black':
-            # Check moves in all four diagonal directions
-            # Moving down-right
-            while True:
-                if count == 0:
-                    a = x + 1
-                    b = y + 1
-                    count = count + 1
-                else:
-                    a = a + 1
-                    b = b + 1
-                # Can move until hitting a piece or board edge
-                if a < 8 and b < 8 and gameTiles[a][b].pieceonTile.alliance is None:
-                    legalmoves.append([a, b])
-                    continue
-                elif a < 8 and b < 8 and gameTiles[a][b].pieceonTile.alliance == 'White':
-                    legalmoves.append([a, b])  # Can capture white piece
-                    break
-                else:
-                    break
-
-            # Moving down-left
-            count = 0
-            while True:
-                if count == 0:
-                    a = x + 1
-                    b = y - 1
-                    count = count + 1
-                else:
-                    a = a + 1
-                    b = b - 1
-                if a < 8 and b >= 0 and gameTiles[a][b].pieceonTile.alliance is None:
-                    legalmoves.append([a, b])
-                    continue
-                elif a < 8 and b >= 0 and gameTiles[a][b].pieceonTile.alliance == 'White':
-                    legalmoves.append([a, b])
-                    break
-                else:
-                    break
-
-            # Moving up-right
-            count = 0
-            while True:
-                if count == 0:
-                    a = x - 1
-                    b = y + 1
-                    count = count + 1
-                else:
-                    a = a - 1
-                    b = b + 1
-                if a >= 0 and b < 8 and gameTiles[a][b].pieceonTile.alliance is None:
-                    legalmoves.append([a, b])
-                    continue
-                elif a >= 0 and b < 8 and gameTiles[a][b].pieceonTile.alliance == 'White':
-                    legalmoves.append([a, b])
-                    break
-                else:
-                    break
-
-            # Moving up-left
-            count = 0
-            while True:
-                if count == 0:
-                    a = x - 1
-                    b = y - 1
-                    count = count + 1
-                else:
-                    a = a - 1
-                    b = b - 1
-                if a >= 0 and b >= 0 and gameTiles[a][b].pieceonTile.alliance is None:
-                    legalmoves.append([a, b])
-                    continue
-                elif a >= 0 and b >= 0 and gameTiles[a][b].pieceonTile.alliance == 'White':
-                    legalmoves.append([a, b])
-                    break
-                else:
-                    break
-
-            return legalmoves
-
-        else:  # White bishop
-            # Same logic as black bishop but checking for black pieces to capture
-            while True:
-                if count == 0:
-                    a = x + 1
-                    b = y + 1
-                    count = count + 1
-                else:
-                    a = a + 1
-                    b = b + 1
-                if a < 8 and b < 8 and gameTiles[a][b].pieceonTile.alliance is None:
-                    legalmoves.append([a, b])
-                    continue
-                elif a < 8 and b < 8 and gameTiles[a][b].pieceonTile.alliance == 'Black':
-                    legalmoves.append([a, b])
-                    break
-                else:
-                    break
-
-            count = 0
-            while True:
-                if count == 0:
-                    a = x + 1
-                    b = y - 1
-                    count = count + 1
-                else:
-                    a = a + 1
-                    b = b - 1
-                if a < 8 and b >= 0 and gameTiles[a][b].pieceonTile.alliance is None:
-                    legalmoves.append([a, b])
-                    continue
-                elif a < 8 and b >= 0 and gameTiles[a][b].pieceonTile.alliance == 'Black':
-                    legalmoves.append([a, b])
-                    break
-                else:
-                    break
-
-            count = 0
-            while True:
-                if count == 0:
-                    a = x - 1
-                    b = y + 1
-                    count = count + 1
-                else:
-                    a = a - 1
-                    b = b + 1
-                if a >= 0 and b < 8 and gameTiles[a][b].pieceonTile.alliance is None:
-                    legalmoves.append([a, b])
-                    continue
-                elif a >= 0 and b < 8 and gameTiles[a][b].pieceonTile.alliance == 'Black':
-                    legalmoves.append([a, b])
-                    break
-                else:
-                    break
-
-            count = 0
-            while True:
-                if count == 0:
-                    a = x - 1
-                    b = y - 1
-                    count = count + 1
-                else:
-                    a = a - 1
-                    b = b - 1
-                if a >= 0 and b >= 0 and gameTiles[a][b].pieceonTile.alliance is None:
-                    legalmoves.append([a, b])
-                    continue
-                elif a >= 0 and b >= 0 and gameTiles[a][b].pieceonTile.alliance == 'Black':
-                    legalmoves.append([a, b])
-                    break
-                else:
-                    break
-
-            return legalmoves
-
-
-
-
-
-
-
-
-
+        if isinstance(gameTiles, Position):
+            return gameTiles.legalmoveb(self.position)
+        # Walk the precomputed rays until the first piece (shared by all sliders)
+        return slider_targets(gameTiles, self.position, BISHOP_RAYS)
@@ -1,5 +1,6 @@
 from pieces.piece import piece
-import math
+from board.bitboard import Position
+from board.attack_tables import KING_TARGETS
 
 class king(piece):
     """Represents a king piece in chess"""
@@ -32,95 +33,26 @@ class king(piece):
         Returns:
             list: [row, column] coordinates on the board
         """
-        a = self.position/8  # Calculate row
-        b = self.position%8  # Calculate column
-        return [math.floor(a), b]
+        return list(divmod(self.position, 8))  # [row, column] in integer arithmetic
 
     def legalmoveb(self, gameTiles):
         """
         Calculate all legal moves for this king
         Args:
-            gameTiles: The current state of the board
+            gameTiles: The current state of the board (gameTiles grid or bitboard Position)
         Returns:
             list: List of legal move coordinates [row, column]
         """
+        if isinstance(gameTiles, Position):
+            return gameTiles.legalmoveb(self.position)
         legalmoves = []
-        x = self.calculatecoordinates()[0]  # Current row
-        y = self.calculatecoordinates()[1]  # Current column
-
-        if gameTiles[x][y].pieceonTile.alliance == 'Black':
-            # Check all eight possible moves (one square in any direction)
-            # Down-right diagonal
-            if x+1 < 8 and y+1 < 8 and not gameTiles[x+1][y+1].pieceonTile.alliance == 'Black':
-                legalmoves.append([x+1, y+1])
-
-            # Down-left diagonal
-            if x+1 < 8 and y-1 >= 0 and not gameTiles[x+1][y-1].pieceonTile.alliance == 'Black':
-                legalmoves.append([x+1, y-1])
-
-            # Down
-            if x+1 < 8 and not gameTiles[x+1][y].pieceonTile.alliance == 'Black':
-                legalmoves.append([x+1, y])
-
-            # Left
-            if y-1 >= 0 and not gameTiles[x][y-1].pieceonTile.alliance == 'Black':
-                legalmoves.append([x, y-1])
-
-            # Right
-            if y+1 < 8 and not gameTiles[x][y+1].pieceonTile.alliance == 'Black':
-                legalmoves.append([x, y+1])
-
-            # Up
-            if x-1 >= 0 and not gameTiles[x-1][y].pieceonTile.alliance == 'Black':
-                legalmoves.append([x-1, y])
-
-            # Up-right diagonal
-            if x-1 >= 0 and y-1 >= 0 and not gameTiles[x-1][y-1].pieceonTile.alliance == 'Black':
-                legalmoves.append([x-1, y-1])
-
-            # Up-left diagonal
-            if x-1 >= 0 and y+1 < 8 and not gameTiles[x-1][y+1].pieceonTile.alliance == 'Black':
-                legalmoves.append([x-1, y+1])
-
-            return legalmoves
-
-        else:  # White king
-            # Same logic as black king but checking for black pieces
-            # Down-right diagonal
-            if x+1 < 8 and y+1 < 8 and not gameTiles[x+1][y+1].pieceonTile.alliance == 'White':
-                legalmoves.append([x+1, y+1])
-
-            # Down-left diagonal
-            if x+1 < 8 and y-1 >= 0 and not gameTiles[x+1][y-1].pieceonTile.alliance == 'White':
-                legalmoves.append([x+1, y-1])
-
-            # Down
-            if x+1 < 8 and not gameTiles[x+1][y].pieceonTile.alliance == 'White':
-                legalmoves.append([x+1, y])
-
-            # Left
-            if y-1 >= 0 and not gameTiles[x][y-1].pieceonTile.alliance == 'White':
-                legalmoves.append([x, y-1])
-
-            # Right
-            if y+1 < 8 and not gameTiles[x][y+1].pieceonTile.alliance == 'White':
-                legalmoves.append([x, y+1])
-
-            # Up
-            if x-1 >= 0 and not gameTiles[x-1][y].pieceonTile.alliance == "White":
-                legalmoves.append([x-1, y])
-
-            # Up-right diagonal
-            if x-1 >= 0 and y-1 >= 0 and not gameTiles[x-1][y-1].pieceonTile.alliance == 'White':
-                legalmoves.append([x-1, y-1])
-
-            # Up-left diagonal
-            if x-1 >= 0 and y+1 < 8 and not gameTiles[x-1][y+1].pieceonTile.alliance == 'White':
-                legalmoves.append([x-1, y+1])
-
-            return legalmoves
-
-
+        x, y = self.calculatecoordinates()  # Current row and column
 
+        own = 'Black' if gameTiles[x][y].pieceonTile.alliance == 'Black' else 'White'
 
+        # One square in any direction, targets inside the board come from the precomputed table
+        for target in KING_TARGETS[self.position]:
+            if not gameTiles[target[0]][target[1]].pieceonTile.alliance == own:
+                legalmoves.append(target)
 
+        return legalmoves
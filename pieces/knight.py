@@ -1,5 +1,6 @@
 from pieces.piece import piece
-import math
+from board.bitboard import Position
+from board.attack_tables import KNIGHT_TARGETS
 
 class knight(piece):
     """Represents a knight piece in chess"""
@@ -31,65 +32,29 @@ class knight(piece):
         Returns:
             list: [row, column] coordinates on the board
         """
-        a = self.position/8  # Calculate row
-        b = self.position%8  # Calculate column
-        return [math.floor(a), b]
+        return list(divmod(self.position, 8))  # [row, column] in integer arithmetic
 
     def legalmoveb(self, gameTiles):
         """
         Calculate all legal moves for this knight
         Args:
-            gameTiles: The current state of the board
+            gameTiles: The current state of the board (gameTiles grid or bitboard Position)
         Returns:
             list: List of legal move coordinates [row, column]
         """
+        if isinstance(gameTiles, Position):
+            return gameTiles.legalmoveb(self.position)
         legalmoves = []
-        x = self.calculatecoordinates()[0]  # Current row
-        y = self.calculatecoordinates()[1]  # Current column
+        x, y = self.calculatecoordinates()  # Current row and column
 
-        # All possible knight moves (L-shaped)
-        # Each move is 2 squares in one direction and 1 square perpendicular
-        possible_moves = [
-            [x+2, y+1], [x+2, y-1],  # Down 2, right/left 1
-            [x-2, y+1], [x-2, y-1],  # Up 2, right/left 1
-            [x+1, y+2], [x+1, y-2],  # Right 2, down/up 1
-            [x-1, y+2], [x-1, y-2]   # Left 2, down/up 1
-        ]
+        # Black knights capture White pieces and White knights capture Black pieces
+        enemy = 'White' if gameTiles[x][y].pieceonTile.alliance == 'Black' else 'Black'
 
-        # Check each possible move
-        for move in possible_moves:
-            a = move[0]  # Target row
-            b = move[1]  # Target column
-            
-            # Check if move is within board boundaries
-            if a >= 0 and a < 8 and b >= 0 and b < 8:
-                # For black knight
-                if gameTiles[x][y].pieceonTile.alliance == 'Black':
-                    # Can move to empty square or capture white piece
-                    if gameTiles[a][b].pieceonTile.alliance is None or gameTiles[a][b].pieceonTile.alliance == 'White':
-                        legalmoves.append([a, b])
-                # For white knight
-                else:
-                    # Can move to empty square or capture black piece
-                    if gameTiles[a][b].pieceonTile.alliance is None or gameTiles[a][b].pieceonTile.alliance == 'Black':
-                        legalmoves.append([a, b])
+        # L-shaped targets inside the board come from the precomputed table
+        for target in KNIGHT_TARGETS[self.position]:
+            alliance = gameTiles[target[0]][target[1]].pieceonTile.alliance
+            # Can move to empty square or capture enemy piece
+            if alliance is None or alliance == enemy:
+                legalmoves.append(target)
 
         return legalmoves
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
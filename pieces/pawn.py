@@ -1,5 +1,6 @@
 from pieces.piece import piece
-import math
+from board.bitboard import Position
+from board.attack_tables import WHITE, BLACK, PAWN_PUSH_TARGETS, PAWN_CAPTURE_TARGETS
 
 class pawn(piece):
     """Represents a pawn piece in chess"""
@@ -32,105 +33,43 @@ class pawn(piece):
         Returns:
             list: [row, column] coordinates on the board
         """
-        a = self.position/8  # Calculate row
-        b = self.position%8  # Calculate column
-        return [math.floor(a), b]
+        return list(divmod(self.position, 8))  # [row, column] in integer arithmetic
 
     def legalmoveb(self, gametiles):
         """
         Calculate all legal moves for this pawn
         Args:
-            gametiles: The current state of the board
+            gametiles: The current state of the board (gameTiles grid or bitboard Position)
         Returns:
             list: List of legal move coordinates [row, column]
         """
+        if isinstance(gametiles, Position):
+            return gametiles.legalmoveb(self.position)
         legalmoves = []
-        x = self.calculatecoordinates()[0]  # Current row
-        y = self.calculatecoordinates()[1]  # Current column
-        
-        if gametiles[x][y].pieceonTile.alliance == 'Black':
-            # Black pawn moves (moving down the board)
-            if x == 1:  # Starting position
-                # Can move forward one or two squares if path is clear
-                if gametiles[x+1][y].pieceonTile.tostring() == '-':
-                    legalmoves.append([x+1, y])
-                    if gametiles[x+2][y].pieceonTile.tostring() == '-':
-                        legalmoves.append([x+2, y])
-                
-                # Can capture diagonally
-                if y+1 > 7:  # Right edge
-                    if gametiles[x+1][y-1].pieceonTile.alliance == 'White':
-                        legalmoves.append([x+1, y-1])
-                if y-1 < 0:  # Left edge
-                    if gametiles[x+1][y+1].pieceonTile.alliance == 'White':
-                        legalmoves.append([x+1, y+1])
-                if y+1 < 8 and y-1 >= 0:  # Middle of board
-                    if gametiles[x+1][y-1].pieceonTile.alliance == 'White':
-                        legalmoves.append([x+1, y-1])
-                    if gametiles[x+1][y+1].pieceonTile.alliance == 'White':
-                        legalmoves.append([x+1, y+1])
-                return legalmoves
-            else:
-                # Normal moves (not from starting position)
-                if gametiles[x+1][y].pieceonTile.tostring() == '-':
-                    legalmoves.append([x+1, y])
-                if y+1 > 7:  # Right edge
-                    if gametiles[x+1][y-1].pieceonTile.alliance == 'White':
-                        legalmoves.append([x+1, y-1])
-                if y-1 < 0:  # Left edge
-                    if gametiles[x+1][y+1].pieceonTile.alliance == 'White':
-                        legalmoves.append([x+1, y+1])
-                if y+1 < 8 and y-1 >= 0:  # Middle of board
-                    if gametiles[x+1][y-1].pieceonTile.alliance == 'White':
-                        legalmoves.append([x+1, y-1])
-                    if gametiles[x+1][y+1].pieceonTile.alliance == 'White':
-                        legalmoves.append([x+1, y+1])
-                return legalmoves
+        x, y = self.calculatecoordinates()  # Current row and column
 
-        if gametiles[x][y].pieceonTile.alliance == 'White':
+        alliance = gametiles[x][y].pieceonTile.alliance
+        if alliance == 'Black':
+            # Black pawn moves (moving down the board)
+            color, enemy, start_row = BLACK, 'White', 1
+        elif alliance == 'White':
             # White pawn moves (moving up the board)
-            if x == 6:  # Starting position
-                # Can move forward one or two squares if path is clear
-                if gametiles[x-1][y].pieceonTile.tostring() == '-':
-                    legalmoves.append([x-1, y])
-                    if gametiles[x-2][y].pieceonTile.tostring() == '-':
-                        legalmoves.append([x-2, y])
-                
-                # Can capture diagonally
-                if y+1 > 7:  # Right edge
-                    if gametiles[x-1][y-1].pieceonTile.alliance == 'Black':
-                        legalmoves.append([x-1, y-1])
-                if y-1 < 0:  # Left edge
-                    if gametiles[x-1][y+1].pieceonTile.alliance == 'Black':
-                        legalmoves.append([x-1, y+1])
-                if y+1 < 8 and y-1 >= 0:  # Middle of board
-                    if gametiles[x-1][y-1].pieceonTile.alliance == 'Black':
-                        legalmoves.append([x-1, y-1])
-                    if gametiles[x-1][y+1].pieceonTile.alliance == 'Black':
-                        legalmoves.append([x-1, y+1])
-                return legalmoves
-            else:
-                # Normal moves (not from starting position)
-                if gametiles[x-1][y].pieceonTile.tostring() == '-':
-                    legalmoves.append([x-1, y])
-                if y+1 > 7:  # Right edge
-                    if gametiles[x-1][y-1].pieceonTile.alliance == 'Black':
-                        legalmoves.append([x-1, y-1])
-                if y-1 < 0:  # Left edge
-                    if gametiles[x-1][y+1].pieceonTile.alliance == 'Black':
-                        legalmoves.append([x-1, y+1])
-                if y+1 < 8 and y-1 >= 0:  # Middle of board
-                    if gametiles[x-1][y-1].pieceonTile.alliance == 'Black':
-                        legalmoves.append([x-1, y-1])
-                    if gametiles[x-1][y+1].pieceonTile.alliance == 'Black':
-                        legalmoves.append([x-1, y+1])
-                return legalmoves
-
-
-
-
-
-
-
-
-
+            color, enemy, start_row = WHITE, 'Black', 6
+        else:
+            return None
+
+        # Can move forward one square, or two from the starting position, if the path is clear
+        push = PAWN_PUSH_TARGETS[color][self.position]
+        if push is not None and gametiles[push[0]][push[1]].pieceonTile.tostring() == '-':
+            legalmoves.append(push)
+            if x == start_row:
+                push = PAWN_PUSH_TARGETS[color][push[0] * 8 + push[1]]
+                if gametiles[push[0]][push[1]].pieceonTile.tostring() == '-':
+                    legalmoves.append(push)
+
+        # Can capture diagonally, the table only holds squares inside the board
+        for target in PAWN_CAPTURE_TARGETS[color][self.position]:
+            if gametiles[target[0]][target[1]].pieceonTile.alliance == enemy:
+                legalmoves.append(target)
+
+        return legalmoves
@@ -2,20 +2,30 @@
 import pygame  # Main game library for graphics and event handling
 from board.chessboard import board  # Chess board representation
 import math  # For mathematical calculations
+import sys  # For the thread switch interval
 from pieces.nullpiece import nullpiece  # Empty piece representation
 from pieces.queen import queen  # Queen piece
 from pieces.rook import rook  # Rook piece
 from pieces.knight import knight  # Knight piece
 from pieces.bishop import bishop  # Bishop piece
 from player.AI import AI  # AI opponent
-import copy  # For deep copying game state
 from board.move import move  # Move validation and execution
+from board.bitboard import Position, WHITE, BLACK, PROMOTION  # Bitboard position for move generation
+from board.movegen import generate_legal_moves  # Legal move generator
+from board.bitboard import move_name  # Coordinate notation of encoded moves
+from player.background import BackgroundSearch  # AI search on a worker thread
+from game.sprites import SpriteCache, PIECE_NAMES  # Piece images loaded and scaled once
+from game.renderer import BoardRenderer  # Repaints only the squares that changed
 
 # Initialize Pygame
 pygame.init()
 gamedisplay = pygame.display.set_mode((800, 800))  # Create 800x800 game window
 pygame.display.set_caption("pychess")  # Set window title
 clock = pygame.time.Clock()  # Clock for controlling frame rate
+sprites = SpriteCache()  # Every image is read from disk once, then reused
+sprites.preload(100, PIECE_NAMES + ['red_square'])
+renderer = BoardRenderer(gamedisplay, sprites)  # Board view, see drawchesspieces()
+IDLE_WAIT_MS = 500  # Longest sleep of the game loop while waiting for input
 
 # Initialize game components
 chessBoard = board()  # Create chess board
@@ -23,10 +33,9 @@ chessBoard.createboard()  # Set up initial piece positions
 chessBoard.printboard()  # Print board state to console
 movex = move()  # Move handler
 ai = AI()  # AI opponent
-
-# Lists to store game elements
-allTiles = []  # Store all board tiles
-allpieces = []  # Store all pieces with their images and positions
+AI_TIME_LIMIT = 2.0  # Seconds the AI may think about each move
+AI_PONDER = True  # Let the AI search the reply it expects while the human thinks
+PROMOTION_PIECES = (knight, bishop, rook, queen)  # Indexed by the low bits of a promotion flag
 
 ######################
 ######################
@@ -85,6 +94,7 @@ def draw_status_bar():
     # Draw status bar background
     pygame.draw.rect(gamedisplay, STATUS_BAR_COLOR, [0, STATUS_BAR_Y, 800, STATUS_BAR_HEIGHT])
     pygame.draw.line(gamedisplay, BORDER_COLOR, (0, STATUS_BAR_Y), (800, STATUS_BAR_Y), 2)
+    renderer.damage([0, STATUS_BAR_Y - 1, 800, STATUS_BAR_HEIGHT + 1])
 
 def draw_status_message(message, color=TEXT_COLOR):
     """
@@ -134,74 +144,14 @@ while not quitgame:
         pygame.display.update()
         clock.tick(60)  # Limit to 60 FPS
 
-def square(x, y, w, h, color):
-    """
-    Draw a square on the game board.
-    
-    Args:
-        x, y (int): Position coordinates
-        w, h (int): Width and height of square
-        color (tuple): RGB color of square
-    """
-    pygame.draw.rect(gamedisplay, color, [x, y, w, h])
-    allTiles.append([color, [x, y, w, h]])
-
 def drawchesspieces():
     """
     Draw the chess board and all pieces.
-    This function creates the visual representation of the game state.
+    Only the squares whose piece or highlight changed since the last call are
+    repainted; they reach the screen with the next renderer.flush().
     """
-    xpos = 0
-    ypos = 0
-    color = 0
-    width = 100
-    height = 100
-    black = (101, 67, 33)  # Dark brown for black squares
-    white = (255, 248, 220)  # Cream white for white squares
-    number = 0
-
-    # Clear previous pieces
-    allTiles.clear()
-    allpieces.clear()
-
-    # Draw the 8x8 chess board
-    for rows in range(8):
-        for column in range(8):
-            if color % 2 == 0:
-                square(xpos, ypos, width, height, white)
-                # If there's a piece on this tile, load and draw its image
-                if not chessBoard.gameTiles[rows][column].pieceonTile.tostring() == "-":
-                    img = pygame.image.load("./chessart/"
-                                            + chessBoard.gameTiles[rows][column].pieceonTile.alliance[0].upper()
-                                            + chessBoard.gameTiles[rows][column].pieceonTile.tostring().upper()
-                                            + ".png")
-                    img = pygame.transform.scale(img, (100, 100))
-                    allpieces.append([img, [xpos, ypos], chessBoard.gameTiles[rows][column].pieceonTile])
-
-                xpos += 100
-
-            else:
-                square(xpos, ypos, width, height, black)
-                # If there's a piece on this tile, load and draw its image
-                if not chessBoard.gameTiles[rows][column].pieceonTile.tostring() == "-":
-                    img = pygame.image.load("./chessart/"
-                                        + chessBoard.gameTiles[rows][column].pieceonTile.alliance[0].upper()
-                                        + chessBoard.gameTiles[rows][column].pieceonTile.tostring().upper()
-                                        + ".png")
-                    img = pygame.transform.scale(img, (100, 100))
-                    allpieces.append([img, [xpos, ypos], chessBoard.gameTiles[rows][column].pieceonTile])
-
-                xpos += 100
-
-            color += 1
-            number += 1
-
-        color += 1
-        xpos = 0
-        ypos += 100
-        # Draw all pieces on the board
-        for img in allpieces:
-            gamedisplay.blit(img[0], img[1])
+    renderer.clear_highlights()
+    renderer.render(chessBoard.gameTiles)
 
 def updateposition(x, y):
     """
@@ -217,6 +167,35 @@ def updateposition(x, y):
     b = a + y
     return b
 
+def draw_search_status(search):
+    """
+    Show the progress of the AI's search in the status bar.
+
+    Args:
+        search (BackgroundSearch): The running search
+    """
+    latest = search.latest
+    if latest is None:
+        draw_status_message("AI is thinking...")
+        return
+    best = move_name(latest.move) if latest.move else '-'
+    draw_status_message("AI is thinking...  depth %d  nodes %d  best %s"
+                        % (latest.depth, search.nodes(), best))
+
+
+def legal_moves_of(color):
+    """
+    Generate the legal moves of one side on the current board.
+
+    Args:
+        color: WHITE or BLACK
+
+    Returns:
+        MoveList: Encoded legal moves, castling and en passant included
+    """
+    return generate_legal_moves(Position.from_gametiles(chessBoard.gameTiles, color))
+
+
 def givecolour(x, y):
     """
     Determine the color of a square at given coordinates.
@@ -241,165 +220,101 @@ def givecolour(x, y):
 # Main game loop for AI vs Human mode
 if saki == 'ai':
     moves = []  # Store valid moves for selected piece
-    enpassant = []  # Store en passant information
     promote = []  # Store promotion information
     promotion = False  # Flag for pawn promotion
     turn = 0  # Track whose turn it is (0 = White, 1 = Black)
 
     array = []  # Temporary array for move calculations
     quitgame = False
+    ai_search = BackgroundSearch(ai)  # Runs the AI's searches off the event loop
+    sys.setswitchinterval(0.001)  # Hand the GIL back to the event loop quickly (default 5 ms)
+    expected_reply = 0  # Human move the AI's last search expected, pondered during the human's turn
+    drawchesspieces()  # The whole board, the renderer starts with every square unknown
 
     # Main game loop
     while not quitgame:
+        # Human's turn: ponder, i.e. search the position after the reply the AI expects
+        if AI_PONDER and turn % 2 == 0 and expected_reply and ai_search.idle():
+            position = Position.from_gametiles(chessBoard.gameTiles, WHITE)
+            if expected_reply in generate_legal_moves(position):
+                position.make_move(expected_reply)
+                ai_search.ponder(position)
+            expected_reply = 0
+
+        # AI's turn (Black): the search runs on a worker thread, so the window keeps
+        # repainting and handling events; the move is played once the search is done
+        if not turn % 2 == 0 and promotion == False:
+            if ai_search.ponder_key:
+                if ai_search.ponder_key == Position.from_gametiles(chessBoard.gameTiles, BLACK).key:
+                    ai_search.ponderhit(AI_TIME_LIMIT)  # Ponder hit: keep searching, time already spent counts
+                else:
+                    ai_search.cancel()  # Ponder miss: its work stays in the transposition table
+                    ai_search.poll()
+            if ai_search.idle():
+                ai_search.start(Position.from_gametiles(chessBoard.gameTiles, BLACK), time_limit=AI_TIME_LIMIT)
+            result = ai_search.poll()
+            if result is not None and result.move:  # No move means the game is over, which the check below reports
+                turn = turn + 1
+                expected_reply = result.pv[1] if len(result.pv) > 1 else 0
+                y, x, n, m = result.coordinates()
+                promoted = None
+                if result.move >> 12 & PROMOTION:
+                    promoted = PROMOTION_PIECES[result.move >> 12 & 3]  # The piece the search chose
+
+                # Execute AI move, castling, en passant and promotion included
+                chessBoard.makemove(y, x, n, m, promoted)
+                chessBoard.printboard()
+                drawchesspieces()
+                moves = []
+
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 quitgame = True
+                ai_search.cancel()
                 pygame.quit()
                 quit()
-
-            # Check for checkmate conditions
-            if movex.checkw(chessBoard.gameTiles)[0] == 'checked' and len(moves) == 0:
-                array = movex.movesifcheckedw(chessBoard.gameTiles)
-                if len(array) == 0:
+            if event.type == pygame.VIDEORESIZE:
+                sprites.invalidate()  # Sprites are converted for the old display surface
+                renderer.invalidate()
+                drawchesspieces()
+
+            # Check for checkmate and stalemate conditions
+            if len(moves) == 0:
+                white_moves = legal_moves_of(WHITE)
+                black_moves = legal_moves_of(BLACK)
+                if len(white_moves) == 0 and movex.checkw(chessBoard.gameTiles)[0] == 'checked':
                     saki = 'end1'  # Black wins by checkmate
                     quitgame = True
                     break
 
-            if movex.checkb(chessBoard.gameTiles)[0] == 'checked' and len(moves) == 0:
-                array = movex.movesifcheckedb(chessBoard.gameTiles)
-                if len(array) == 0:
+                if len(black_moves) == 0 and movex.checkb(chessBoard.gameTiles)[0] == 'checked':
                     saki = 'end2'  # White wins by checkmate
                     quitgame = True
                     break
 
-            # Check for stalemate conditions
-            if movex.checkb(chessBoard.gameTiles)[0] == 'notchecked' and turn % 2 == 1 and len(moves) == 0:
-                check = False
-                for x in range(8):
-                    for y in range(8):
-                        if chessBoard.gameTiles[y][x].pieceonTile.alliance == 'Black' and turn % 2 == 1:
-                            moves1 = chessBoard.gameTiles[y][x].pieceonTile.legalmoveb(chessBoard.gameTiles)
-                            lx1 = movex.pinnedb(chessBoard.gameTiles, moves1, y, x)
-                            if len(lx1) == 0:
-                                continue
-                            else:
-                                check = True
-                            if check == True:
-                                break
-                    if check == True:
-                        break
-
-                if check == False:
+                if len(black_moves) == 0 and turn % 2 == 1:
                     saki = 'end3'  # Stalemate
                     quitgame = True
                     break
 
-            if movex.checkw(chessBoard.gameTiles)[0] == 'notchecked' and turn % 2 == 0 and len(moves) == 0:
-                check = False
-                for x in range(8):
-                    for y in range(8):
-                        if chessBoard.gameTiles[y][x].pieceonTile.alliance == 'White' and turn % 2 == 0:
-                            moves1 = chessBoard.gameTiles[y][x].pieceonTile.legalmoveb(chessBoard.gameTiles)
-                            lx1 = movex.pinnedw(chessBoard.gameTiles, moves1, y, x)
-                            if len(lx1) == 0:
-                                continue
-                            else:
-                                check = True
-                            if check == True:
-                                break
-                    if check == True:
-                        break
-
-                if check == False:
+                if len(white_moves) == 0 and turn % 2 == 0:
                     saki = 'end3'  # Stalemate
                     quitgame = True
 
-            # AI's turn (Black)
-            if not turn % 2 == 0 and promotion == False:
-                turn = turn + 1
-                sc = copy.deepcopy(chessBoard.gameTiles)
-                y, x, fx, fy = ai.evaluate(sc)  # AI evaluates the board and chooses a move
-                m = fy
-                n = fx
-                
-                # Handle special moves for AI
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'K' or chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'R':
-                    chessBoard.gameTiles[y][x].pieceonTile.moved = True
-
-                # Castling for AI
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'K' and m == x + 2:
-                    chessBoard.gameTiles[y][x+1].pieceonTile = chessBoard.gameTiles[y][x+3].pieceonTile
-                    s = updateposition(y, x+1)
-                    chessBoard.gameTiles[y][x+1].pieceonTile.position = s
-                    chessBoard.gameTiles[y][x+3].pieceonTile = nullpiece()
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'K' and m == x - 2:
-                    chessBoard.gameTiles[y][x-1].pieceonTile = chessBoard.gameTiles[y][0].pieceonTile
-                    s = updateposition(y, x-1)
-                    chessBoard.gameTiles[y][x-1].pieceonTile.position = s
-                    chessBoard.gameTiles[y][0].pieceonTile = nullpiece()
-
-                # En passant for AI
-                if not len(enpassant) == 0:
-                    chessBoard.gameTiles[enpassant[0]][enpassant[1]].pieceonTile.enpassant = False
-                    enpassant = []
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'P' and y + 1 == n and x + 1 == m and chessBoard.gameTiles[n][m].pieceonTile.tostring() == '-':
-                    chessBoard.gameTiles[y][x+1].pieceonTile = nullpiece()
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'P' and y + 1 == n and x - 1 == m and chessBoard.gameTiles[n][m].pieceonTile.tostring() == '-':
-                    chessBoard.gameTiles[y][x-1].pieceonTile = nullpiece()
-
-                # Pawn moves for AI
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'P' and n == y + 2:
-                    chessBoard.gameTiles[y][x].pieceonTile.enpassant = True
-                    enpassant = [n, m]
-
-                # Pawn promotion for AI
-                if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'P' and y + 1 == n and y == 6:
-                    promotion = True
-
-                # Execute AI move
-                if promotion == False:
-                    chessBoard.gameTiles[n][m].pieceonTile = chessBoard.gameTiles[y][x].pieceonTile
-                    chessBoard.gameTiles[y][x].pieceonTile = nullpiece()
-                    s = updateposition(n, m)
-                    chessBoard.gameTiles[n][m].pieceonTile.position = s
-                    allTiles.clear()
-                    allpieces.clear()
-                    chessBoard.printboard()
-                    drawchesspieces()
-                    moves = []
-
-                # Handle pawn promotion for AI
-                if promotion == True:
-                    if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'P':
-                        chessBoard.gameTiles[y][x].pieceonTile = nullpiece()
-                        chessBoard.gameTiles[n][m].pieceonTile = queen('Black', updateposition(n, m))
-                        allTiles.clear()
-                        allpieces.clear()
-                        chessBoard.printboard()
-                        drawchesspieces()
-                        moves = []
-                        promote = []
-                        promotion = False
-
-            # Handle human player's moves
-            if event.type == pygame.MOUSEBUTTONDOWN:
+            # Handle human player's moves, not while the AI is thinking about its own move
+            if event.type == pygame.MOUSEBUTTONDOWN and (ai_search.pondering or not ai_search.busy()):
                 # Handle moves when in check
                 if movex.checkw(chessBoard.gameTiles)[0] == 'checked' and len(moves) == 0:
-                    array = movex.movesifcheckedw(chessBoard.gameTiles)
+                    legal = legal_moves_of(WHITE)
                     coord = pygame.mouse.get_pos()
                     m = math.floor(coord[0]/100)
                     n = math.floor(coord[1]/100)
-                    imgx = pygame.transform.scale(pygame.image.load("./chessart/red_square.png",), (100, 100))
-                    mx = []
-                    ma = []
-                    for move in array:
-                        if(move[1] == m and move[0] == n):
-                            mx = [move[3]*100, move[2]*100]
-                            ma = [move[2], move[3]]
-                            moves.append(ma)
-                            gamedisplay.blit(imgx, mx)
-                            x = move[1]
-                            y = move[0]
+                    for target in legal.targets(n*8 + m):
+                        moves.append(target)
+                        renderer.highlight(target[0], target[1])
+                        x = m
+                        y = n
+                    renderer.render(chessBoard.gameTiles)
                     break
 
                 # Handle pawn promotion
@@ -414,24 +329,18 @@ if saki == 'ai':
                                 break
                             if promote[i][0] == n and promote[i][1] == m:
                                 if i == 0:
-                                    chessBoard.gameTiles[promote[4][1]][promote[4][0]].pieceonTile = queen('White', updateposition(promote[4][1], promote[4][0]))
-                                    chessBoard.gameTiles[promote[5][0]][promote[5][1]].pieceonTile = nullpiece()
+                                    chessBoard.makemove(promote[5][0], promote[5][1], promote[4][1], promote[4][0], queen)
                                     break
                                 if i == 1:
-                                    chessBoard.gameTiles[promote[4][1]][promote[4][0]].pieceonTile = rook('White', updateposition(promote[4][1], promote[4][0]))
-                                    chessBoard.gameTiles[promote[5][0]][promote[5][1]].pieceonTile = nullpiece()
+                                    chessBoard.makemove(promote[5][0], promote[5][1], promote[4][1], promote[4][0], rook)
                                     break
                                 if i == 2:
-                                    chessBoard.gameTiles[promote[4][1]][promote[4][0]].pieceonTile = knight('White', updateposition(promote[4][1], promote[4][0]))
-                                    chessBoard.gameTiles[promote[5][0]][promote[5][1]].pieceonTile = nullpiece()
+                                    chessBoard.makemove(promote[5][0], promote[5][1], promote[4][1], promote[4][0], knight)
                                     break
                                 if i == 3:
-                                    chessBoard.gameTiles[promote[4][1]][promote[4][0]].pieceonTile = bishop('White', updateposition(promote[4][1], promote[4][0]))
-                                    chessBoard.gameTiles[promote[5][0]][promote[5][1]].pieceonTile = nullpiece()
+                                    chessBoard.makemove(promote[5][0], promote[5][1], promote[4][1], promote[4][0], bishop)
                                     break
 
-                    allTiles.clear()
-                    allpieces.clear()
                     chessBoard.printboard()
                     drawchesspieces()
                     promote = []
@@ -446,50 +355,14 @@ if saki == 'ai':
                         if move[0] == n and move[1] == m:
                             turn = turn + 1
                             
-                            # Handle special moves for human player
-                            if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'k' or chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'r':
-                                chessBoard.gameTiles[y][x].pieceonTile.moved = True
-
-                            # Castling for human player
-                            if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'k' and m == x + 2:
-                                chessBoard.gameTiles[y][x+1].pieceonTile = chessBoard.gameTiles[y][x+3].pieceonTile
-                                s = updateposition(y, x+1)
-                                chessBoard.gameTiles[y][x+1].pieceonTile.position = s
-                                chessBoard.gameTiles[y][x+3].pieceonTile = nullpiece()
-                            if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'k' and m == x - 2:
-                                chessBoard.gameTiles[y][x-1].pieceonTile = chessBoard.gameTiles[y][0].pieceonTile
-                                s = updateposition(y, x-1)
-                                chessBoard.gameTiles[y][x-1].pieceonTile.position = s
-                                chessBoard.gameTiles[y][0].pieceonTile = nullpiece()
-
-                            # En passant for human player
-                            if not len(enpassant) == 0:
-                                chessBoard.gameTiles[enpassant[0]][enpassant[1]].pieceonTile.enpassant = False
-                                enpassant = []
-
-                            if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'p' and y - 1 == n and x + 1 == m and chessBoard.gameTiles[n][m].pieceonTile.tostring() == '-':
-                                chessBoard.gameTiles[y][x+1].pieceonTile = nullpiece()
-                            if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'p' and y - 1 == n and x - 1 == m and chessBoard.gameTiles[n][m].pieceonTile.tostring() == '-':
-                                chessBoard.gameTiles[y][x-1].pieceonTile = nullpiece()
-
-                            # Pawn moves for human player
-                            if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'p' and n == y - 2:
-                                chessBoard.gameTiles[y][x].pieceonTile.enpassant = True
-                                enpassant = [n, m]
-
-                            # Pawn promotion for human player
+                            # Pawn promotion for human player: the piece is picked first
                             if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'p' and y - 1 == n and y == 1:
                                 promotion = True
 
-                            # Execute human move
+                            # Execute human move, castling and en passant included
                             if promotion == False:
-                                chessBoard.gameTiles[n][m].pieceonTile = chessBoard.gameTiles[y][x].pieceonTile
-                                chessBoard.gameTiles[y][x].pieceonTile = nullpiece()
-                                s = updateposition(n, m)
-                                chessBoard.gameTiles[n][m].pieceonTile.position = s
+                                chessBoard.makemove(y, x, n, m)
                     if promotion == False:
-                        allTiles.clear()
-                        allpieces.clear()
                         chessBoard.printboard()
                         drawchesspieces()
                         moves = []
@@ -498,26 +371,28 @@ if saki == 'ai':
                     if promotion == True:
                         if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'p' and x == 7 and y == 1:
                             pygame.draw.rect(gamedisplay, (0, 0, 0), [x*100-100, (y*100)+100, 200, 200])
-                            imgx = pygame.transform.scale(pygame.image.load("./chessart/WQ.png",), (100, 100))
-                            imgx1 = pygame.transform.scale(pygame.image.load("./chessart/WR.png",), (100, 100))
-                            imgx2 = pygame.transform.scale(pygame.image.load("./chessart/WN.png",), (100, 100))
-                            imgx3 = pygame.transform.scale(pygame.image.load("./chessart/WB.png",), (100, 100))
+                            imgx = sprites.get('WQ', 100)
+                            imgx1 = sprites.get('WR', 100)
+                            imgx2 = sprites.get('WN', 100)
+                            imgx3 = sprites.get('WB', 100)
                             gamedisplay.blit(imgx, [x*100-100, (y*100)+200])
                             gamedisplay.blit(imgx1, [(x*100), (y*100)+200])
                             gamedisplay.blit(imgx2, [x*100-100, (y*100)+100])
                             gamedisplay.blit(imgx3, [(x*100), (y*100)+100])
+                            renderer.damage([x*100-100, (y*100)+100, 200, 200])
                             promote = [[y+2, x-1], [y+2, x], [y+1, x], [y+1, x], [m, n], [y, x]]
 
                         elif chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'p':
                             pygame.draw.rect(gamedisplay, (0, 0, 0), [x*100, (y*100)+100, 200, 200])
-                            imgx = pygame.transform.scale(pygame.image.load("./chessart/WQ.png",), (100, 100))
-                            imgx1 = pygame.transform.scale(pygame.image.load("./chessart/WR.png",), (100, 100))
-                            imgx2 = pygame.transform.scale(pygame.image.load("./chessart/WN.png",), (100, 100))
-                            imgx3 = pygame.transform.scale(pygame.image.load("./chessart/WB.png",), (100, 100))
+                            imgx = sprites.get('WQ', 100)
+                            imgx1 = sprites.get('WR', 100)
+                            imgx2 = sprites.get('WN', 100)
+                            imgx3 = sprites.get('WB', 100)
                             gamedisplay.blit(imgx, [x*100, (y*100)+200])
                             gamedisplay.blit(imgx1, [(x*100)+100, (y*100)+200])
                             gamedisplay.blit(imgx2, [x*100, (y*100)+100])
                             gamedisplay.blit(imgx3, [(x*100)+100, (y*100)+100])
+                            renderer.damage([x*100, (y*100)+100, 200, 200])
                             promote = [[y+2, x], [y+2, x+1], [y+1, x], [y+1, x+1], [m, n], [y, x]]
 
                 else:
@@ -527,33 +402,11 @@ if saki == 'ai':
                     y = math.floor(coords[1]/100)
                     mx = []
                     
-                    # Calculate valid moves for selected piece
-                    if(chessBoard.gameTiles[y][x].pieceonTile.alliance == 'White'):
-                        moves = chessBoard.gameTiles[y][x].pieceonTile.legalmoveb(chessBoard.gameTiles)
-                        
-                        # Handle special moves for king
-                        if(chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'k'):
-                            ax = movex.castlingw(chessBoard.gameTiles)
-                            if not len(ax) == 0:
-                                for l in ax:
-                                    if l == 'ks':
-                                        moves.append([7, 6])
-                                    if l == 'qs':
-                                        moves.append([7, 2])
-                        
-                        # Handle en passant for pawns
-                        if(chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'p'):
-                            ay = movex.enpassantb(chessBoard.gameTiles, y, x)
-                            if not len(ay) == 0:
-                                if ay[1] == 'r':
-                                    moves.append([y-1, x+1])
-                                else:
-                                    moves.append([y-1, x-1])
-
-                    # Filter moves based on pins
+                    # Calculate valid moves for selected piece, castling and en passant included
                     if chessBoard.gameTiles[y][x].pieceonTile.alliance == 'White':
-                        lx = movex.pinnedw(chessBoard.gameTiles, moves, y, x)
-                    moves = lx
+                        moves = legal_moves_of(WHITE).targets(y*8 + x)
+                    else:
+                        moves = []
 
                     # AI thinking message
                     if not turn % 2 == 0:
@@ -571,17 +424,25 @@ if saki == 'ai':
                         moves = []
 
                     # Highlight selected piece and valid moves
-                    imgx = pygame.transform.scale(pygame.image.load("./chessart/red_square.png",), (100, 100))
                     for move in moves:
-                        mx = [move[1]*100, move[0]*100]
-                        gamedisplay.blit(imgx, mx)
-
-        # Draw all pieces on the board
-        for img in allpieces:
-            gamedisplay.blit(img[0], img[1])
-
-        pygame.display.update()
-        clock.tick(60)  # Limit to 60 FPS
+                        renderer.highlight(move[0], move[1])
+                    renderer.render(chessBoard.gameTiles)
+
+        # Live depth, nodes and best move of the AI's search
+        thinking = ai_search.busy() and not ai_search.pondering
+        if thinking:
+            draw_search_status(ai_search)
+
+        # Only the squares that changed reach the screen
+        renderer.flush()
+        if thinking or (not turn % 2 == 0 and promotion == False):
+            clock.tick(60)  # Limit to 60 FPS while the AI is about to move
+        else:
+            # Nothing to animate: sleep until the next event instead of polling
+            event = pygame.event.wait(IDLE_WAIT_MS)
+            if event.type != pygame.NOEVENT:
+                pygame.event.post(event)
+            clock.tick()
 
 # Game over screen for Black win (checkmate)
 if saki == 'end1':
@@ -661,8 +522,7 @@ def handle_ai_move():
     This function encapsulates the AI move logic for better organization.
     """
     turn = turn + 1
-    sc = copy.deepcopy(chessBoard.gameTiles)
-    y, x, fx, fy = ai.evaluate(sc)
+    y, x, fx, fy = ai.evaluate(chessBoard.gameTiles, time_limit=AI_TIME_LIMIT).coordinates()
     m = fy
     n = fx
     
@@ -706,16 +566,12 @@ def handle_ai_move():
         chessBoard.gameTiles[y][x].pieceonTile = nullpiece()
         s = updateposition(n, m)
         chessBoard.gameTiles[n][m].pieceonTile.position = s
-        allTiles.clear()
-        allpieces.clear()
         chessBoard.printboard()
         drawchesspieces()
         moves = []
     else:
         chessBoard.gameTiles[y][x].pieceonTile = nullpiece()
         chessBoard.gameTiles[n][m].pieceonTile = queen('Black', updateposition(n, m))
-        allTiles.clear()
-        allpieces.clear()
         chessBoard.printboard()
         drawchesspieces()
         moves = []
@@ -735,27 +591,7 @@ def handle_human_move(event):
         y = math.floor(coord[1]/100)
         
         if chessBoard.gameTiles[y][x].pieceonTile.alliance == 'White':
-            moves = chessBoard.gameTiles[y][x].pieceonTile.legalmoveb(chessBoard.gameTiles)
-            
-            # Handle special moves
-            if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'k':
-                ax = movex.castlingw(chessBoard.gameTiles)
-                if ax:
-                    for l in ax:
-                        if l == 'ks':
-                            moves.append([7, 6])
-                        if l == 'qs':
-                            moves.append([7, 2])
-            
-            if chessBoard.gameTiles[y][x].pieceonTile.tostring() == 'p':
-                ay = movex.enpassantb(chessBoard.gameTiles, y, x)
-                if ay:
-                    if ay[1] == 'r':
-                        moves.append([y-1, x+1])
-                    else:
-                        moves.append([y-1, x-1])
-            
-            moves = movex.pinnedw(chessBoard.gameTiles, moves, y, x)
+            moves = legal_moves_of(WHITE).targets(y*8 + x)
             
             if not turn % 2 == 0:
                 moves = []
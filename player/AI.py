@@ -1,58 +1,390 @@
 """
-AI module implementing a chess AI using the minimax algorithm with alpha-beta pruning.
+AI module implementing a chess AI using negamax alpha-beta search with principal variation search.
 This module contains the AI class that handles computer player moves and game state evaluation.
 """
 
-from board.move import move
-from pieces.nullpiece import nullpiece
-from pieces.queen import queen
-import random
+from board.bitboard import (Position, WHITE, BLACK, PAWN, KNIGHT, KING, EMPTY, EN_PASSANT, PROMOTION,
+                            iter_bits)
+from board.movegen import MoveList, generate_legal_moves
+from board.piece_square import MOBILITY_WEIGHT, PIECE_VALUES
+from player.transposition import TranspositionTable, DEFAULT_HASH_MB, EXACT, LOWER, UPPER
+from player.move_ordering import MoveOrderer
+from player.search_result import SearchResult
+import time
+
+DEFAULT_DEPTH = 3  # Search depth when evaluate() is given no time or node limit
+MAX_DEPTH = 64  # Deepest iteration tried when searching on a time or node limit
+DEFAULT_QSEARCH_DEPTH = 8  # Plies of captures searched beyond the horizon, 0 turns quiescence off
+DELTA_MARGIN = 200  # A capture must be able to lift the stand-pat score this close to alpha (beta)
+PIECE_WORTH = [PIECE_VALUES[name] for name in 'pnbrq'] + [0]  # Material gained by capturing a piece type
+QUEEN_PROMOTION = PROMOTION | 3
+INFINITE = 1000000000
+MATE_SCORE = 1000000  # Score of the side to move when it is checkmated is -(MATE_SCORE - ply)
+MATE_BOUND = MATE_SCORE - 1000  # Scores at least this far from zero are mate scores
+ASPIRATION_WINDOW = 100  # Half width of the root window around the previous score, 0 for full windows
+
+# Selective search, see AI.negamax
+NULL_MOVE_MIN_DEPTH = 3  # Null-move pruning is tried from this depth on
+NULL_MOVE_REDUCTION = 2  # Depth taken off the null-move search, one more above depth 6
+REVERSE_FUTILITY_DEPTH = 3  # Reverse futility pruning up to this depth
+REVERSE_FUTILITY_MARGIN = 120  # Per ply of remaining depth
+FUTILITY_MARGINS = (0, 200, 500)  # Quiet moves are pruned at depth 1 and 2 with these margins
+LMR_MIN_DEPTH = 3  # Late move reductions from this depth on
+LMR_MIN_INDEX = 3  # Moves before this one in the ordered list are never reduced
+
+
+def score_to_tt(score, ply):
+    """
+    Convert a search score for the transposition table.
+
+    Mate scores count plies from the root; in the table they count plies from
+    the stored position, so that they stay right when it is reached by
+    another path.
+
+    Args:
+        score: Score from the point of view of the side to move
+        ply: Distance of the position from the root
+
+    Returns:
+        int: Score to store
+    """
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    """
+    Convert a transposition table score back to a search score.
+
+    Args:
+        score: Stored score
+        ply: Distance of the position from the root
+
+    Returns:
+        int: Score from the point of view of the side to move
+    """
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+class SearchAborted(Exception):
+    """Raised inside the search when its time or node limit is reached"""
+
 
 class AI:
     """
-    AI class that implements a chess computer player using minimax algorithm with alpha-beta pruning.
+    AI class that implements a chess computer player using negamax alpha-beta search.
     The AI evaluates board positions and makes moves based on piece values and positional advantages.
     """
 
-    # Global variable to store temporary moves during evaluation
-    global tp
-    tp = []
-
-    def __init__(self):
-        """Initialize the AI player"""
-        pass
+    def __init__(self, hash_mb=DEFAULT_HASH_MB, qsearch_depth=DEFAULT_QSEARCH_DEPTH, qsearch_evasions=True,
+                 pvs=True, aspiration=ASPIRATION_WINDOW, null_move=True, lmr=True, reverse_futility=True,
+                 futility=True, threads=1, root_workers=0):
+        """
+        Initialize the AI player.
 
-    def evaluate(self, gametiles):
+        Args:
+            hash_mb: Memory budget of the transposition table in MiB. The table
+                is kept between calls to evaluate() for the whole game.
+            qsearch_depth: Plies the quiescence search may go beyond the horizon, 0 to turn it off
+            qsearch_evasions: Search all check evasions in quiescence instead of only captures
+            pvs: Search moves after the first with a zero window (principal variation search)
+            aspiration: Half width of the root aspiration window, 0 to always use a full window
+            null_move: Prune with a reduced search after passing the turn (null-move pruning)
+            lmr: Search late quiet moves to a reduced depth first (late move reductions)
+            reverse_futility: Cut nodes whose static evaluation is far above beta
+            futility: Skip quiet moves near the horizon that cannot reach alpha
+            threads: Number of processes searching, more than 1 starts threads - 1
+                helper processes that share the transposition table (see player.smp)
+            root_workers: Number of worker processes the root moves are split
+                across instead, each with its own hash_mb table; 0 searches in
+                this process. Cannot be combined with threads.
         """
-        Evaluate the current board position and select the best move.
+        if threads > 1 and root_workers:
+            raise ValueError("threads and root_workers cannot be combined")
+        options = {'qsearch_depth': qsearch_depth, 'qsearch_evasions': qsearch_evasions, 'pvs': pvs,
+                   'aspiration': aspiration, 'null_move': null_move, 'lmr': lmr,
+                   'reverse_futility': reverse_futility, 'futility': futility}
+        self.helpers = None
+        self.root_pool = None
+        if root_workers:
+            from player.smp import RootSplitPool
+            self.root_pool = RootSplitPool(root_workers, hash_mb, options)
+        if threads > 1:
+            from player.smp import HelperPool
+            self.helpers = HelperPool(threads - 1, hash_mb, options)
+            self.tt = self.helpers.tt
+        else:
+            self.tt = TranspositionTable(hash_mb)
+        self.ordering = MoveOrderer()
+        self.nodes = 0
+        self.deadline = None
+        self.soft_deadline = None  # No new iteration is started after this time
+        self.node_limit = None
+        self.stop = None  # Set from another thread or process to abort the search, see check_limits()
+        self.progress = None  # Called with the SearchResult after every completed iteration
+        self.prev_pv = []
+        self.follow_pv = False
+        self.qsearch_depth = qsearch_depth
+        self.qsearch_evasions = qsearch_evasions
+        self.qnodes = 0
+        self.pvs = pvs
+        self.aspiration = aspiration
+        self.null_move = null_move
+        self.lmr = lmr
+        self.reverse_futility = reverse_futility
+        self.futility = futility
+        self.researches = 0  # Zero-window searches that failed high and were searched again
+        self.aspiration_researches = 0  # Root searches repeated after failing outside the window
+        self.prunes = {}  # Number of times each selective search technique applied
+        self.move_lists = []  # One move buffer per ply, see search()
+
+    def evaluate(self, gametiles, time_limit=None, node_limit=None, max_depth=None):
+        """
+        Evaluate the current board position and select the best move for Black.
+
+        The board is converted once into a bitboard Position and searched with
+        search(), so the grid passed in is never modified.
         
         Args:
             gametiles: The current state of the game board
+            time_limit: Seconds the search may take, or None
+            node_limit: Number of nodes the search may visit, or None
+            max_depth: Deepest iteration, DEFAULT_DEPTH if no limit is given
             
         Returns:
-            tuple: The coordinates of the best move (start_y, start_x, end_y, end_x)
+            SearchResult: Best move, score, principal variation and statistics
         """
-        min = 100000
-        count = 0
-        count2 = 0
-        chuk = []
-        movex = move()
-        tp.clear()
-        # Run minimax search with depth 3
-        xp = self.minimax(gametiles, 3, -1000000000, 1000000000, False)
-
-        # Find moves with the minimum evaluation score
-        for zoom in tp:
-            if zoom[4] < min:
-                chuk.clear()
-                chuk.append(zoom)
-                min = zoom[4]
-            if zoom[4] == min:
-                chuk.append(zoom)
-        # Randomly select one of the best moves
-        fx = random.randrange(len(chuk))
-        print(tp)
-        return chuk[fx][0], chuk[fx][1], chuk[fx][2], chuk[fx][3]
+        position = Position.from_gametiles(gametiles, BLACK)
+        return self.search(position, time_limit, node_limit, max_depth)
+
+    def search(self, position, time_limit=None, node_limit=None, max_depth=None, start_depth=1):
+        """
+        Search a position with iterative deepening.
+
+        Depth 1, 2, ... is searched until max_depth is reached or the time or
+        node limit runs out. The result comes from the last depth that was
+        searched completely, and every iteration tries the principal variation
+        of the previous one first. All search state lives on this AI instance,
+        so separate AI objects can search at the same time. With helper
+        processes (threads > 1) they search the same position until this
+        search is done, and their nodes are counted in the result. With
+        root_workers the search is handed to the RootSplitPool.
+
+        Args:
+            position: Position to search, left unchanged on return
+            time_limit: Seconds the search may take, or None
+            node_limit: Number of nodes the search may visit, or None
+            max_depth: Deepest iteration, at most MAX_DEPTH; DEFAULT_DEPTH if no limit is given
+            start_depth: First iteration
+
+        Returns:
+            SearchResult: Best move, score, principal variation and statistics
+        """
+        if max_depth is None:
+            max_depth = MAX_DEPTH if time_limit or node_limit else DEFAULT_DEPTH
+        max_depth = min(max_depth, MAX_DEPTH)  # The move lists and PV table end there
+        if self.root_pool is not None:
+            return self.root_pool.search(self, position, time_limit, node_limit, max_depth)
+        start = time.perf_counter()
+        self.prepare_search(time_limit, node_limit)
+        root_ply = position.ply
+        result = SearchResult()
+        score = 0
+        if self.helpers is not None:
+            self.helpers.start(position, max_depth)
+
+        for depth in range(start_depth, max_depth + 1):
+            self.depth = depth
+            self.pv_table = [[] for _ in range(depth + 1)]
+            try:
+                score = self.aspiration_search(position, depth, score)
+            except SearchAborted:
+                while position.ply > root_ply:  # Take back the moves of the unfinished line
+                    position.unmake_move()
+                break
+            self.prev_pv = self.pv_table[0]
+            result.move = self.prev_pv[0] if self.prev_pv else 0
+            result.score = score if position.side == WHITE else -score
+            result.pv = self.prev_pv
+            result.depth = depth
+            if self.progress is not None:
+                result.nodes = self.nodes
+                result.elapsed = time.perf_counter() - start
+                self.progress(result)
+            if not result.move:
+                break  # Checkmate or stalemate, nothing to search
+            # The next iteration would not finish in the time that is left
+            if self.soft_deadline is not None and time.perf_counter() > self.soft_deadline:
+                break
+
+        result.nodes = self.nodes
+        if self.helpers is not None:
+            result.nodes += self.helpers.stop()
+        result.qnodes = self.qnodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def prepare_search(self, time_limit=None, node_limit=None):
+        """
+        Reset the limits, counters and tables of the previous search.
+
+        Args:
+            time_limit: Seconds the search may take, or None
+            node_limit: Number of nodes the search may visit, or None
+        """
+        self.reset_limits(time_limit, node_limit)
+        self.researches = 0
+        self.aspiration_researches = 0
+        self.prunes = {'null_move': 0, 'reverse_futility': 0, 'futility': 0, 'lmr': 0, 'lmr_researches': 0}
+        self.prev_pv = []
+        self.follow_pv = False
+        while len(self.move_lists) <= MAX_DEPTH + self.qsearch_depth:
+            self.move_lists.append(MoveList())
+        self.tt.new_search()
+        self.ordering.new_search()
+        self.ordering.reset_stats()
+
+    def reset_limits(self, time_limit=None, node_limit=None):
+        """
+        Start a new time and node budget, keeping the tables of the search.
+
+        Args:
+            time_limit: Seconds from now the search may take, or None
+            node_limit: Number of nodes the search may visit from now, or None
+        """
+        now = time.perf_counter()
+        self.deadline = now + time_limit if time_limit else None
+        self.soft_deadline = now + time_limit / 2 if time_limit else None
+        self.node_limit = node_limit
+        self.nodes = 0
+        self.qnodes = 0
+
+    def search_moves(self, position, moves, depth):
+        """
+        Search some of the root moves of a position to a fixed depth.
+
+        This is the work of one process of a root-split search (see
+        player.smp.RootSplitPool). The moves are searched in order with
+        principal variation search: the first with a full window, the others
+        with a zero window around the best score so far, so a move that is
+        not better gets an upper bound instead of its exact score. Call
+        prepare_search() before the first depth of a search and
+        reset_limits() before the next ones.
+
+        Args:
+            position: Position to search, left unchanged on return
+            moves: Encoded moves of the side to move
+            depth: Depth to search every move to
+
+        Returns:
+            list: (move, score, principal variation) for every move, scores from the
+                  side to move's point of view
+
+        Raises:
+            SearchAborted: If a limit has been reached
+        """
+        self.depth = depth
+        self.pv_table = [[] for _ in range(depth + 1)]
+        alpha = -INFINITE
+        scores = []
+        for move in moves:
+            position.make_move(move)
+            try:
+                if alpha == -INFINITE or not self.pvs:
+                    score = -self.negamax(position, depth - 1, -INFINITE, -alpha, 1)
+                else:
+                    score = -self.negamax(position, depth - 1, -alpha - 1, -alpha, 1)
+                    if score > alpha:
+                        self.researches += 1
+                        score = -self.negamax(position, depth - 1, -INFINITE, -alpha, 1)
+            finally:
+                position.unmake_move()
+            scores.append((move, score, [move] + self.pv_table[1]))
+            alpha = max(alpha, score)
+        return scores
+
+    def aspiration_search(self, position, depth, guess):
+        """
+        Search the root with a narrow window around the previous score.
+
+        A window that fails low or high is widened on that side, doubling its
+        step each time, and the root is searched again until the score falls
+        inside it.
+
+        Args:
+            position: Position to search
+            depth: Depth of this iteration
+            guess: Score of the previous iteration from the side to move's point of view
+
+        Returns:
+            int: Score from the side to move's point of view
+        """
+        window = self.aspiration
+        if not window or depth == 1 or abs(guess) >= MATE_BOUND:
+            self.follow_pv = True
+            return self.negamax(position, depth, -INFINITE, INFINITE)
+        alpha = guess - window
+        beta = guess + window
+        while True:
+            self.follow_pv = True
+            score = self.negamax(position, depth, alpha, beta)
+            if alpha < score < beta:
+                return score
+            self.aspiration_researches += 1
+            window *= 2
+            if score <= alpha:
+                alpha = max(score - window, -INFINITE)
+            else:
+                beta = min(score + window, INFINITE)
+
+    def check_limits(self):
+        """
+        Stop the search when its node or time limit is used up, or when
+        the stop attribute (anything with an is_set() method, such as a
+        threading or multiprocessing Event) is set.
+
+        Raises:
+            SearchAborted: If a limit has been reached
+        """
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchAborted()
+        if self.nodes & 255:
+            return
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchAborted()
+        if self.stop is not None and self.stop.is_set():
+            raise SearchAborted()
+
+    def ponderhit(self, time_limit):
+        """
+        Give a running search without a time limit (pondering) one from now on.
+
+        Called from another thread when the opponent plays the move the
+        search assumed; the search goes on where it is, with everything it
+        found so far.
+
+        Args:
+            time_limit: Seconds the search may still take
+        """
+        now = time.perf_counter()
+        self.soft_deadline = now + time_limit / 2
+        self.deadline = now + time_limit
+
+    def close(self):
+        """Stop the helper or root worker processes, if any, and free the shared transposition table"""
+        if self.helpers is not None:
+            self.helpers.close()
+            self.helpers = None
+        if self.root_pool is not None:
+            self.root_pool.close()
+            self.root_pool = None
 
     def reset(self, gametiles):
         """
@@ -81,135 +413,242 @@ class AI:
         b = a + y
         return b
 
-    def checkmate(self, gametiles):
+    def checkmate(self, position):
         """
-        Check if the current position is checkmate.
+        Check if the side to move is checkmated.
         
         Args:
-            gametiles: The current state of the game board
+            position: The current position
             
         Returns:
             bool: True if the position is checkmate, False otherwise
         """
-        movex = move()
-        if movex.checkw(gametiles)[0] == 'checked':
-            array = movex.movesifcheckedw(gametiles)
-            if len(array) == 0:
-                return True
+        return position.in_check(position.side) and len(generate_legal_moves(position)) == 0
 
-        if movex.checkb(gametiles)[0] == 'checked':
-            array = movex.movesifcheckedb(gametiles)
-            if len(array) == 0:
-                return True
-
-    def stalemate(self, gametiles, player):
+    def stalemate(self, position):
         """
-        Check if the current position is stalemate.
+        Check if the side to move is stalemated.
         
         Args:
-            gametiles: The current state of the game board
-            player: True for White, False for Black
+            position: The current position
             
         Returns:
             bool: True if the position is stalemate, False otherwise
         """
-        movex = move()
-        if player == False:
-            if movex.checkb(gametiles)[0] == 'notchecked':
-                check = False
-                for x in range(8):
-                    for y in range(8):
-                        if gametiles[y][x].pieceonTile.alliance == 'Black':
-                            moves1 = gametiles[y][x].pieceonTile.legalmoveb(gametiles)
-                            lx1 = movex.pinnedb(gametiles, moves1, y, x)
-                            if len(lx1) == 0:
-                                continue
-                            else:
-                                check = True
-                            if check == True:
-                                break
-                    if check == True:
-                        break
-
-                if check == False:
-                    return True
-
-        if player == True:
-            if movex.checkw(gametiles)[0] == 'notchecked':
-                check = False
-                for x in range(8):
-                    for y in range(8):
-                        if gametiles[y][x].pieceonTile.alliance == 'White':
-                            moves1 = gametiles[y][x].pieceonTile.legalmoveb(gametiles)
-                            lx1 = movex.pinnedw(gametiles, moves1, y, x)
-                            if len(lx1) == 0:
-                                continue
-                            else:
-                                check = True
-                            if check == True:
-                                break
-                    if check == True:
-                        break
-
-                if check == False:
-                    return True
-
-    def minimax(self, gametiles, depth, alpha, beta, player):
-        """
-        Implement minimax algorithm with alpha-beta pruning.
-        
+        return not position.in_check(position.side) and len(generate_legal_moves(position)) == 0
+
+    def negamax(self, position, depth, alpha, beta, ply=0, allow_null=True):
+        """
+        Alpha-beta search in negamax form with principal variation search.
+
+        Scores are from the point of view of the side to move. The first
+        (best ordered) move is searched with the full window, every other
+        move with a zero window around alpha that only proves it is not
+        better; a move that does fail high is searched again with the full
+        window. Moves are played and taken back on the position with
+        make_move() and unmake_move(), so the position is unchanged when the
+        call returns.
+
+        Away from the principal variation and out of check the search is
+        selective, each technique switched by an attribute of the same name:
+
+        * reverse_futility: near the horizon a static evaluation that beats
+          beta by a margin per ply is returned at once;
+        * null_move: the side to move passes and a reduced search still
+          fails high, so a real move would too. Skipped when the side has
+          only pawns left (zugzwang) and right after another null move;
+        * futility: at depth 1 and 2 quiet moves that do not give check are
+          skipped when the static evaluation plus a margin cannot reach alpha;
+        * lmr: quiet moves late in the ordering are searched one or two plies
+          shallower and only searched again at full depth if they beat alpha.
+
         Args:
-            gametiles: The current state of the game board
-            depth: Current depth in the search tree
+            position: The current position
+            depth: Remaining depth in the search tree
             alpha: Alpha value for alpha-beta pruning
             beta: Beta value for alpha-beta pruning
-            player: True for maximizing player (White), False for minimizing player (Black)
-            
+            ply: Distance from the root
+            allow_null: False right after a null move
+
         Returns:
-            int: Evaluation score of the position
-        """
-        if depth == 0 or self.checkmate(gametiles) == True or self.stalemate(gametiles, player) == True:
-            return self.calculateb(gametiles)
-        if not player:
-            minEval = 100000000
-            kp, ks = self.eva(gametiles, player)
-            for lk in kp:
-                for move in lk:
-                    mts = gametiles[move[2]][move[3]].pieceonTile
-                    gametiles = self.move(gametiles, move[0], move[1], move[2], move[3])
-                    evalk = self.minimax(gametiles, depth-1, alpha, beta, True)
-                    if evalk < minEval and depth == 3:
-                        tp.clear()
-                        tp.append(move)
-                    if evalk == minEval and depth == 3:
-                        tp.append(move)
-                    minEval = min(minEval, evalk)
-                    beta = min(beta, evalk)
-                    gametiles = self.revmove(gametiles, move[2], move[3], move[0], move[1], mts)
-                    if beta <= alpha:
-                        break
-
-                if beta <= alpha:
+            int: Evaluation score of the position for the side to move
+        """
+        self.nodes += 1
+        if self.depth > 1:
+            self.check_limits()
+        self.pv_table[ply] = []
+        if depth <= 0:
+            return self.quiesce(position, alpha, beta, 0, ply)
+
+        # Reuse the result of an earlier search of this position if it is deep enough
+        alpha_orig = alpha
+        entry = self.tt.probe(position.key)
+        if entry is not None and ply and entry[0] >= depth:
+            score = score_from_tt(entry[2], ply)
+            if entry[1] == EXACT:
+                return score
+            if entry[1] == LOWER and score >= beta:
+                return score
+            if entry[1] == UPPER and score <= alpha:
+                return score
+
+        color = position.side
+        in_check = position.in_check(color)
+        selective = ply and beta - alpha == 1 and not in_check  # Zero-window node out of check
+        static = None
+        if selective:
+            static = (self.calculateb(position) if color == WHITE else -self.calculateb(position))
+            if (self.reverse_futility and depth <= REVERSE_FUTILITY_DEPTH and abs(beta) < MATE_BOUND
+                    and static - REVERSE_FUTILITY_MARGIN * depth >= beta):
+                self.prunes['reverse_futility'] += 1
+                return static
+            pieces = position.pieces
+            if (self.null_move and allow_null and depth >= NULL_MOVE_MIN_DEPTH and static >= beta
+                    and position.occupancy[color] ^ pieces[color * 6 + PAWN] ^ pieces[color * 6 + KING]):
+                reduction = NULL_MOVE_REDUCTION + (depth > 6)
+                position.make_null_move()
+                score = -self.negamax(position, max(depth - 1 - reduction, 0), -beta, -beta + 1, ply + 1, False)
+                position.unmake_move()
+                if score >= beta:
+                    self.prunes['null_move'] += 1
+                    return beta if score >= MATE_BOUND else score  # A mate found after passing is not proven
+
+        moves = self.eva(position, ply)
+        if len(moves) == 0:  # Checkmate or stalemate
+            return -(MATE_SCORE - ply) if in_check else 0
+
+        # Search the previous principal variation first, otherwise the hash move
+        first = 0
+        if self.follow_pv:
+            if ply < len(self.prev_pv) and self.prev_pv[ply] in moves:
+                first = self.prev_pv[ply]
+            else:
+                self.follow_pv = False
+        if not first and entry is not None:
+            first = entry[3]
+        moves = self.ordering.order(position, moves, first, ply)
+
+        futile = (selective and self.futility and depth < len(FUTILITY_MARGINS) and abs(alpha) < MATE_BOUND
+                  and static + FUTILITY_MARGINS[depth] <= alpha)
+        reduce = selective and self.lmr and depth >= LMR_MIN_DEPTH
+        squares = position.squares
+        best = 0
+        value = -INFINITE
+        for index, move in enumerate(moves):
+            quiet = squares[move >> 6 & 63] == EMPTY and move >> 12 < EN_PASSANT
+            position.make_move(move)
+            gives_check = quiet and (futile or reduce) and position.in_check(color ^ 1)
+            if futile and quiet and index and not gives_check:
+                position.unmake_move()
+                self.prunes['futility'] += 1
+                continue
+            if index == 0 or not self.pvs:
+                score = -self.negamax(position, depth-1, -beta, -alpha, ply + 1)
+            else:
+                score = alpha + 1
+                if reduce and quiet and index >= LMR_MIN_INDEX and not gives_check:
+                    self.prunes['lmr'] += 1
+                    reduction = 1 + (index >= 6 and depth >= 6)
+                    score = -self.negamax(position, depth-1-reduction, -alpha-1, -alpha, ply + 1)
+                    if score > alpha:
+                        self.prunes['lmr_researches'] += 1
+                if score > alpha:
+                    score = -self.negamax(position, depth-1, -alpha-1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    self.researches += 1
+                    score = -self.negamax(position, depth-1, -beta, -alpha, ply + 1)
+            position.unmake_move()
+            self.follow_pv = False
+            if score > value:
+                value = score
+                best = move
+                self.pv_table[ply] = [move] + self.pv_table[ply + 1]
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    self.ordering.cutoff(position, move, ply, depth, index)
                     break
-            return minEval
 
+        if value <= alpha_orig:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
         else:
-            maxEval = -100000000
-            kp, ks = self.eva(gametiles, player)
-            for lk in ks:
-                for move in lk:
-                    mts = gametiles[move[2]][move[3]].pieceonTile
-                    gametiles = self.movew(gametiles, move[0], move[1], move[2], move[3])
-                    evalk = self.minimax(gametiles, depth-1, alpha, beta, False)
-                    maxEval = max(maxEval, evalk)
-                    alpha = max(alpha, evalk)
-                    gametiles = self.revmove(gametiles, move[2], move[3], move[0], move[1], mts)
-                    if beta <= alpha:
-                        break
-                if beta <= alpha:
-                    break
+            bound = EXACT
+        self.tt.store(position.key, depth, bound, score_to_tt(value, ply), best)
+        return value
+
+    def quiesce(self, position, alpha, beta, qdepth, ply):
+        """
+        Search captures beyond the horizon until the position is quiet.
 
-            return maxEval
+        The side to move may "stand pat" on the static evaluation instead of
+        capturing, so only captures (and queen promotions) that can improve
+        on it are searched. Captures that could not bring the score within
+        DELTA_MARGIN of alpha even by winning the captured piece are skipped
+        (delta pruning). In check there is no standing pat and every evasion
+        is searched when qsearch_evasions is set.
+
+        Args:
+            position: The current position
+            alpha: Alpha value for alpha-beta pruning
+            beta: Beta value for alpha-beta pruning
+            qdepth: Plies searched beyond the horizon so far
+            ply: Distance from the root
+
+        Returns:
+            int: Evaluation score of the position for the side to move
+        """
+        if qdepth:
+            self.nodes += 1
+            self.qnodes += 1
+            if self.depth > 1:  # As in negamax: depth 1 always completes, so there is a move
+                self.check_limits()
+        sign = 1 if position.side == WHITE else -1
+        if qdepth >= self.qsearch_depth:
+            return sign * self.calculateb(position)
+        moves = self.eva(position, ply)
+        if self.qsearch_evasions and position.in_check(position.side):
+            if len(moves) == 0:  # Checkmate
+                return -(MATE_SCORE - ply)
+            best = -INFINITE
+        else:
+            stand_pat = sign * self.calculateb(position)
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            best = stand_pat
+            squares = position.squares
+            captures = []
+            for move in moves:
+                flag = move >> 12
+                victim = squares[move >> 6 & 63]
+                if victim != EMPTY:
+                    gain = PIECE_WORTH[victim % 6]
+                elif flag == EN_PASSANT:
+                    gain = PIECE_WORTH[0]
+                elif flag != QUEEN_PROMOTION:
+                    continue
+                else:
+                    gain = 0
+                if flag == QUEEN_PROMOTION:
+                    gain += PIECE_WORTH[4] - PIECE_WORTH[0]
+                if stand_pat + gain + DELTA_MARGIN <= alpha:  # Delta pruning
+                    continue
+                captures.append(move)
+            moves = captures
+
+        for move in self.ordering.order(position, moves, 0, ply):
+            position.make_move(move)
+            score = -self.quiesce(position, -beta, -alpha, qdepth + 1, ply + 1)
+            position.unmake_move()
+            if score > best:
+                best = score
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return best
 
     def printboard(self, gametilles):
         """
@@ -224,373 +663,58 @@ class AI:
                 print('|', end=gametilles[rows][column].pieceonTile.tostring())
             print("|", end='\n')
 
-    def checkeva(self, gametiles, moves):
+    def eva(self, position, ply=0):
         """
-        Evaluate a list of moves.
+        Generate all legal moves for the side to move.
         
         Args:
-            gametiles: The current state of the game board
-            moves: List of moves to evaluate
+            position: The current position
+            ply: Distance from the root, selects the preallocated move buffer
             
         Returns:
-            list: List of evaluated moves with their scores
+            MoveList: Encoded moves (see board.movegen), valid until the next call for this ply
         """
-        arr = []
-        for move in moves:
-            lk = [[move[2], move[3]]]
-            arr.append(self.calci(gametiles, move[0], move[1], lk))
+        return generate_legal_moves(position, self.move_lists[ply])
 
-        return arr
-
-    def eva(self, gametiles, player):
+    def calculateb(self, gametiles):
         """
-        Evaluate all possible moves for the current player.
-        
+        Static evaluation of a position from White's point of view.
+
+        Material, the pawn and knight position tables, king safety and the
+        pawn centre bonus are kept as a running total by the Position
+        (psq_score, see board.piece_square); only mobility is computed here.
+
         Args:
-            gametiles: The current state of the game board
-            player: True for White, False for Black
-            
+            gametiles: The current state of the game board (grid or bitboard Position)
+
         Returns:
-            tuple: Lists of evaluated moves for both players
+            int: Evaluation score, positive when White is better
         """
-        lx = []
-        moves = []
-        kp = []
-        ks = []
-        movex = move()
-        for x in range(8):
-            for y in range(8):
-                if gametiles[y][x].pieceonTile.alliance == 'Black' and player == False:
-                    if movex.checkb(gametiles)[0] == 'checked':
-                        moves = movex.movesifcheckedb(gametiles)
-                        arr = self.checkeva(gametiles, moves)
-                        kp = arr
-                        return kp, ks
-                    moves = gametiles[y][x].pieceonTile.legalmoveb(gametiles)
-                    if len(moves) == 0:
-                        continue
-                    else:
-                        if(gametiles[y][x].pieceonTile.tostring() == 'K'):
-                            ax = movex.castlingb(gametiles)
-                            if not len(ax) == 0:
-                                for l in ax:
-                                    if l == 'ks':
-                                        moves.append([0, 6])
-                                    if l == 'qs':
-                                        moves.append([0, 2])
-                    if gametiles[y][x].pieceonTile.alliance == 'Black':
-                        lx = movex.pinnedb(gametiles, moves, y, x)
-                    moves = lx
-                    if len(moves) == 0:
-                        continue
-                    kp.append(self.calci(gametiles, y, x, moves))
-
-                if gametiles[y][x].pieceonTile.alliance == 'White' and player == True:
-                    if movex.checkw(gametiles)[0] == 'checked':
-                        moves = movex.movesifcheckedw(gametiles)
-                        arr = self.checkeva(gametiles, moves)
-                        ks = arr
-                        return kp, ks
-                    moves = gametiles[y][x].pieceonTile.legalmoveb(gametiles)
-                    if moves == None:
-                        print(y)
-                        print(x)
-                        print(gametiles[y][x].pieceonTile.position)
-                    if len(moves) == 0:
-                        continue
-                    else:
-                        if(gametiles[y][x].pieceonTile.tostring() == 'k'):
-                            ax = movex.castlingw(gametiles)
-                            if not len(ax) == 0:
-                                for l in ax:
-                                    if l == 'ks':
-                                        moves.append([7, 6])
-                                    if l == 'qs':
-                                        moves.append([7, 2])
-                    if gametiles[y][x].pieceonTile.alliance == 'White':
-                        lx = movex.pinnedw(gametiles, moves, y, x)
-                    moves = lx
-                    if len(moves) == 0:
-                        continue
-                    ks.append(self.calci(gametiles, y, x, moves))
-
-        return kp, ks
-
-    def calci(self, gametiles, y, x, moves):
-        """
-        Calculate evaluation scores for a list of moves.
-        
+        if isinstance(gametiles, Position):
+            position = gametiles
+        else:
+            position = Position.from_gametiles(gametiles)
+        return position.psq_score + self.mobility(position)
+
+    def mobility(self, position):
+        """
+        Mobility term of the evaluation.
+
+        Every queen, rook, bishop and knight scores MOBILITY_WEIGHT for each
+        square it can move to, counted with a popcount of its attack bitboard.
+
         Args:
-            gametiles: The current state of the game board
-            y: Starting row
-            x: Starting column
-            moves: List of moves to evaluate
-            
+            position: The current position
+
         Returns:
-            list: List of moves with their evaluation scores
+            int: Mobility score from White's point of view
         """
-        arr = []
-        jk = object
-        for move in moves:
-            jk = gametiles[move[0]][move[1]].pieceonTile
-            gametiles[move[0]][move[1]].pieceonTile = gametiles[y][x].pieceonTile
-            gametiles[y][x].pieceonTile = nullpiece()
-            mk = self.calculateb(gametiles)
-            gametiles[y][x].pieceonTile = gametiles[move[0]][move[1]].pieceonTile
-            gametiles[move[0]][move[1]].pieceonTile = jk
-            arr.append([y, x, move[0], move[1], mk])
-        return arr
-
-    def calculateb(self, gametiles):
-        piece_values = {
-            'P': -100, 'N': -320, 'B': -330, 'R': -500,
-            'Q': -900, 'K': -20000,
-            'p': 100, 'n': 320, 'b': 330, 'r': 500,
-            'q': 900, 'k': 20000
-        }
-        
-        # Position tables for better positional evaluation
-        pawn_positions = [
-            [0,  0,  0,  0,  0,  0,  0,  0],
-            [50, 50, 50, 50, 50, 50, 50, 50],
-            [10, 10, 20, 30, 30, 20, 10, 10],
-            [5,  5, 10, 25, 25, 10,  5,  5],
-            [0,  0,  0, 20, 20,  0,  0,  0],
-            [5, -5,-10,  0,  0,-10, -5,  5],
-            [5, 10, 10,-20,-20, 10, 10,  5],
-            [0,  0,  0,  0,  0,  0,  0,  0]
-        ]
-        
-        knight_positions = [
-            [-50,-40,-30,-30,-30,-30,-40,-50],
-            [-40,-20,  0,  0,  0,  0,-20,-40],
-            [-30,  0, 10, 15, 15, 10,  0,-30],
-            [-30,  5, 15, 20, 20, 15,  5,-30],
-            [-30,  0, 15, 20, 20, 15,  0,-30],
-            [-30,  5, 10, 15, 15, 10,  5,-30],
-            [-40,-20,  0,  5,  5,  0,-20,-40],
-            [-50,-40,-30,-30,-30,-30,-40,-50]
-        ]
-        
         value = 0
-        
-        # Material and positional evaluation
-        for y in range(8):
-            for x in range(8):
-                piece = gametiles[y][x].pieceonTile
-                piece_str = piece.tostring()
-                
-                # Material value
-                value += piece_values.get(piece_str, 0)
-                
-                # Positional value
-                if piece_str == 'P':
-                    value -= pawn_positions[y][x]
-                elif piece_str == 'p':
-                    value += pawn_positions[7-y][x]
-                elif piece_str == 'N':
-                    value -= knight_positions[y][x]
-                elif piece_str == 'n':
-                    value += knight_positions[7-y][x]
-                
-                # King safety
-                if piece_str in ['K', 'k']:
-                    if x in [0, 1, 6, 7] or y in [0, 1, 6, 7]:
-                        value -= 100 if piece_str == 'K' else 100
-                    else:
-                        value += 50 if piece_str == 'K' else -50
-                
-                # Piece mobility
-                if piece_str in ['Q', 'q', 'R', 'r', 'B', 'b', 'N', 'n']:
-                    moves = piece.legalmoveb(gametiles)
-                    if moves is not None:
-                        value += len(moves) * (10 if piece_str.islower() else -10)
-                
-                # Pawn structure
-                if piece_str in ['P', 'p']:
-                    if x in [2, 3, 4, 5]:
-                        value += 10 if piece_str == 'p' else -10
-                    
+        pieces = position.pieces
+        attacks_from = position.attacks_from
+        for color, weight in ((WHITE, MOBILITY_WEIGHT), (BLACK, -MOBILITY_WEIGHT)):
+            free = ~position.occupancy[color]
+            for piece in range(color * 6 + KNIGHT, color * 6 + KING):
+                for square in iter_bits(pieces[piece]):
+                    value += weight * (attacks_from(square) & free).bit_count()
         return value
-    
-    #pawn promotion for AI Player
-    def move(self,gametiles,y,x,n,m):
-        promotion=False
-        if gametiles[y][x].pieceonTile.tostring()=='K' or gametiles[y][x].pieceonTile.tostring()=='R':
-            gametiles[y][x].pieceonTile.moved=True
-
-        if gametiles[y][x].pieceonTile.tostring()=='K' and m==x+2:
-            gametiles[y][x+1].pieceonTile=gametiles[y][x+3].pieceonTile
-            s=self.updateposition(y,x+1)
-            gametiles[y][x+1].pieceonTile.position=s
-            gametiles[y][x+3].pieceonTile=nullpiece()
-        if gametiles[y][x].pieceonTile.tostring()=='K' and m==x-2:
-            gametiles[y][x-1].pieceonTile=gametiles[y][0].pieceonTile
-            s=self.updateposition(y,x-1)
-            gametiles[y][x-1].pieceonTile.position=s
-            gametiles[y][0].pieceonTile=nullpiece()
-
-
-
-        if gametiles[y][x].pieceonTile.tostring()=='P' and y+1==n and y==6:
-            promotion=True
-
-
-        if promotion==False:
-
-            gametiles[n][m].pieceonTile=gametiles[y][x].pieceonTile
-            gametiles[y][x].pieceonTile=nullpiece()
-            s=self.updateposition(n,m)
-            gametiles[n][m].pieceonTile.position=s
-
-        if promotion==True:
-
-            if gametiles[y][x].pieceonTile.tostring()=='P':
-                gametiles[y][x].pieceonTile=nullpiece()
-                gametiles[n][m].pieceonTile=queen('Black',self.updateposition(n,m))
-                promotion=False
-
-        return gametiles
-
-
-
-    def revmove(self,gametiles,x,y,n,m,mts):
-        if gametiles[x][y].pieceonTile.tostring()=='K':
-            if m==y-2:
-                gametiles[x][y].pieceonTile.moved=False
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[n][7].pieceonTile=gametiles[x][y-1].pieceonTile
-                s=self.updateposition(n,7)
-                gametiles[n][7].pieceonTile.position=s
-                gametiles[n][7].pieceonTile.moved=False
-
-                gametiles[x][y].pieceonTile=nullpiece()
-                gametiles[x][y-1].pieceonTile=nullpiece()
-
-            elif m==y+2:
-                gametiles[x][y].pieceonTile.moved=False
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[n][0].pieceonTile=gametiles[x][y+1].pieceonTile
-                s=self.updateposition(m,0)
-                gametiles[n][0].pieceonTile.position=s
-                gametiles[n][0].pieceonTile.moved=False
-                gametiles[x][y].pieceonTile=nullpiece()
-                gametiles[x][y-1].pieceonTile=nullpiece()
-
-            else:
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[x][y].pieceonTile=mts
-
-            return gametiles
-
-        if gametiles[x][y].pieceonTile.tostring()=='k':
-            if m==y-2:
-
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[n][7].pieceonTile=gametiles[x][y-1].pieceonTile
-                s=self.updateposition(n,7)
-                gametiles[n][7].pieceonTile.position=s
-                gametiles[x][y].pieceonTile=nullpiece()
-                gametiles[x][y-1].pieceonTile=nullpiece()
-
-
-            elif m==y+2:
-
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[n][0].pieceonTile=gametiles[x][y+1].pieceonTile
-                s=self.updateposition(n,0)
-                gametiles[n][0].pieceonTile.position=s
-                gametiles[x][y].pieceonTile=nullpiece()
-                gametiles[x][y-1].pieceonTile=nullpiece()
-
-
-            else:
-                gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-                s=self.updateposition(n,m)
-                gametiles[n][m].pieceonTile.position=s
-                gametiles[x][y].pieceonTile=mts
-
-
-            return gametiles
-
-        gametiles[n][m].pieceonTile=gametiles[x][y].pieceonTile
-        s=self.updateposition(n,m)
-        gametiles[n][m].pieceonTile.position=s
-        gametiles[x][y].pieceonTile=mts
-
-        return gametiles
-
-
-
-    def movew(self,gametiles,y,x,n,m):
-        promotion=False
-        if gametiles[y][x].pieceonTile.tostring()=='k' or gametiles[y][x].pieceonTile.tostring()=='r':
-            pass
-
-        if gametiles[y][x].pieceonTile.tostring()=='k' and m==x+2:
-            gametiles[y][x+1].pieceonTile=gametiles[y][x+3].pieceonTile
-            s=self.updateposition(y,x+1)
-            gametiles[y][x+1].pieceonTile.position=s
-            gametiles[y][x+3].pieceonTile=nullpiece()
-        if gametiles[y][x].pieceonTile.tostring()=='k' and m==x-2:
-            gametiles[y][x-1].pieceonTile=gametiles[y][0].pieceonTile
-            s=self.updateposition(y,x-1)
-            gametiles[y][x-1].pieceonTile.position=s
-            gametiles[y][0].pieceonTile=nullpiece()
-
-
-
-        if gametiles[y][x].pieceonTile.tostring()=='p' and y-1==n and y==1:
-            promotion=True
-
-
-        if promotion==False:
-
-            gametiles[n][m].pieceonTile=gametiles[y][x].pieceonTile
-            gametiles[y][x].pieceonTile=nullpiece()
-            s=self.updateposition(n,m)
-            gametiles[n][m].pieceonTile.position=s
-
-        if promotion==True:
-
-            if gametiles[y][x].pieceonTile.tostring()=='p':
-                gametiles[y][x].pieceonTile=nullpiece()
-                gametiles[n][m].pieceonTile=queen('White',self.updateposition(n,m))
-                promotion=False
-
-        return gametiles
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-                        
@@ -0,0 +1,181 @@
+"""
+AI search on a worker thread.
+
+The game loop starts a search, keeps drawing frames and handling events, and
+polls for the result. The AI's stop attribute serves as the cancellation
+token and its progress attribute reports every finished iteration.
+
+The search is pure Python, so it shares the GIL with the game loop; the
+interpreter switches threads every few milliseconds, which is plenty for a
+60 FPS loop that mostly waits in clock.tick().
+
+While the opponent thinks, ponder() searches the position after the reply
+the last search expected, with no time limit. If the opponent plays it
+(a ponder hit) ponderhit() gives that search the normal time limit and it
+carries on; otherwise it is cancelled. Either way its results stay in the
+AI's transposition table for the next search.
+"""
+
+import threading
+import time
+
+from player.AI import MAX_DEPTH
+
+
+class BackgroundSearch:
+    """
+    Runs AI.search() on a daemon thread, one search at a time.
+
+    Attributes:
+        ai: The AI that searches
+        latest: SearchResult of the last finished iteration of the current search, or None
+        pondering: True while the running search is a ponder search
+        ponder_key: Zobrist key of the position being pondered, 0 if none
+    """
+
+    def __init__(self, ai, on_progress=None):
+        """
+        Wrap an AI.
+
+        Args:
+            ai: player.AI.AI, only used from the worker thread while a search runs
+            on_progress: Called on the worker thread with the SearchResult of
+                every finished iteration, or None
+        """
+        self.ai = ai
+        self.on_progress = on_progress
+        self.latest = None
+        self.cancel_token = threading.Event()
+        self.thread = None
+        self.result = None
+        self.error = None
+        self.pondering = False
+        self.ponder_key = 0
+        self.ponder_started = 0.0
+
+    def start(self, position, time_limit=None, node_limit=None, max_depth=None):
+        """
+        Start searching a position.
+
+        Args:
+            position: board.bitboard.Position, owned by the search until it finishes
+            time_limit: Seconds the search may take, or None
+            node_limit: Number of nodes the search may visit, or None
+            max_depth: Deepest iteration, see AI.search()
+
+        Raises:
+            RuntimeError: If a search is already running
+        """
+        if self.busy():
+            raise RuntimeError("a search is already running")
+        self.cancel_token.clear()
+        self.pondering = False
+        self.ponder_key = 0
+        self.latest = None
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(target=self._run, args=(position, time_limit, node_limit, max_depth),
+                                       name='ai-search', daemon=True)
+        self.thread.start()
+
+    def ponder(self, position):
+        """
+        Search a position on the opponent's time, until ponderhit() or cancel().
+
+        Args:
+            position: Position after the expected reply of the opponent, side to move is the AI's
+        """
+        key = position.key  # Read before the search starts playing moves on the position
+        self.start(position, max_depth=MAX_DEPTH)
+        self.pondering = True
+        self.ponder_key = key
+        self.ponder_started = time.perf_counter()
+
+    def ponderhit(self, time_limit):
+        """
+        The opponent played the expected reply: finish the ponder search as a timed one.
+
+        Time already spent pondering counts against time_limit, so after a
+        long think of the opponent the result is taken at once.
+
+        Args:
+            time_limit: Seconds a normal search of the position would get
+        """
+        self.pondering = False
+        self.ponder_key = 0
+        self.ai.ponderhit(max(0.0, time_limit - (time.perf_counter() - self.ponder_started)))
+
+    def _run(self, position, time_limit, node_limit, max_depth):
+        ai = self.ai
+        ai.stop = self.cancel_token
+        ai.progress = self._progress
+        try:
+            self.result = ai.search(position, time_limit, node_limit, max_depth)
+        except Exception as error:  # Handed to the game loop by poll()
+            self.error = error
+        finally:
+            ai.stop = None
+            ai.progress = None
+
+    def _progress(self, result):
+        self.latest = result
+        if self.on_progress is not None:
+            self.on_progress(result)
+
+    def busy(self):
+        """
+        Check whether a search is running.
+
+        Returns:
+            bool: True until the worker thread has finished
+        """
+        return self.thread is not None and self.thread.is_alive()
+
+    def idle(self):
+        """
+        Check whether a new search can be started.
+
+        Returns:
+            bool: True if no search is running and no result is waiting for poll()
+        """
+        return not self.busy() and self.result is None and self.error is None
+
+    def poll(self):
+        """
+        Take the result of a finished search.
+
+        Returns:
+            SearchResult: The result, or None while the search runs or if there is none
+
+        Raises:
+            Exception: Whatever the search raised
+        """
+        if self.busy():
+            return None
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        result, self.result = self.result, None
+        return result
+
+    def cancel(self, wait=True):
+        """
+        Stop the running search early; its result is the last finished iteration.
+
+        Args:
+            wait: Block until the worker thread has stopped
+        """
+        self.cancel_token.set()
+        self.pondering = False
+        self.ponder_key = 0
+        if wait and self.thread is not None:
+            self.thread.join()
+
+    def nodes(self):
+        """
+        Get the live node count of the running search.
+
+        Returns:
+            int: Nodes visited so far by this process
+        """
+        return self.ai.nodes
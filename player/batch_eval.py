@@ -0,0 +1,199 @@
+"""
+Vectorized evaluation of many positions at once with NumPy.
+
+Positions are given as an N x 64 array of piece codes (board.bitboard piece
+codes, -1 for an empty square, squares numbered row * 8 + column) or as an
+N x 12 x 64 array of 0/1 planes, one plane per piece code. The batch score is
+the same as AI.calculateb: the material, position table, king safety and pawn
+centre terms (Position.psq_score) plus mobility. Mobility is counted without
+move generation: every sliding ray is looked up for all positions at once and
+cut at its first occupied square.
+
+NumPy is only needed for this module; the rest of the engine does not use it.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency
+    np = None
+
+from board.attack_tables import KNIGHT_TARGETS
+from board.bitboard import EMPTY, KNIGHT, BISHOP, ROOK, QUEEN
+from board.piece_square import PSQT, MOBILITY_WEIGHT
+from board.sliders import RAY_TARGETS, ROOK_RAYS, BISHOP_RAYS
+
+OFF_BOARD = 64  # Extra square that ends every ray, occupied by both sides
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("player.batch_eval needs NumPy: pip install numpy")
+
+
+def psqt_array():
+    """
+    Get the evaluation table as an array.
+
+    Returns:
+        numpy.ndarray: 13 x 64 int32 table, row 12 (code -1) is all zeros
+    """
+    _require_numpy()
+    table = np.zeros((13, 64), dtype=np.int32)
+    table[:12] = np.asarray(PSQT, dtype=np.int32).reshape(12, 64)
+    return table
+
+
+def ray_array():
+    """
+    Get the sliding rays as an array.
+
+    Returns:
+        numpy.ndarray: 64 x 8 x 8 int array, [square, direction] lists the
+            squares along the ray nearest first, padded with OFF_BOARD
+    """
+    _require_numpy()
+    rays = np.full((64, 8, 8), OFF_BOARD, dtype=np.intp)
+    for direction, targets in enumerate(RAY_TARGETS):
+        for square in range(64):
+            for index, (row, column) in enumerate(targets[square]):
+                rays[square, direction, index] = row * 8 + column
+    return rays
+
+
+def knight_array():
+    """
+    Get the knight targets as an array.
+
+    Returns:
+        numpy.ndarray: 64 x 64 int64 array, [square, target] is 1 if a knight on square attacks target
+    """
+    _require_numpy()
+    knights = np.zeros((64, 64), dtype=np.int64)
+    for square in range(64):
+        for row, column in KNIGHT_TARGETS[square]:
+            knights[square, row * 8 + column] = 1
+    return knights
+
+
+def _check_codes(codes):
+    codes = np.asarray(codes)
+    if codes.ndim != 2 or codes.shape[1] != 64:
+        raise ValueError("expected an N x 64 array of piece codes, got shape %s" % (codes.shape,))
+    return codes
+
+
+def psq_codes(codes):
+    """
+    Material and position table part of the score, Position.psq_score.
+
+    Args:
+        codes: N x 64 integer array of piece codes, -1 for empty squares
+
+    Returns:
+        numpy.ndarray: N int64 scores from White's point of view
+    """
+    _require_numpy()
+    codes = _check_codes(codes)
+    table = psqt_array()
+    # Empty squares (-1) index the zero row 12 of the table
+    return table[codes, np.arange(64)].sum(axis=1, dtype=np.int64)
+
+
+def mobility_codes(codes):
+    """
+    Mobility part of the score, AI.mobility.
+
+    Every queen, rook, bishop and knight scores MOBILITY_WEIGHT for each
+    square it attacks that is not taken by a piece of its own side.
+
+    Args:
+        codes: N x 64 integer array of piece codes, -1 for empty squares
+
+    Returns:
+        numpy.ndarray: N int64 scores from White's point of view
+    """
+    _require_numpy()
+    codes = _check_codes(codes)
+    count = codes.shape[0]
+    rays = ray_array()
+    knights = knight_array()
+    # Column OFF_BOARD ends every ray and is never a target
+    occupied = np.ones((count, 65), dtype=bool)
+    occupied[:, :64] = codes != EMPTY
+    # Index of the first occupied square along every ray: N x 64 x 8
+    first = occupied[:, rays].argmax(axis=3)
+    blockers = np.take_along_axis(np.broadcast_to(rays, (count, 64, 8, 8)), first[..., None], axis=3)[..., 0]
+    value = np.zeros(count, dtype=np.int64)
+    for color, weight in ((0, MOBILITY_WEIGHT), (1, -MOBILITY_WEIGHT)):
+        own = np.ones((count, 65), dtype=bool)
+        own[:, :64] = (codes != EMPTY) & (codes // 6 == color)
+        # Squares reached along a ray: the empty ones plus the blocker unless it is our own
+        reach = first + ~np.take_along_axis(own, blockers.reshape(count, -1), axis=1).reshape(first.shape)
+        rook_reach = reach[:, :, ROOK_RAYS].sum(axis=2)
+        bishop_reach = reach[:, :, BISHOP_RAYS].sum(axis=2)
+        knight_reach = (~own[:, :64]).astype(np.int64) @ knights.T
+        total = (np.where(codes == color * 6 + KNIGHT, knight_reach, 0)
+                 + np.where(codes == color * 6 + BISHOP, bishop_reach, 0)
+                 + np.where(codes == color * 6 + ROOK, rook_reach, 0)
+                 + np.where(codes == color * 6 + QUEEN, rook_reach + bishop_reach, 0))
+        value += weight * total.sum(axis=1, dtype=np.int64)
+    return value
+
+
+def evaluate_codes(codes):
+    """
+    Score positions given as piece codes.
+
+    Args:
+        codes: N x 64 integer array of piece codes, -1 for empty squares
+
+    Returns:
+        numpy.ndarray: N int64 scores from White's point of view, equal to AI.calculateb
+    """
+    return psq_codes(codes) + mobility_codes(codes)
+
+
+def evaluate_planes(planes):
+    """
+    Score positions given as one-hot piece planes.
+
+    Args:
+        planes: N x 12 x 64 array, planes[n, piece, square] is 1 where the piece stands
+
+    Returns:
+        numpy.ndarray: N int64 scores from White's point of view
+    """
+    _require_numpy()
+    planes = np.asarray(planes)
+    if planes.ndim != 3 or planes.shape[1:] != (12, 64):
+        raise ValueError("expected an N x 12 x 64 array of planes, got shape %s" % (planes.shape,))
+    table = psqt_array()[:12].astype(np.int64)
+    codes = np.where(planes.any(axis=1), planes.argmax(axis=1), EMPTY)
+    return np.einsum('npq,pq->n', planes.astype(np.int64), table) + mobility_codes(codes)
+
+
+def position_codes(positions):
+    """
+    Stack positions into the N x 64 array taken by evaluate_codes().
+
+    Args:
+        positions: Iterable of board.bitboard.Position
+
+    Returns:
+        numpy.ndarray: N x 64 int8 array of piece codes
+    """
+    _require_numpy()
+    return np.array([position.squares for position in positions], dtype=np.int8).reshape(-1, 64)
+
+
+def evaluate_positions(positions):
+    """
+    Score a list of positions.
+
+    Args:
+        positions: Iterable of board.bitboard.Position
+
+    Returns:
+        numpy.ndarray: N int64 scores, equal to AI.calculateb of each position
+    """
+    return evaluate_codes(position_codes(positions))
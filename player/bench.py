@@ -0,0 +1,164 @@
+"""
+Search benchmark: nodes searched to a fixed depth on a fixed set of positions.
+
+Every configuration searches every position with a fresh AI (empty
+transposition table, killers and history), so the node counts of different
+search features can be compared side by side. Below the node counts the
+share of cutoffs made by the first move searched shows the quality of the
+move ordering, and the remaining rows count how often each selective search
+technique pruned, reduced or searched a move again.
+
+Usage:
+    python -m player.bench                       # all configurations, depth 4
+    python -m player.bench --depth 5 --configs alphabeta pvs
+    python -m player.bench --configs pvs+aspiration +null_move +lmr selective
+    python -m player.bench --depth 6 --threads 1 2 4   # Lazy SMP speedup per process count
+    python -m player.bench --depth 6 --root-workers 1 2 4   # root split speedup per process count
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from board.bitboard import Position, START_FEN, move_name
+from player.AI import AI
+
+BENCH_POSITIONS = [
+    ('startpos', START_FEN),
+    ('italian', 'r1bqkbnr/pppp1ppp/2n5/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 3 3'),
+    ('kiwipete', 'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1'),
+    ('position4', 'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1'),
+    ('position6', 'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10'),
+    ('endgame', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1'),
+]
+
+# Selective search switched off, so the first configurations measure full-width search
+FULL_WIDTH = {'null_move': False, 'lmr': False, 'reverse_futility': False, 'futility': False}
+
+# Search counters summed over the suite, printed below the node counts
+STATS = ('cutoffs', 'first_move_cutoffs', 'researches', 'aspiration_researches',
+         'null_move', 'reverse_futility', 'futility', 'lmr', 'lmr_researches')
+LABEL_WIDTH = 22
+
+# Name -> keyword arguments of AI()
+CONFIGS = {
+    'alphabeta': dict(FULL_WIDTH, pvs=False, aspiration=0),
+    'pvs': dict(FULL_WIDTH, aspiration=0),
+    'pvs+aspiration': dict(FULL_WIDTH),
+    '+null_move': dict(FULL_WIDTH, null_move=True),
+    '+lmr': dict(FULL_WIDTH, lmr=True),
+    '+reverse_futility': dict(FULL_WIDTH, reverse_futility=True),
+    '+futility': dict(FULL_WIDTH, futility=True),
+    'selective': {},  # Everything on, the AI defaults
+}
+
+
+def run(config, depth, positions=BENCH_POSITIONS, stats=None):
+    """
+    Search every position of a suite with one configuration.
+
+    Args:
+        config: Keyword arguments for AI()
+        depth: Depth every position is searched to
+        positions: List of (name, FEN)
+        stats: Dict the STATS counters of every search are added to, or None
+
+    Returns:
+        list: One SearchResult per position
+    """
+    results = []
+    for _name, fen in positions:
+        ai = AI(**config)
+        try:
+            results.append(ai.search(Position.from_fen(fen), max_depth=depth))
+        finally:
+            ai.close()
+        if stats is not None:
+            counters = dict(ai.prunes, researches=ai.researches, aspiration_researches=ai.aspiration_researches,
+                            **ai.ordering.stats())
+            for name in STATS:
+                stats[name] = stats.get(name, 0) + counters.get(name, 0)
+    return results
+
+
+def print_speedup(depth, thread_counts, option='threads'):
+    """
+    Print the time to depth of the default search for several process counts.
+
+    Args:
+        depth: Depth every position is searched to
+        thread_counts: Values of the option to compare
+        option: Argument of AI() that sets the process count, 'threads' or 'root_workers'
+    """
+    table = {threads: run({option: threads}, depth) for threads in thread_counts}
+    width = 14
+    print('time to depth %d in seconds, %d CPUs' % (depth, os.cpu_count()))
+    print('%-10s' % 'position' + ''.join('%*s' % (width, '%d proc' % threads) for threads in thread_counts))
+    for index, (position_name, _fen) in enumerate(BENCH_POSITIONS):
+        print('%-10s' % position_name
+              + ''.join('%*.2f' % (width, table[threads][index].elapsed) for threads in thread_counts))
+    seconds = {threads: sum(result.elapsed for result in table[threads]) for threads in thread_counts}
+    nodes = {threads: sum(result.nodes for result in table[threads]) for threads in thread_counts}
+    base = thread_counts[0]
+    print('%-10s' % 'seconds' + ''.join('%*.2f' % (width, seconds[threads]) for threads in thread_counts))
+    print('%-10s' % 'nodes' + ''.join('%*d' % (width, nodes[threads]) for threads in thread_counts))
+    print('%-10s' % 'speedup' + ''.join('%*.2f' % (width, seconds[base] / seconds[threads])
+                                        for threads in thread_counts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m player.bench', description=__doc__.split('\n')[1])
+    parser.add_argument('--depth', type=int, default=4, help='search depth (default 4)')
+    parser.add_argument('--configs', nargs='+', choices=sorted(CONFIGS), default=list(CONFIGS),
+                        help='configurations to compare')
+    parser.add_argument('--threads', type=int, nargs='+',
+                        help='compare the time to depth of these process counts instead of configurations')
+    parser.add_argument('--root-workers', type=int, nargs='+',
+                        help='the same for the root-split search')
+    args = parser.parse_args(argv)
+
+    if args.threads:
+        print_speedup(args.depth, args.threads)
+        return 0
+    if args.root_workers:
+        print_speedup(args.depth, args.root_workers, 'root_workers')
+        return 0
+
+    table = {}
+    seconds = {}
+    stats = {}
+    for name in args.configs:
+        start = time.perf_counter()
+        stats[name] = {}
+        table[name] = run(CONFIGS[name], args.depth, stats=stats[name])
+        seconds[name] = time.perf_counter() - start
+
+    width = max(len(name) for name in args.configs) + 2
+    print('%-*s' % (LABEL_WIDTH, 'position') + ''.join('%*s' % (max(width, 12), name) for name in args.configs)
+          + '  best moves')
+    totals = dict.fromkeys(args.configs, 0)
+    for index, (position_name, _fen) in enumerate(BENCH_POSITIONS):
+        line = '%-*s' % (LABEL_WIDTH, position_name)
+        moves = []
+        for name in args.configs:
+            result = table[name][index]
+            totals[name] += result.nodes
+            line += '%*d' % (max(width, 12), result.nodes)
+            moves.append(move_name(result.move) if result.move else '-')
+        print(line + '  ' + ' '.join(moves))
+    print('%-*s' % (LABEL_WIDTH, 'total') + ''.join('%*d' % (max(width, 12), totals[name]) for name in args.configs))
+    print('%-*s' % (LABEL_WIDTH, 'seconds')
+          + ''.join('%*.2f' % (max(width, 12), seconds[name]) for name in args.configs))
+    print('%-*s' % (LABEL_WIDTH, 'first move cutoffs %')
+          + ''.join('%*.1f' % (max(width, 12), 100.0 * stats[name]['first_move_cutoffs'] / stats[name]['cutoffs']
+                               if stats[name]['cutoffs'] else 0.0)
+                    for name in args.configs))
+    for counter in STATS:
+        print('%-*s' % (LABEL_WIDTH, counter) + ''.join('%*d' % (max(width, 12), stats[name][counter])
+                                                        for name in args.configs))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,8 @@ This module contains the HumanPlayer class that handles human player interaction
 """
 
 from board.move import move
+from board.bitboard import Position, WHITE, BLACK
+from board.movegen import generate_legal_moves
 
 class HumanPlayer:
     """
@@ -17,32 +19,13 @@ class HumanPlayer:
         self.move_handler = move()
 
     def get_valid_moves(self, board, piece_pos):
-        """Get valid moves for a selected piece"""
+        """Get valid moves for a selected piece, castling and en passant included"""
         x, y = piece_pos
         moves = []
         if board.gameTiles[y][x].pieceonTile.alliance == self.color:
-            moves = board.gameTiles[y][x].pieceonTile.legalmoveb(board.gameTiles)
-            if board.gameTiles[y][x].pieceonTile.tostring() == 'k':
-                # Handle castling for king
-                ax = self.move_handler.castlingw(board.gameTiles)
-                if ax:
-                    for l in ax:
-                        if l == 'ks':
-                            moves.append([7, 6])
-                        if l == 'qs':
-                            moves.append([7, 2])
-            
-            # Handle en passant for pawns
-            if board.gameTiles[y][x].pieceonTile.tostring() == 'p':
-                ay = self.move_handler.enpassantb(board.gameTiles, y, x)
-                if ay:
-                    if ay[1] == 'r':
-                        moves.append([y-1, x+1])
-                    else:
-                        moves.append([y-1, x-1])
-            
-            # Filter moves based on pins
-            moves = self.move_handler.pinnedw(board.gameTiles, moves, y, x)
+            color = WHITE if self.color == "White" else BLACK
+            legal = generate_legal_moves(Position.from_gametiles(board.gameTiles, color))
+            moves = legal.targets(y * 8 + x)
         
         return moves
 
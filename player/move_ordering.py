@@ -0,0 +1,123 @@
+"""
+Move ordering for the alpha-beta search.
+
+Moves are tried in this order: the hash (or principal variation) move,
+captures and promotions sorted by MVV-LVA (most valuable victim, least
+valuable attacker), the two killer moves of the ply, then the remaining
+quiet moves sorted by the history heuristic.
+"""
+
+from board.bitboard import EMPTY, EN_PASSANT, PROMOTION, MAX_PLY
+
+HASH_SCORE = 1000000
+CAPTURE_SCORE = 100000
+KILLER_SCORES = (90000, 80000)
+HISTORY_LIMIT = 60000  # History scores are halved when one reaches this value
+
+# MVV_LVA[victim type][attacker type], victims dominate attackers
+MVV_LVA = [[(victim + 1) * 10 - attacker for attacker in range(6)] for victim in range(6)]
+
+
+class MoveOrderer:
+    """
+    Sorts moves for the search and learns from the moves that cause cutoffs.
+
+    The orderer also counts beta cutoffs and how many of them came from the
+    first move searched, which measures how good the ordering is.
+    """
+
+    def __init__(self):
+        """Create an orderer with empty killer and history tables"""
+        self.killers = [[0, 0] for _ in range(MAX_PLY)]
+        self.history = [0] * (12 * 64)  # Indexed by piece code * 64 + to square
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the cutoff counters"""
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        """Forget the killers of the last search and age the history scores"""
+        for killers in self.killers:
+            killers[0] = killers[1] = 0
+        self.history = [score >> 1 for score in self.history]
+
+    def order(self, position, moves, hash_move, ply):
+        """
+        Sort moves from most to least promising.
+
+        Args:
+            position: The position the moves belong to
+            moves: Encoded moves
+            hash_move: Move to try first (0 for none)
+            ply: Distance from the root, used for the killer moves
+
+        Returns:
+            list: The moves in search order
+        """
+        squares = position.squares
+        killer1, killer2 = self.killers[ply]
+        history = self.history
+        scored = []
+        for move in moves:
+            if move == hash_move:
+                score = HASH_SCORE
+            else:
+                end = move >> 6 & 63
+                flag = move >> 12
+                victim = squares[end]
+                if victim != EMPTY:
+                    score = CAPTURE_SCORE + MVV_LVA[victim % 6][squares[move & 63] % 6]
+                elif flag == EN_PASSANT:
+                    score = CAPTURE_SCORE + MVV_LVA[0][0]
+                elif flag & PROMOTION:
+                    score = CAPTURE_SCORE + (flag & 3)
+                elif move == killer1:
+                    score = KILLER_SCORES[0]
+                elif move == killer2:
+                    score = KILLER_SCORES[1]
+                else:
+                    score = history[squares[move & 63] << 6 | end]
+            scored.append((score, move))
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
+
+    def cutoff(self, position, move, ply, depth, index):
+        """
+        Record a move that caused a beta cutoff.
+
+        Args:
+            position: The position the move was played from (move taken back)
+            move: The move that caused the cutoff
+            ply: Distance from the root
+            depth: Remaining depth of the node
+            index: Position of the move in the ordered list
+        """
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        squares = position.squares
+        end = move >> 6 & 63
+        if squares[end] != EMPTY or move >> 12 == EN_PASSANT or move >> 12 & PROMOTION:
+            return  # Only quiet moves go to the killer and history tables
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        i = squares[move & 63] << 6 | end
+        self.history[i] += depth * depth
+        if self.history[i] >= HISTORY_LIMIT:
+            self.history = [score >> 1 for score in self.history]
+
+    def stats(self):
+        """
+        Get the cutoff counters.
+
+        Returns:
+            dict: Number of cutoffs, cutoffs by the first move and their ratio
+        """
+        rate = self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+        return {'cutoffs': self.cutoffs,
+                'first_move_cutoffs': self.first_move_cutoffs,
+                'first_move_rate': rate}
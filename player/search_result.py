@@ -0,0 +1,53 @@
+"""
+Result of one AI search.
+"""
+
+from board.bitboard import move_coordinates
+
+
+class SearchResult:
+    """
+    Outcome of AI.evaluate(): best move, score and statistics of the search.
+
+    Attributes:
+        move: Best move (encoded), 0 if the side to move has no legal move
+        score: Searched score of the best move from White's point of view
+        pv: Principal variation as a list of encoded moves
+        depth: Deepest iteration that was searched completely
+        nodes: Number of nodes visited, quiescence nodes included
+        qnodes: Number of nodes visited by the quiescence search
+        elapsed: Wall-clock time of the search in seconds
+    """
+
+    def __init__(self, move=0, score=0, pv=None, depth=0, nodes=0, elapsed=0.0, qnodes=0):
+        self.move = move
+        self.score = score
+        self.pv = pv if pv is not None else []
+        self.depth = depth
+        self.nodes = nodes
+        self.qnodes = qnodes
+        self.elapsed = elapsed
+
+    def coordinates(self):
+        """
+        Get the best move as board coordinates.
+
+        Returns:
+            tuple: (start_y, start_x, end_y, end_x), or None if there is no move
+        """
+        if not self.move:
+            return None
+        return move_coordinates(self.move)
+
+    def nps(self):
+        """
+        Get the search speed.
+
+        Returns:
+            int: Nodes searched per second
+        """
+        return int(self.nodes / self.elapsed) if self.elapsed > 0 else 0
+
+    def __repr__(self):
+        return ('SearchResult(move=%d, score=%d, depth=%d, nodes=%d, qnodes=%d, elapsed=%.3f, pv=%s)'
+                % (self.move, self.score, self.depth, self.nodes, self.qnodes, self.elapsed, self.pv))
@@ -0,0 +1,301 @@
+"""
+Parallel search across processes.
+
+HelperPool (Lazy SMP): helper processes sharing one transposition table.
+
+Every helper searches the same root position as the main search, with no
+splitting of the work. They only cooperate through the shared transposition
+table: a helper that finishes a subtree first leaves its result, best move
+included, for the others to cut on or order by. Odd helpers start at depth 2
+and go one ply deeper than the main search, so the processes do not all walk
+the same tree in step.
+
+Helpers are processes, not threads, because the search is pure Python and
+threads would take turns on the GIL. They are started once and wait for work
+between searches, so a move pays no process start-up.
+
+RootSplitPool: the root moves are dealt out to a ProcessPoolExecutor and
+every worker searches its share with its own alpha-beta window and its own
+transposition table. It needs no shared memory, at the price of workers not
+seeing each other's bounds. Positions are sent as FEN strings and moves as
+16-bit integers, never as a grid of Tile objects. While the workers search,
+the main process watches ai.stop and ai.deadline and stops them through a
+shared event, so a cancel or a ponderhit takes effect within the iteration.
+"""
+
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from board.bitboard import Position, WHITE
+from player.AI import AI, MAX_DEPTH, MATE_SCORE, SearchAborted
+from player.search_result import SearchResult
+from player.transposition import SharedTranspositionTable
+
+HELPER_STOP_TIMEOUT = 5.0  # Seconds HelperPool.stop() waits for a helper before terminating it
+HELPER_POLL_INTERVAL = 0.05  # Seconds between checks for dead helpers while stopping
+ROOT_POLL_INTERVAL = 0.01  # Seconds between checks of ai.stop and ai.deadline while the workers search
+
+
+class HelperPool:
+    """
+    Helper processes of a parallel search and their shared transposition table.
+
+    A helper that dies, or does not answer stop() in time, is terminated and
+    left out of later searches; the main search does not depend on it.
+
+    Attributes:
+        tt: SharedTranspositionTable, the main search uses it too
+        size: Number of helper processes started
+    """
+
+    def __init__(self, size, megabytes, options):
+        """
+        Start the helper processes.
+
+        Args:
+            size: Number of helper processes
+            megabytes: Memory budget of the shared transposition table in MiB
+            options: Keyword arguments for the AI() of every helper
+        """
+        self.tt = SharedTranspositionTable(megabytes)
+        self.size = size
+        context = multiprocessing.get_context()
+        self.stop_event = context.Event()
+        self.results = context.Queue()
+        self.tasks = []
+        self.workers = []
+        self.searching = []  # Indices of the helpers given the current position
+        self.running = False
+        for index in range(size):
+            tasks = context.Queue()
+            worker = context.Process(target=_helper_main, name='chess-helper-%d' % (index + 1),
+                                     args=(index, self.tt.name, megabytes, options, tasks, self.results,
+                                           self.stop_event),
+                                     daemon=True)
+            worker.start()
+            self.tasks.append(tasks)
+            self.workers.append(worker)
+
+    def start(self, position, max_depth):
+        """
+        Let every helper search a position until stop() is called.
+
+        Args:
+            position: Position the main search is about to search
+            max_depth: Deepest iteration of the main search
+        """
+        if self.running:  # The last search ended with an exception
+            self.stop()
+        self.stop_event.clear()
+        fen = position.fen()
+        self.searching = [index for index, worker in enumerate(self.workers) if worker.is_alive()]
+        for index in self.searching:
+            self.tasks[index].put((fen, min(max_depth + (index & 1), MAX_DEPTH), 1 + (index & 1)))
+        self.running = True
+
+    def stop(self):
+        """
+        Stop the helpers and wait for them to finish.
+
+        Returns:
+            int: Number of nodes the helpers searched
+        """
+        if not self.running:
+            return 0
+        self.stop_event.set()
+        nodes = 0
+        pending = set(self.searching)
+        deadline = time.perf_counter() + HELPER_STOP_TIMEOUT
+        while pending:
+            try:
+                index, helper_nodes = self.results.get(timeout=HELPER_POLL_INTERVAL)
+            except queue.Empty:
+                pending = {index for index in pending if self.workers[index].is_alive()}  # Dead ones never answer
+                if time.perf_counter() >= deadline:
+                    for index in pending:
+                        self.workers[index].kill()  # SIGKILL, which also ends a stopped or hung process
+                        self.workers[index].join()
+                    break
+                continue
+            if index in pending:  # A late answer of a helper given up on earlier is dropped
+                pending.discard(index)
+                nodes += helper_nodes
+        self.running = False
+        return nodes
+
+    def close(self):
+        """Stop the helper processes and free the shared transposition table"""
+        self.stop()
+        for tasks, worker in zip(self.tasks, self.workers):
+            if worker.is_alive():
+                tasks.put(None)
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
+        self.tt.close()
+
+
+def _helper_main(index, tt_name, megabytes, options, tasks, results, stop_event):
+    ai = AI(**dict(options, hash_mb=0))  # Its own table is replaced by the shared one
+    ai.tt = SharedTranspositionTable.attach(tt_name, megabytes)
+    ai.stop = stop_event
+    try:
+        while True:
+            try:
+                task = tasks.get()
+            except (EOFError, OSError):  # The main process is gone
+                break
+            if task is None:
+                break
+            fen, max_depth, start_depth = task
+            result = ai.search(Position.from_fen(fen), max_depth=max_depth, start_depth=start_depth)
+            if not stop_event.is_set():
+                stop_event.wait()  # Keep the result count in step with stop()
+            results.put((index, result.nodes))
+    finally:
+        ai.tt.close()
+
+
+class RootSplitPool:
+    """
+    Worker processes that search disjoint sets of root moves.
+
+    The pool is created once and kept for the whole game; every worker keeps
+    its AI, and with it its transposition table, from one move to the next.
+
+    Attributes:
+        size: Number of worker processes
+    """
+
+    def __init__(self, size, megabytes, options):
+        """
+        Start the worker processes.
+
+        Args:
+            size: Number of worker processes
+            megabytes: Memory budget of the transposition table of every worker in MiB
+            options: Keyword arguments for the AI() of every worker
+        """
+        self.size = size
+        self.searches = 0  # Number of searches so far, tells the workers when a new one starts
+        self.stop_event = multiprocessing.get_context().Event()  # Aborts the iteration in every worker
+        self.executor = ProcessPoolExecutor(size, initializer=_root_worker_init,
+                                            initargs=(dict(options, hash_mb=megabytes), self.stop_event))
+
+    def search(self, ai, position, time_limit=None, node_limit=None, max_depth=MAX_DEPTH):
+        """
+        Search a position with iterative deepening, splitting every iteration across the workers.
+
+        The root moves are sorted by the scores of the previous iteration
+        (by ai's move ordering before the first) and dealt out in turn, so
+        every worker starts with one of the strongest moves. An iteration
+        counts only if every worker finished it.
+
+        Args:
+            ai: AI that generates and orders the root moves
+            position: Position to search, left unchanged on return
+            time_limit: Seconds the search may take, or None
+            node_limit: Number of nodes every worker may visit per iteration, or None
+            max_depth: Deepest iteration
+
+        Returns:
+            SearchResult: Best move, score, principal variation and statistics
+        """
+        start = time.perf_counter()
+        ai.prepare_search(time_limit)  # Sets ai.deadline, which ai.ponderhit() may move
+        result = SearchResult()
+        moves = ai.ordering.order(position, ai.eva(position), 0, 0)
+        if not moves:  # Checkmate or stalemate
+            score = -MATE_SCORE if position.in_check(position.side) else 0
+            result.score = score if position.side == WHITE else -score
+            return result
+        fen = position.fen()
+        self.searches += 1  # Workers start fresh tables once per search, not once per depth
+        workers = min(self.size, len(moves))
+        for depth in range(1, max_depth + 1):
+            if depth > 1 and ai.stop is not None and ai.stop.is_set():
+                break  # Depth 1 always completes, so there is a move to play
+            remaining = None
+            if ai.deadline is not None:
+                remaining = ai.deadline - time.perf_counter()
+            self.stop_event.clear()
+            futures = [self.executor.submit(_search_root_moves, self.searches, fen, moves[index::workers], depth,
+                                            remaining, node_limit)
+                       for index in range(workers)]
+            if depth > 1:
+                self.wait(ai, futures)
+            shares = [future.result() for future in futures]
+            result.nodes += sum(nodes for nodes, _scores in shares)
+            if any(scores is None for _nodes, scores in shares):
+                break  # A worker ran out of time or was stopped, keep the last complete iteration
+            scores = sorted((entry for _nodes, share in shares for entry in share),
+                            key=lambda entry: -entry[1])
+            best_move, best_score, pv = scores[0]
+            result.move = best_move
+            result.score = best_score if position.side == WHITE else -best_score
+            result.pv = pv
+            result.depth = depth
+            if ai.progress is not None:
+                result.elapsed = time.perf_counter() - start
+                ai.progress(result)
+            moves = [move for move, _score, _pv in scores]
+            if ai.soft_deadline is not None and time.perf_counter() > ai.soft_deadline:
+                break
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def wait(self, ai, futures):
+        """
+        Wait for the workers of one iteration, stopping them when ai.stop is set or ai.deadline passes.
+
+        ai.deadline is read on every poll, so a ponderhit() during the
+        iteration limits workers that were started without a time limit.
+
+        Args:
+            ai: AI whose stop attribute and deadline apply
+            futures: Futures of the iteration
+        """
+        while wait(futures, timeout=ROOT_POLL_INTERVAL).not_done:
+            if self.stop_event.is_set():
+                continue
+            if ((ai.stop is not None and ai.stop.is_set())
+                    or (ai.deadline is not None and time.perf_counter() >= ai.deadline)):
+                self.stop_event.set()
+
+    def close(self):
+        """Shut the worker processes down"""
+        self.stop_event.set()
+        self.executor.shutdown()
+
+
+_root_worker_ai = None
+_root_worker_search = None  # search_id of the last task, its tables are kept for the next depth
+
+
+def _root_worker_init(options, stop_event):
+    global _root_worker_ai
+    _root_worker_ai = AI(**options)
+    _root_worker_ai.stop = stop_event
+
+
+def _search_root_moves(search_id, fen, moves, depth, time_limit, node_limit):
+    # Returns (nodes, scores); scores is None when the search was aborted.
+    # Depth 1 is never aborted, so every search has a move.
+    global _root_worker_search
+    ai = _root_worker_ai
+    if depth > 1 and time_limit is not None and time_limit <= 0:
+        return 0, None
+    if search_id != _root_worker_search:
+        _root_worker_search = search_id
+        ai.prepare_search(time_limit, node_limit)
+    else:
+        ai.reset_limits(time_limit, node_limit)  # Killers, history and hash generation carry over
+    try:
+        scores = ai.search_moves(Position.from_fen(fen), moves, depth)
+    except SearchAborted:
+        scores = None
+    return ai.nodes, scores
@@ -0,0 +1,281 @@
+"""
+Transposition table for the chess AI.
+
+The table lives in a flat array of unsigned 64-bit integers so its memory use
+is fixed by the budget given at construction. Entries are grouped in buckets
+of two slots: the first slot keeps the deepest result of the current search,
+the second one always takes the newest result.
+
+SharedTranspositionTable keeps the same layout in shared memory, so that the
+helper processes of a parallel search (see player.smp) all read and write
+one table.
+"""
+
+from array import array
+from multiprocessing import shared_memory
+
+# Bound types
+EXACT = 0
+LOWER = 1  # Score is a lower bound (the search failed high)
+UPPER = 2  # Score is an upper bound (the search failed low)
+
+DEFAULT_HASH_MB = 16
+ENTRY_BYTES = 16  # One 64-bit key word and one 64-bit data word
+BUCKET_SLOTS = 2
+
+_SCORE_OFFSET = 1 << 31
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def pack_entry(depth, bound, score, move, generation):
+    """
+    Pack the fields of an entry into one 64-bit data word.
+
+    Layout: move in bits 0-15, score + 2**31 in bits 16-47, depth in bits
+    48-55, bound in bits 56-57 and search generation in bits 58-63.
+    """
+    return (move | (score + _SCORE_OFFSET) << 16 | max(0, min(depth, 255)) << 48
+            | bound << 56 | (generation & 63) << 58)
+
+
+def unpack_entry(data):
+    """
+    Unpack a data word built by pack_entry().
+
+    Returns:
+        tuple: (depth, bound, score, move)
+    """
+    return (data >> 48 & 255, data >> 56 & 3,
+            (data >> 16 & 0xFFFFFFFF) - _SCORE_OFFSET, data & 0xFFFF)
+
+
+def bucket_count(megabytes):
+    """
+    Get the number of buckets of a table.
+
+    Args:
+        megabytes: Memory budget of the table in MiB
+
+    Returns:
+        int: Largest power of two of buckets that fits the budget
+    """
+    buckets = 1
+    budget = max(1, int(megabytes * 1024 * 1024) // (ENTRY_BYTES * BUCKET_SLOTS))
+    while buckets * 2 <= budget:
+        buckets *= 2
+    return buckets
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results indexed by Zobrist key.
+
+    The key word of a slot is stored XORed with its data word, so a slot that
+    was torn by a concurrent writer simply fails to match on probe.
+    """
+
+    def __init__(self, megabytes=DEFAULT_HASH_MB):
+        """
+        Create an empty table.
+
+        Args:
+            megabytes: Memory budget of the table in MiB
+        """
+        self.generation = 0
+        self.resize(megabytes)
+
+    def resize(self, megabytes):
+        """
+        Reallocate the table for a new memory budget, dropping all entries.
+
+        Args:
+            megabytes: Memory budget of the table in MiB
+        """
+        buckets = bucket_count(megabytes)
+        self.megabytes = megabytes
+        self.mask = buckets - 1
+        self.slots = buckets * BUCKET_SLOTS
+        self.table = array('Q', bytes(buckets * BUCKET_SLOTS * ENTRY_BYTES))
+        self.reset_stats()
+
+    def clear(self):
+        """Drop all entries, keeping the current size"""
+        self.table = array('Q', bytes(len(self.table) * 8))
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the probe, hit and store counters"""
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Start a new search generation so old entries are replaced first"""
+        self.generation = (self.generation + 1) & 63
+
+    def probe(self, key):
+        """
+        Look up a position.
+
+        Args:
+            key: Zobrist key of the position
+
+        Returns:
+            tuple: (depth, bound, score, move), or None if the position is not stored
+        """
+        table = self.table
+        i = (key & self.mask) << 2
+        self.probes += 1
+        data = table[i + 1]
+        if table[i] ^ data == key:
+            self.hits += 1
+            return unpack_entry(data)
+        data = table[i + 3]
+        if table[i + 2] ^ data == key:
+            self.hits += 1
+            return unpack_entry(data)
+        return None
+
+    def store(self, key, depth, bound, score, move):
+        """
+        Store a search result.
+
+        Args:
+            key: Zobrist key of the position
+            depth: Remaining depth the position was searched to
+            bound: EXACT, LOWER or UPPER
+            score: Score of the position
+            move: Best move found (encoded), 0 if there is none
+        """
+        table = self.table
+        i = (key & self.mask) << 2
+        self.stores += 1
+        if table[i] ^ table[i + 1] != key and table[i + 2] ^ table[i + 3] == key:
+            i += 2  # Update the always-replace slot that already holds this position
+        elif table[i] ^ table[i + 1] != key:
+            old = table[i + 1]
+            # The depth-preferred slot keeps deeper results of the current search
+            if old >> 58 == self.generation and old >> 48 & 255 > depth:
+                i += 2
+        if not move:
+            # Keep the previous best move of this position for move ordering
+            old = table[i + 1]
+            if table[i] ^ old == key:
+                move = old & 0xFFFF
+        data = pack_entry(depth, bound, score, move, self.generation)
+        table[i] = (key ^ data) & _MASK64
+        table[i + 1] = data
+
+    def hashfull(self):
+        """
+        Estimate how full the table is.
+
+        Returns:
+            int: Permille of sampled slots holding an entry of the current search
+        """
+        table = self.table
+        sample = min(1000, self.slots)
+        used = 0
+        for slot in range(sample):
+            data = table[slot * 2 + 1]
+            if data and data >> 58 == self.generation:
+                used += 1
+        return used * 1000 // sample
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """
+    Transposition table in a multiprocessing.shared_memory block.
+
+    The process that creates the table owns the block and unlinks it in
+    close(); other processes attach() to it by name. Writers take no lock:
+    the XOR of key and data word means a slot torn by two processes writing
+    at once is a miss, never a wrong hit. The search generation is kept in
+    the word after the table, so every process ages entries alike.
+    """
+
+    def __init__(self, megabytes=DEFAULT_HASH_MB, name=None):
+        """
+        Create a table, or attach to an existing one.
+
+        Args:
+            megabytes: Memory budget of the table in MiB, the same in every process
+            name: Name of the shared memory block to attach to, None to create one
+        """
+        self.owner = name is None
+        self.memory = None
+        self.resize(megabytes, name)
+
+    @classmethod
+    def attach(cls, name, megabytes):
+        """
+        Attach to a table created by another process.
+
+        Args:
+            name: Value of the name attribute of the owner's table
+            megabytes: Memory budget the owner's table was created with
+
+        Returns:
+            SharedTranspositionTable: View of the same entries
+        """
+        return cls(megabytes, name)
+
+    @property
+    def name(self):
+        """Name of the shared memory block, see attach()"""
+        return self.memory.name
+
+    @property
+    def generation(self):
+        return self.header[0]
+
+    @generation.setter
+    def generation(self, value):
+        self.header[0] = value
+
+    def resize(self, megabytes, name=None):
+        """
+        Reallocate the table for a new memory budget, dropping all entries.
+
+        Processes attached to the old block keep using it; attach them again.
+
+        Args:
+            megabytes: Memory budget of the table in MiB
+            name: Name of the shared memory block to attach to, None to create one
+        """
+        buckets = bucket_count(megabytes)
+        size = buckets * BUCKET_SLOTS * ENTRY_BYTES
+        self.close()
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=size + 8)
+            self.memory.buf[:] = bytes(len(self.memory.buf))
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        words = self.memory.buf[:size + 8].cast('Q')
+        self.table = words[:-1]
+        self.header = words[-1:]
+        self.megabytes = megabytes
+        self.mask = buckets - 1
+        self.slots = buckets * BUCKET_SLOTS
+        self.reset_stats()
+
+    def clear(self):
+        """Drop all entries, keeping the current size"""
+        self.table[:] = array('Q', bytes(len(self.table) * 8))
+        self.reset_stats()
+
+    def new_search(self):
+        """Start a new search generation; only the owner advances it"""
+        if self.owner:
+            self.generation = (self.generation + 1) & 63
+
+    def close(self):
+        """Release the shared memory, and free it if this process created it"""
+        if self.memory is None:
+            return
+        self.table.release()
+        self.header.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+        self.memory = None
@@ -0,0 +1,337 @@
+"""
+Headless chess engine speaking the UCI protocol over stdin and stdout.
+
+Usage:
+    python -m player.uci
+
+Supported commands: uci, isready, ucinewgame, setoption (Hash, Threads,
+Ponder), position (startpos or fen, then moves), go (wtime, btime, winc,
+binc, movestogo, movetime, depth, nodes, infinite, ponder), stop, ponderhit
+and quit. The search runs on a worker thread so that stop and ponderhit are
+read while it thinks; every finished iteration is reported as an info line.
+
+Only player.AI and the board package are imported, never pygame.
+"""
+
+import sys
+import threading
+
+from board.bitboard import Position, WHITE, START_FEN, move_name
+from board.movegen import parse_move, generate_legal_moves
+from player.AI import AI, MAX_DEPTH, MATE_SCORE, MATE_BOUND
+from player.transposition import DEFAULT_HASH_MB
+
+ENGINE_NAME = 'AI-Chess-Game'
+ENGINE_AUTHOR = 'Jibran-hh'
+MAX_HASH_MB = 4096
+MAX_THREADS = 64
+DEFAULT_MOVES_TO_GO = 30  # Moves the remaining clock time is shared out over
+MOVE_OVERHEAD = 0.05  # Seconds kept back from every move for communication
+
+
+def score_text(score):
+    """
+    Write a score in UCI notation.
+
+    Args:
+        score: Score from the point of view of the side to move
+
+    Returns:
+        str: 'cp <centipawns>' or 'mate <moves>', negative when being mated
+    """
+    if abs(score) >= MATE_BOUND:
+        plies = MATE_SCORE - abs(score)
+        moves = (plies + 1) // 2
+        return 'mate %d' % (moves if score > 0 else -moves)
+    return 'cp %d' % score
+
+
+def time_budget(side, options):
+    """
+    Decide how long to think about a move.
+
+    Args:
+        side: Color of the side to move
+        options: Parameters of the go command
+
+    Returns:
+        float: Seconds to search, or None to search without a time limit
+    """
+    if 'movetime' in options:
+        return max(0.001, options['movetime'] / 1000 - MOVE_OVERHEAD)
+    remaining = options.get('wtime' if side == WHITE else 'btime')
+    if remaining is None:
+        return None
+    increment = options.get('winc' if side == WHITE else 'binc', 0)
+    moves_to_go = options.get('movestogo', DEFAULT_MOVES_TO_GO)
+    budget = remaining / moves_to_go + increment * 0.8
+    return max(0.001, min(budget, remaining / 2) / 1000 - MOVE_OVERHEAD)
+
+
+class UCIEngine:
+    """
+    State of one UCI session: options, current position and the running search.
+    """
+
+    def __init__(self, output=sys.stdout):
+        """
+        Create an engine with default options.
+
+        Args:
+            output: Text stream the replies are written to
+        """
+        self.output = output
+        self.output_lock = threading.Lock()
+        self.hash_mb = DEFAULT_HASH_MB
+        self.threads = 1
+        self.ai = AI(hash_mb=self.hash_mb)
+        self.position = Position.from_fen(START_FEN)
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.release = threading.Event()  # Lets a ponder or infinite search report its move
+        self.ponder_time = None  # Time budget of the move being pondered, used on ponderhit
+
+    def send(self, line):
+        """Write one line to the GUI"""
+        with self.output_lock:
+            self.output.write(line + '\n')
+            self.output.flush()
+
+    def handle(self, line):
+        """
+        Execute one command.
+
+        Args:
+            line: Command line read from the GUI
+
+        Returns:
+            bool: False after quit
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+        if command == 'uci':
+            self.send('id name %s' % ENGINE_NAME)
+            self.send('id author %s' % ENGINE_AUTHOR)
+            self.send('option name Hash type spin default %d min 1 max %d' % (DEFAULT_HASH_MB, MAX_HASH_MB))
+            self.send('option name Threads type spin default 1 min 1 max %d' % MAX_THREADS)
+            self.send('option name Ponder type check default false')
+            self.send('uciok')
+        elif command == 'isready':
+            self.send('readyok')
+        elif command == 'ucinewgame':
+            self.stop()
+            self.ai.tt.clear()
+            self.ai.ordering.new_search()
+        elif command == 'setoption':
+            self.setoption(args)
+        elif command == 'position':
+            self.set_position(args)
+        elif command == 'go':
+            self.go(args)
+        elif command == 'stop':
+            self.stop()
+        elif command == 'ponderhit':
+            self.ponderhit()
+        elif command == 'quit':
+            self.stop()
+            self.ai.close()
+            return False
+        else:
+            self.send('info string unknown command %s' % command)
+        return True
+
+    def setoption(self, args):
+        """
+        Handle 'setoption name <name> value <value>'.
+
+        Args:
+            args: Tokens after the command
+        """
+        if 'name' not in args:
+            return
+        if 'value' in args:
+            name = ' '.join(args[args.index('name') + 1:args.index('value')]).lower()
+            value = ' '.join(args[args.index('value') + 1:])
+        else:
+            name = ' '.join(args[args.index('name') + 1:]).lower()
+            value = ''
+        self.stop()
+        try:
+            if name == 'hash':
+                self.hash_mb = max(1, min(int(value), MAX_HASH_MB))
+                if self.threads == 1:
+                    self.ai.tt.resize(self.hash_mb)
+                else:
+                    self.new_ai()
+            elif name == 'threads':
+                self.threads = max(1, min(int(value), MAX_THREADS))
+                self.new_ai()
+            elif name != 'ponder':  # Pondering is driven by 'go ponder', nothing to set
+                self.send('info string unknown option %s' % name)
+        except ValueError:
+            self.send('info string bad value %s for option %s' % (value, name))
+
+    def new_ai(self):
+        """Replace the AI after a change of Threads (or of Hash with helper processes)"""
+        self.ai.close()
+        self.ai = AI(hash_mb=self.hash_mb, threads=self.threads)
+
+    def set_position(self, args):
+        """
+        Handle 'position startpos|fen <fen> [moves <move> ...]'.
+
+        Args:
+            args: Tokens after the command
+        """
+        moves = []
+        if 'moves' in args:
+            moves = args[args.index('moves') + 1:]
+            args = args[:args.index('moves')]
+        try:
+            if args and args[0] == 'fen':
+                position = Position.from_fen(' '.join(args[1:]))
+            else:
+                position = Position.from_fen(START_FEN)
+            for name in moves:
+                position.make_move(parse_move(position, name))
+        except ValueError as error:
+            self.send('info string %s' % error)
+            return
+        self.position = position
+
+    def go(self, args):
+        """
+        Handle 'go' and start the search thread.
+
+        Args:
+            args: Tokens after the command
+        """
+        self.stop()  # A GUI sends stop first, this only guards against one that does not
+        options = {}
+        flags = set()
+        index = 0
+        while index < len(args):
+            token = args[index]
+            if token in ('infinite', 'ponder'):
+                flags.add(token)
+            elif index + 1 < len(args):
+                try:
+                    options[token] = int(args[index + 1])
+                except ValueError:
+                    pass
+                index += 1
+            index += 1
+
+        position = Position.from_fen(self.position.fen())
+        time_limit = time_budget(position.side, options)
+        node_limit = options.get('nodes')
+        max_depth = options.get('depth')
+        if max_depth is not None:
+            max_depth = max(1, min(max_depth, MAX_DEPTH))
+        if max_depth is None and time_limit is None and node_limit is None:
+            max_depth = MAX_DEPTH  # 'go infinite', or no limit at all
+        self.ponder_time = None
+        hold = bool(flags)
+        if 'ponder' in flags:
+            self.ponder_time = time_limit
+            time_limit = None
+            max_depth = MAX_DEPTH
+        self.stop_event.clear()
+        self.release.clear()
+        if not hold:
+            self.release.set()
+        self.thread = threading.Thread(target=self.search, name='uci-search', daemon=True,
+                                       args=(position, time_limit, node_limit, max_depth))
+        self.thread.start()
+
+    def search(self, position, time_limit, node_limit, max_depth):
+        """
+        Search on the worker thread and report the best move.
+
+        Args:
+            position: Position to search
+            time_limit: Seconds, or None
+            node_limit: Nodes, or None
+            max_depth: Deepest iteration, or None for AI's default
+        """
+        side = position.side
+        legal = generate_legal_moves(position).tolist()  # Played if the search finds nothing
+        ai = self.ai
+        ai.stop = self.stop_event
+        ai.progress = lambda result: self.info(result, side)
+        result = None
+        try:
+            result = ai.search(position, time_limit, node_limit, max_depth)
+        except Exception as error:  # The GUI still gets a bestmove below
+            self.send('info string search failed: %r' % error)
+        finally:
+            ai.stop = None
+            ai.progress = None
+            # A ponder or infinite search reports only after ponderhit or stop
+            self.release.wait()
+            if result is not None and result.move:
+                move, pv = result.move, result.pv
+            else:
+                move, pv = (legal[0] if legal else 0), []
+            if not move:
+                self.send('bestmove 0000')
+            elif len(pv) > 1:
+                self.send('bestmove %s ponder %s' % (move_name(move), move_name(pv[1])))
+            else:
+                self.send('bestmove %s' % move_name(move))
+
+    def info(self, result, side):
+        """
+        Report a finished iteration.
+
+        Args:
+            result: SearchResult of the iteration
+            side: Color of the side to move at the root
+        """
+        score = result.score if side == WHITE else -result.score
+        self.send('info depth %d score %s nodes %d nps %d time %d hashfull %d pv %s'
+                  % (result.depth, score_text(score), result.nodes, result.nps(),
+                     int(result.elapsed * 1000), self.ai.tt.hashfull(),
+                     ' '.join(move_name(move) for move in result.pv)))
+
+    def stop(self):
+        """Handle 'stop': end the running search, if any, and wait for it to report its move"""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.release.set()
+        self.thread.join()
+        self.thread = None
+
+    def ponderhit(self):
+        """Handle 'ponderhit': the pondered move was played, search on with the move's time budget"""
+        if self.ponder_time is not None:
+            self.ai.ponderhit(self.ponder_time)
+        self.ponder_time = None
+        self.release.set()
+
+
+def main(stdin=None):
+    """
+    Read UCI commands until quit or end of input.
+
+    Args:
+        stdin: Text stream to read, sys.stdin if None
+
+    Returns:
+        int: Exit status
+    """
+    engine = UCIEngine()
+    for line in stdin if stdin is not None else sys.stdin:
+        if not engine.handle(line.strip()):
+            break
+    else:
+        engine.stop()
+        engine.ai.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from board.bitboard import Position
+from board.movegen import generate_legal_moves
+from player.AI import AI
+from player.bench import BENCH_POSITIONS
+
+np = pytest.importorskip('numpy')
+batch_eval = pytest.importorskip('player.batch_eval')
+
+
+def random_positions(count, seed=1):
+    """Positions reached by random legal moves from the bench suite"""
+    rng = random.Random(seed)
+    positions = []
+    for index in range(count):
+        position = Position.from_fen(BENCH_POSITIONS[index % len(BENCH_POSITIONS)][1])
+        for _ in range(rng.randint(0, 40)):
+            moves = list(generate_legal_moves(position))
+            if not moves:
+                break
+            position.make_move(rng.choice(moves))
+        positions.append(Position.from_fen(position.fen()))
+    return positions
+
+
+def test_batch_score_equals_calculateb():
+    positions = random_positions(120)
+    ai = AI()
+    expected = [ai.calculateb(position) for position in positions]
+    assert batch_eval.evaluate_positions(positions).tolist() == expected
+
+
+def test_psq_and_mobility_parts():
+    positions = random_positions(60, seed=2)
+    ai = AI()
+    codes = batch_eval.position_codes(positions)
+    assert batch_eval.psq_codes(codes).tolist() == [position.psq_score for position in positions]
+    assert batch_eval.mobility_codes(codes).tolist() == [ai.mobility(position) for position in positions]
+
+
+def test_planes_equal_codes():
+    positions = random_positions(30, seed=3)
+    codes = batch_eval.position_codes(positions)
+    planes = np.zeros((len(positions), 12, 64), dtype=np.int8)
+    rows, squares = np.nonzero(codes >= 0)
+    planes[rows, codes[rows, squares], squares] = 1
+    assert batch_eval.evaluate_planes(planes).tolist() == batch_eval.evaluate_codes(codes).tolist()
@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from board.bitboard import Position, START_FEN, PROMOTION, KING_CASTLE, QUEEN_CASTLE, move_coordinates
+from board.chessboard import board
+from board.move import move
+from board.movegen import generate_legal_moves
+from pieces.bishop import bishop
+from pieces.knight import knight
+from pieces.queen import queen
+from pieces.rook import rook
+from player.bench import BENCH_POSITIONS
+
+PROMOTION_PIECES = (knight, bishop, rook, queen)
+
+
+def play(chessboard, moves):
+    """Play coordinate moves such as 'e2e4' on the grid"""
+    for name in moves:
+        x, y = ord(name[0]) - ord('a'), 8 - int(name[1])
+        m, n = ord(name[2]) - ord('a'), 8 - int(name[3])
+        promoted = PROMOTION_PIECES['nbrq'.index(name[4])] if len(name) > 4 else None
+        chessboard.makemove(y, x, n, m, promoted)
+
+
+def test_start_position():
+    chessboard = board()
+    chessboard.createboard()
+    assert chessboard.tofen() == START_FEN
+
+
+def test_moves_update_side_and_counters():
+    chessboard = board()
+    chessboard.createboard()
+    play(chessboard, ['e2e4'])
+    assert chessboard.tofen() == 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1'
+    play(chessboard, ['g8f6', 'g1f3'])
+    assert chessboard.tofen() == 'rnbqkb1r/pppppppp/5n2/8/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 2 2'
+
+
+@pytest.mark.parametrize('moves, fen', [
+    (['e2e4', 'd7d5', 'e4e5', 'f7f5'], 'rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3'),
+    (['e2e4', 'd7d5', 'e4e5', 'f7f5', 'e5f6'], 'rnbqkbnr/ppp1p1pp/5P2/3p4/8/8/PPPP1PPP/RNBQKBNR b KQkq - 0 3'),
+    (['e2e4', 'e7e5', 'g1f3', 'b8c6', 'f1c4', 'g8f6', 'e1g1'],
+     'r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQ1RK1 b kq - 5 4'),
+    (['h2h4', 'g7g5', 'h4g5', 'h7h6', 'g5h6', 'f8g7', 'h6g7', 'g8f6', 'g7h8n'],
+     'rnbqk2N/pppppp2/5n2/8/8/8/PPPPPPP1/RNBQKBNR b KQq - 0 5'),
+])
+def test_game_in_progress_round_trip(moves, fen):
+    chessboard = board()
+    chessboard.createboard()
+    play(chessboard, moves)
+    assert chessboard.tofen() == fen
+    restored = board()
+    restored.loadfen(fen)
+    assert restored.tofen() == fen
+
+
+def test_random_games_match_position():
+    rng = random.Random(1)
+    for _name, fen in BENCH_POSITIONS:
+        chessboard = board()
+        chessboard.loadfen(fen)
+        position = Position.from_fen(fen)
+        for _ in range(60):
+            moves = list(generate_legal_moves(position))
+            if not moves:
+                break
+            move = rng.choice(moves)
+            y, x, n, m = move_coordinates(move)
+            chessboard.makemove(y, x, n, m, PROMOTION_PIECES[move >> 12 & 3] if move >> 12 & PROMOTION else None)
+            position.make_move(move)
+            assert chessboard.tofen() == position.fen()
+            restored = board()
+            restored.loadfen(chessboard.tofen())
+            assert restored.tofen() == position.fen()
+
+
+def test_bad_fen():
+    with pytest.raises(ValueError):
+        board().loadfen('8/8/8 w - -')
+
+
+
+@pytest.mark.parametrize('fen, castling', [
+    ('4k3/8/8/8/8/8/8/4K3 w KQkq - 0 1', '-'),
+    ('r3k3/8/8/8/8/8/8/4K2R w KQkq - 0 1', 'Kq'),
+    ('r3k2r/8/8/8/8/8/8/R2K3R w KQkq - 0 1', 'kq'),
+])
+def test_castling_rights_need_king_and_rook(fen, castling):
+    assert Position.from_fen(fen).fen().split()[2] == castling
+    chessboard = board()
+    chessboard.loadfen(fen)
+    assert chessboard.tofen().split()[2] == castling
+
+
+def test_no_castling_without_rook():
+    position = Position.from_fen('4k3/8/8/8/8/8/8/4K3 w - - 0 1')
+    position.castling = 15  # Rights the FEN parser would have dropped
+    assert not [move for move in generate_legal_moves(position) if move >> 12 in (KING_CASTLE, QUEEN_CASTLE)]
+
+
+def test_check_on_several_boards():
+    # Each grid finds its own king, whatever was checked on another board before
+    handler = move()
+    fens = ['4k3/8/8/8/8/8/8/r6K w - - 0 1', '4k3/8/8/8/8/8/8/4K2r w - - 0 1',
+            'r3k3/8/8/8/8/8/8/7K b - - 0 1', '4k3/8/8/8/8/8/8/K7 w - - 0 1']
+    grids = [Position.from_fen(fen).to_gametiles() for fen in fens]
+    for _ in range(2):
+        for fen, gametiles in zip(fens, grids):
+            position = Position.from_fen(fen)
+            assert handler.checkw(gametiles) == position.checkw()
+            assert handler.checkb(gametiles) == position.checkb()
@@ -0,0 +1,57 @@
+from board.bitboard import Position, move_name
+from board.movegen import generate_legal_moves
+from player.move_ordering import MoveOrderer
+
+# White can take the queen with the pawn, the knight or the rook, or the rook with the queen
+FEN = '4k3/8/2r5/3q4/4P3/2N5/8/3RQ1K1 w - - 0 1'
+
+
+def ordered(position, orderer, hash_move=0, ply=0):
+    return [move_name(move) for move in orderer.order(position, generate_legal_moves(position), hash_move, ply)]
+
+
+def find(position, name):
+    return next(move for move in generate_legal_moves(position) if move_name(move) == name)
+
+
+def test_captures_by_victim_then_attacker():
+    position = Position.from_fen(FEN)
+    names = ordered(position, MoveOrderer())
+    assert names[:3] == ['e4d5', 'c3d5', 'd1d5']
+
+
+def test_hash_move_goes_first():
+    position = Position.from_fen(FEN)
+    names = ordered(position, MoveOrderer(), find(position, 'g1h2'))
+    assert names[0] == 'g1h2'
+    assert names[1:4] == ['e4d5', 'c3d5', 'd1d5']
+
+
+def test_killers_come_after_captures():
+    position = Position.from_fen(FEN)
+    orderer = MoveOrderer()
+    killer = find(position, 'g1h1')
+    orderer.cutoff(position, killer, 3, 1, 5)
+    orderer.cutoff(position, find(position, 'e4e5'), 7, 6, 0)  # Higher history than the killer
+    assert ordered(position, orderer, ply=3)[3:5] == ['g1h1', 'e4e5']
+    assert ordered(position, orderer, ply=2)[3:5] == ['e4e5', 'g1h1']  # Killers belong to their ply
+    orderer.new_search()
+    assert orderer.killers[3] == [0, 0]
+
+
+def test_history_sorts_quiet_moves():
+    position = Position.from_fen(FEN)
+    orderer = MoveOrderer()
+    orderer.cutoff(position, find(position, 'e4e5'), 10, 2, 0)
+    orderer.cutoff(position, find(position, 'g1f2'), 11, 3, 0)
+    names = ordered(position, orderer)
+    assert names.index('g1f2') < names.index('e4e5') < names.index('g1h1')
+
+
+def test_captures_do_not_change_killers_or_history():
+    position = Position.from_fen(FEN)
+    orderer = MoveOrderer()
+    orderer.cutoff(position, find(position, 'e4d5'), 0, 5, 0)
+    assert orderer.killers[0] == [0, 0]
+    assert not any(orderer.history)
+    assert orderer.stats()['cutoffs'] == 1
@@ -0,0 +1,32 @@
+import pytest
+
+from board.bitboard import Position
+from board.perft import REFERENCE_POSITIONS, perft, divide, main
+
+NODE_BUDGET = 100000  # Deepest published count per position that keeps the suite quick
+
+
+@pytest.mark.parametrize('name, fen, counts', REFERENCE_POSITIONS)
+def test_reference_counts(name, fen, counts):
+    position = Position.from_fen(fen)
+    for depth, expected in enumerate(counts, 1):
+        if expected > NODE_BUDGET:
+            break
+        assert perft(position, depth) == expected, '%s depth %d' % (name, depth)
+    assert position.fen() == fen
+
+
+@pytest.mark.parametrize('name, fen, counts', REFERENCE_POSITIONS)
+def test_divide_adds_up(name, fen, counts):
+    split = divide(Position.from_fen(fen), 2)
+    assert len(split) == counts[0]
+    assert sum(nodes for _move, nodes in split) == counts[1]
+
+
+def test_depth_zero_is_one_node():
+    assert perft(Position.from_fen(REFERENCE_POSITIONS[0][1]), 0) == 1
+
+
+def test_suite_passes(capsys):
+    assert main(['--depth', '2']) == 0
+    assert 'FAIL' not in capsys.readouterr().out
@@ -0,0 +1,72 @@
+import random
+
+import pytest
+
+from board.bitboard import Position, START_FEN, move_name
+from board.movegen import generate_legal_moves
+from board.perft import REFERENCE_POSITIONS
+
+FENS = [fen for _name, fen, _counts in REFERENCE_POSITIONS]
+
+
+def state(position):
+    """Everything make_move() changes and unmake_move() has to restore"""
+    return (position.pieces[:], position.occupancy[:], position.occupied, position.squares[:],
+            position.side, position.castling, position.ep, position.halfmove, position.fullmove,
+            position.key, position.psq_score)
+
+
+@pytest.mark.parametrize('fen', FENS)
+def test_unmake_restores_every_move(fen):
+    position = Position.from_fen(fen)
+    before = state(position)
+    for move in generate_legal_moves(position):
+        position.make_move(move)
+        for reply in generate_legal_moves(position):
+            after = state(position)
+            position.make_move(reply)
+            position.unmake_move()
+            assert state(position) == after
+        position.unmake_move()
+        assert state(position) == before
+    assert position.fen() == fen
+
+
+@pytest.mark.parametrize('fen', FENS)
+def test_random_walk_keeps_key_and_state(fen):
+    rng = random.Random(fen)
+    position = Position.from_fen(fen)
+    states = [state(position)]
+    for _ in range(80):
+        moves = list(generate_legal_moves(position))
+        if not moves:
+            break
+        position.make_move(rng.choice(moves))
+        assert position.key == position.compute_key()
+        assert position.key == Position.from_fen(position.fen()).key
+        states.append(state(position))
+    while position.ply:
+        states.pop()
+        position.unmake_move()
+        assert state(position) == states[-1]
+
+
+def test_null_move_is_taken_back():
+    position = Position.from_fen('rnbqkbnr/ppp1pppp/8/3pP3/8/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 2')
+    before = state(position)
+    position.make_null_move()
+    assert position.ep == -1
+    assert position.key == position.compute_key()
+    position.unmake_move()
+    assert state(position) == before
+
+
+def test_transposed_moves_give_the_same_key():
+    first = Position.from_fen(START_FEN)
+    second = Position.from_fen(START_FEN)
+    for position, names in ((first, ('g1f3', 'g8f6', 'b1c3')), (second, ('b1c3', 'g8f6', 'g1f3'))):
+        for name in names:
+            position.make_move(next(move for move in generate_legal_moves(position)
+                                    if move_name(move) == name))
+    assert first.key == second.key
+    assert first.key != Position.from_fen(START_FEN).key
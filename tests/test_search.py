@@ -0,0 +1,83 @@
+import pytest
+
+from board.bitboard import Position, move_name
+from board.movegen import generate_legal_moves
+from player.AI import AI, MAX_DEPTH, MATE_SCORE
+from player.bench import BENCH_POSITIONS
+
+KIWIPETE = dict(BENCH_POSITIONS)['kiwipete']
+
+
+@pytest.mark.parametrize('limits', [{'node_limit': 1}, {'node_limit': 20}, {'time_limit': 0.001}])
+def test_tight_limit_still_returns_a_legal_move(limits):
+    position = Position.from_fen(KIWIPETE)
+    result = AI().search(position, **limits)
+    assert result.depth >= 1
+    assert result.move in generate_legal_moves(position)
+    assert position.fen() == KIWIPETE
+
+
+def test_max_depth_is_clamped():
+    position = Position.from_fen('4k3/8/8/8/8/8/8/4K3 w - - 0 1')
+    result = AI().search(position, max_depth=100)
+    assert result.depth <= MAX_DEPTH
+    assert result.move in generate_legal_moves(position)
+
+
+@pytest.mark.parametrize('limits', [{'node_limit': 20}, {'time_limit': 0.001}, {'max_depth': 3}])
+def test_root_split_returns_a_legal_move(limits):
+    position = Position.from_fen(KIWIPETE)
+    ai = AI(root_workers=2)
+    try:
+        first = ai.search(position, **limits)
+        second = ai.search(position, **limits)  # The workers keep their tables from one search to the next
+    finally:
+        ai.close()
+    for result in (first, second):
+        assert result.depth >= 1
+        assert result.move in generate_legal_moves(position)
+
+
+def test_search_survives_a_dead_helper():
+    position = Position.from_fen(KIWIPETE)
+    ai = AI(threads=2)
+    try:
+        ai.search(position, max_depth=2)
+        ai.helpers.workers[0].kill()
+        ai.helpers.workers[0].join()
+        result = ai.search(position, max_depth=3)  # Used to wait forever for the dead helper's node count
+    finally:
+        ai.close()
+    assert result.depth == 3
+    assert result.move in generate_legal_moves(position)
+
+
+SELECTIVE = ('pvs', 'null_move', 'lmr', 'reverse_futility', 'futility')
+
+
+@pytest.mark.parametrize('off', (None,) + SELECTIVE)
+@pytest.mark.parametrize('fen, best', [
+    ('6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1', 'a1a8'),  # Mate in one
+    ('k7/8/8/3q4/8/8/8/K2R4 w - - 0 1', 'd1d5'),  # Hanging queen
+])
+def test_selective_search_finds_the_best_move(fen, best, off):
+    options = {off: False} if off else {}
+    result = AI(**options).search(Position.from_fen(fen), max_depth=4)
+    assert move_name(result.move) == best
+
+
+def test_selective_search_keeps_mate_score():
+    fen = '6k1/5ppp/8/8/8/8/5PPP/R5K1 w - - 0 1'
+    plain = AI(**{name: False for name in SELECTIVE}).search(Position.from_fen(fen), max_depth=3)
+    full = AI().search(Position.from_fen(fen), max_depth=3)
+    assert plain.score == full.score == MATE_SCORE - 1
+
+
+def test_second_search_uses_the_hash_table():
+    position = Position.from_fen(KIWIPETE)
+    ai = AI()
+    first = ai.search(position, max_depth=3)
+    second = ai.search(position, max_depth=3)
+    assert ai.tt.hits > 0
+    assert second.nodes < first.nodes
+    assert second.move == first.move
@@ -0,0 +1,107 @@
+import pytest
+
+from player.transposition import (TranspositionTable, SharedTranspositionTable, EXACT, LOWER, UPPER,
+                                  bucket_count, pack_entry, unpack_entry)
+
+KEY = 0x9D39247E33776D41
+
+
+def colliding_key(table, key, n):
+    """A different key that maps to the same bucket as key"""
+    return key ^ (n * (table.mask + 1))
+
+
+@pytest.mark.parametrize('entry', [(0, EXACT, 0, 0), (7, LOWER, -31999, 0x1234), (255, UPPER, 31999, 0xFFFF)])
+def test_pack_round_trip(entry):
+    assert unpack_entry(pack_entry(*entry, generation=63)) == entry
+
+
+def test_bucket_count_fits_budget():
+    assert bucket_count(1) == 1 << 15
+    assert bucket_count(1.5) == 1 << 15
+    assert bucket_count(0) == 1
+
+
+def test_store_and_probe():
+    table = TranspositionTable(1)
+    assert table.probe(KEY) is None
+    table.store(KEY, 5, LOWER, -120, 0x0abc)
+    assert table.probe(KEY) == (5, LOWER, -120, 0x0abc)
+    assert table.probe(KEY ^ 1) is None
+    assert (table.probes, table.hits, table.stores) == (3, 1, 1)
+
+
+def test_store_without_move_keeps_the_old_move():
+    table = TranspositionTable(1)
+    table.store(KEY, 3, EXACT, 10, 0x0abc)
+    table.store(KEY, 4, UPPER, -5, 0)
+    assert table.probe(KEY) == (4, UPPER, -5, 0x0abc)
+
+
+def test_deeper_entry_of_this_search_is_kept():
+    table = TranspositionTable(1)
+    other, third = colliding_key(table, KEY, 1), colliding_key(table, KEY, 2)
+    table.store(KEY, 8, EXACT, 1, 0)
+    table.store(other, 2, EXACT, 2, 0)
+    assert table.probe(KEY) == (8, EXACT, 1, 0)
+    assert table.probe(other) == (2, EXACT, 2, 0)
+    table.store(third, 3, EXACT, 3, 0)  # Goes to the always-replace slot
+    assert table.probe(KEY) == (8, EXACT, 1, 0)
+    assert table.probe(other) is None
+
+
+def test_entries_of_an_old_search_are_replaced():
+    table = TranspositionTable(1)
+    other = colliding_key(table, KEY, 1)
+    table.store(KEY, 8, EXACT, 1, 0)
+    table.new_search()
+    assert table.probe(KEY) == (8, EXACT, 1, 0)  # Old results can still be used
+    table.store(other, 2, EXACT, 2, 0)
+    assert table.probe(KEY) is None
+    assert table.probe(other) == (2, EXACT, 2, 0)
+
+
+def test_generation_wraps():
+    table = TranspositionTable(1)
+    for _ in range(64):
+        table.new_search()
+    assert table.generation == 0
+
+
+def test_hashfull_counts_this_search():
+    table = TranspositionTable(1)
+    for slot in range(0, 2000, 2):
+        table.store(slot // 2, 1, EXACT, 0, 0)
+    assert table.hashfull() == 500
+    table.new_search()
+    assert table.hashfull() == 0
+
+
+def test_clear_and_resize_drop_entries():
+    table = TranspositionTable(1)
+    table.store(KEY, 1, EXACT, 0, 0)
+    table.clear()
+    assert table.probe(KEY) is None
+    table.store(KEY, 1, EXACT, 0, 0)
+    table.resize(2)
+    assert table.mask == (1 << 16) - 1
+    assert table.probe(KEY) is None
+
+
+def test_shared_table_is_seen_by_attached_views():
+    table = SharedTranspositionTable(1)
+    try:
+        view = SharedTranspositionTable.attach(table.name, 1)
+        try:
+            table.store(KEY, 6, LOWER, 42, 0x0abc)
+            assert view.probe(KEY) == (6, LOWER, 42, 0x0abc)
+            view.new_search()  # Only the owner advances the generation
+            assert view.generation == 0
+            table.new_search()
+            assert view.generation == 1
+            view.store(KEY, 2, UPPER, -7, 0)
+            assert table.probe(KEY) == (2, UPPER, -7, 0x0abc)
+        finally:
+            view.close()
+    finally:
+        table.close()
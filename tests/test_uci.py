@@ -0,0 +1,35 @@
+import io
+
+import pytest
+
+from board.bitboard import Position
+from board.movegen import generate_legal_moves, parse_move
+from player.bench import BENCH_POSITIONS
+from player.uci import UCIEngine
+
+KIWIPETE = dict(BENCH_POSITIONS)['kiwipete']
+BARE_KINGS = '4k3/8/8/8/8/8/8/4K3 w - - 0 1'
+
+
+def best_move(fen, go):
+    """Run one go command and return the move of its bestmove line"""
+    output = io.StringIO()
+    engine = UCIEngine(output)
+    engine.handle('position fen ' + fen)
+    engine.handle(go)
+    engine.thread.join(timeout=60)
+    engine.handle('quit')
+    lines = [line for line in output.getvalue().splitlines() if line.startswith('bestmove')]
+    assert len(lines) == 1
+    return lines[0].split()[1]
+
+
+@pytest.mark.parametrize('fen, go', [
+    (KIWIPETE, 'go nodes 50'),
+    (KIWIPETE, 'go movetime 40'),
+    (KIWIPETE, 'go wtime 1500 btime 1500'),
+    (BARE_KINGS, 'go depth 90'),
+])
+def test_go_always_reports_a_legal_move(fen, go):
+    position = Position.from_fen(fen)
+    assert parse_move(position, best_move(fen, go)) in generate_legal_moves(position)